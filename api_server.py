@@ -2,25 +2,38 @@
 BrandShield API Server
 Flask-based REST API for AI Crisis Prediction
 """
-from flask import Flask, request, jsonify, session
+from flask import Flask, request, jsonify, session, Response, stream_with_context
 from flask_cors import CORS
 import os
 import sys
 import json
 import uuid
+import time
+import statistics
+from collections import OrderedDict
 from datetime import datetime
 from dotenv import load_dotenv
-from werkzeug.security import generate_password_hash, check_password_hash
 
 # Add src to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from src.graph import create_phase1_graph, create_phase2_graph
-from src.state import AgentState
-
-# Load environment variables
+# Load environment variables (before src imports - modules read settings at import time)
 load_dotenv()
 
+from src.graph import get_phase1_graph, get_phase2_graph, warm_graphs, PHASE1_NODES, PHASE2_NODES
+from src.state import AgentState
+from src.embeddings import warm_embeddings, get_embedding_stats, get_cached_embeddings
+from src.vector_index import preload_brand_indexes
+from src.search import search_cache, get_search_backend
+from src.llm_utils import get_llm_cache_stats, get_llm_pool_stats
+from src.jobs import JobManager
+from src.session_store import SessionStore
+from src.rollups import RollupStore, merge_buckets
+from src.user_store import UserStore
+from src.passwords import PasswordHasher, PasswordHashingBusy
+from src.batch import run_batch_phase1, batch_nodes, BATCH_MAX_BRANDS
+from src.monitor import MonitorStore, MonitorScheduler, MONITOR_ENABLED, MONITOR_DEFAULT_INTERVAL, MONITOR_MIN_INTERVAL
+
 app = Flask(__name__)
 app.secret_key = os.getenv('SECRET_KEY', 'brandshield-secret-key-dev')
 
@@ -34,25 +47,23 @@ CORS(app,
          "expose_headers": ["Content-Type"]
      }})
 
-# File to store users
+# Legacy users file, migrated into the SQLite user store on first start
 USERS_FILE = 'users.json'
+user_store = UserStore(legacy_json_path=USERS_FILE)
+# Password hashing runs in worker processes, off the request threads
+password_hasher = PasswordHasher()
 
-def load_users():
-    if os.path.exists(USERS_FILE):
-        try:
-            with open(USERS_FILE, 'r') as f:
-                return json.load(f)
-        except:
-            return {}
-    return {}
+# Analysis sessions persist in SQLite (shared by all server processes)
+session_store = SessionStore()
+# Per-brand hourly/daily aggregates behind /api/insights and /api/trends
+rollup_store = RollupStore()
 
-def save_users(users):
-    with open(USERS_FILE, 'w') as f:
-        json.dump(users, f, indent=2)
+# Graph runs execute on a background worker pool; clients poll /api/jobs/<job_id>
+job_manager = JobManager()
 
-# In-memory storage for analysis sessions (replace with DB in production)
-analysis_sessions = {}
-analysis_history = []  # Store all analyses with timestamps
+# Registered brands are refreshed incrementally in the background
+monitor_store = MonitorStore()
+monitor_scheduler = MonitorScheduler(monitor_store)
 
 @app.route('/api/auth/register', methods=['POST', 'OPTIONS'])
 def register():
@@ -72,24 +83,22 @@ def register():
         if not email or not password or not name:
             return jsonify({'error': 'Missing required fields'}), 400
 
-        users = load_users()
-        
-        if email in users:
+        if user_store.get_by_email(email):
             return jsonify({'error': 'User already exists'}), 400
 
         user_id = str(uuid.uuid4())
         new_user = {
             'id': user_id,
             'email': email,
-            'password': generate_password_hash(password),
+            'password': password_hasher.hash(password),
             'name': name,
             'company': company,
             'created_at': datetime.now().isoformat(),
             'last_login': None
         }
 
-        users[email] = new_user
-        save_users(users)
+        if not user_store.create(new_user):
+            return jsonify({'error': 'User already exists'}), 400
 
         # Return user info (excluding password)
         user_response = {k: v for k, v in new_user.items() if k != 'password'}
@@ -99,6 +108,8 @@ def register():
         
         return jsonify({'message': 'Registration successful', 'user': user_response}), 201
 
+    except PasswordHashingBusy:
+        return jsonify({'error': 'Server busy, please retry'}), 503, {'Retry-After': '1'}
     except Exception as e:
         print(f"Registration error: {e}")
         import traceback
@@ -121,24 +132,24 @@ def login():
         if not email or not password:
             return jsonify({'error': 'Missing email or password'}), 400
 
-        users = load_users()
+        user = user_store.get_by_email(email)
         
-        if email not in users:
+        if user is None:
             return jsonify({'error': 'Invalid credentials'}), 401
-            
-        user = users[email]
         
-        if not check_password_hash(user.get('password'), password):
+        if not password_hasher.verify(user.get('password'), password):
             return jsonify({'error': 'Invalid credentials'}), 401
 
-        # Update last login
+        # Update last login (written in batches)
         user['last_login'] = datetime.now().isoformat()
-        save_users(users)
+        user_store.record_login(email, user['last_login'])
         
         user_response = {k: v for k, v in user.items() if k != 'password'}
         session['user'] = user_response
         return jsonify({'message': 'Login successful', 'user': user_response}), 200
 
+    except PasswordHashingBusy:
+        return jsonify({'error': 'Server busy, please retry'}), 503, {'Retry-After': '1'}
     except Exception as e:
         print(f"Login error: {e}")
         import traceback
@@ -192,8 +203,8 @@ def start_analysis():
         if not brand_name:
             return jsonify({'error': 'Brand name is required'}), 400
         
-        # Check for Exa API key
-        if not os.getenv("EXA_API_KEY"):
+        # Check for Exa API key (not needed when replaying recorded searches)
+        if not get_search_backend().is_available():
             return jsonify({
                 'error': 'API not configured',
                 'message': 'Exa API key not found. Please configure your .env file.'
@@ -212,43 +223,42 @@ def start_analysis():
             "research_plan": []
         }
         
-        # Run Phase 1 (Research & Analysis)
-        print(f"Starting Phase 1 analysis for: {brand_name}")
-        app1 = create_phase1_graph()
-        phase1_result = app1.invoke(initial_state)
-        
-        # Generate session ID
-        session_id = f"session_{len(analysis_sessions) + 1}"
-        analysis_sessions[session_id] = {
-            'brand': brand_name,
-            'data_source': data_source,
-            'state': phase1_result,
-            'phase': 'phase1_complete',
-            'timestamp': datetime.now().isoformat()
-        }
+        def store_phase1(phase1_result):
+            session_id = session_store.create(brand_name, data_source, phase1_result, 'phase1_complete')
+            
+            # Fold into the trend rollups
+            rollup_store.record(
+                brand_name,
+                phase1_result.get('sentiment_stats', {}),
+                phase1_result.get('risk_metrics', {}),
+                phase1_result.get('emotion_analysis', {})
+            )
+            
+            # Phase 1 results (returned by the job status endpoint)
+            return {
+                'session_id': session_id,
+                'brand': brand_name,
+                'phase': 'phase1_complete',
+                'sentiment_stats': phase1_result.get('sentiment_stats', {}),
+                'emotion_analysis': phase1_result.get('emotion_analysis', {}),
+                'risk_metrics': phase1_result.get('risk_metrics', {}),
+                'social_media_replies': phase1_result.get('social_media_replies', []),
+                'rag_findings': phase1_result.get('rag_findings_structured', []),
+                'research_plan': phase1_result.get('research_plan', [])
+            }
         
-        # Add to history for trend tracking
-        analysis_history.append({
-            'session_id': session_id,
-            'brand': brand_name,
-            'timestamp': datetime.now().isoformat(),
-            'sentiment_stats': phase1_result.get('sentiment_stats', {}),
-            'emotion_analysis': phase1_result.get('emotion_analysis', {}),
-            'risk_metrics': phase1_result.get('risk_metrics', {})
-        })
+        # Queue Phase 1 (Research & Analysis)
+        print(f"Queueing Phase 1 analysis for: {brand_name}")
+        job = job_manager.submit('phase1', get_phase1_graph(), initial_state, store_phase1,
+                                 expected_nodes=PHASE1_NODES)
         
-        # Return Phase 1 results
         return jsonify({
-            'session_id': session_id,
+            'job_id': job.id,
+            'status': job.status,
             'brand': brand_name,
-            'phase': 'phase1_complete',
-            'sentiment_stats': phase1_result.get('sentiment_stats', {}),
-            'emotion_analysis': phase1_result.get('emotion_analysis', {}),
-            'risk_metrics': phase1_result.get('risk_metrics', {}),
-            'social_media_replies': phase1_result.get('social_media_replies', []),
-            'rag_findings': phase1_result.get('rag_findings_structured', []),
-            'research_plan': phase1_result.get('research_plan', [])
-        })
+            'status_url': f'/api/jobs/{job.id}',
+            'events_url': f'/api/jobs/{job.id}/events'
+        }), 202
         
     except Exception as e:
         print(f"Error in analysis: {str(e)}")
@@ -257,17 +267,92 @@ def start_analysis():
             'message': str(e)
         }), 500
 
+@app.route('/api/analyze/batch', methods=['POST'])
+def start_batch_analysis():
+    """
+    Start Phase 1 for several brands at once (e.g. a brand and its competitors)
+    Expected payload: { "brands": ["Tesla", "Rivian", "Lucid"], "data_source": "All Sources" }
+    
+    Research runs in parallel, shared articles and chunks are embedded once,
+    and the job result holds one session per brand plus a cross-brand comparison.
+    """
+    try:
+        data = request.get_json() or {}
+        brands = list(dict.fromkeys(b.strip() for b in data.get('brands', []) if isinstance(b, str) and b.strip()))
+        data_source = data.get('data_source', 'All Sources')
+        
+        if not brands:
+            return jsonify({'error': 'At least one brand is required'}), 400
+        if len(brands) > BATCH_MAX_BRANDS:
+            return jsonify({'error': f'At most {BATCH_MAX_BRANDS} brands per batch'}), 400
+        
+        if not get_search_backend().is_available():
+            return jsonify({
+                'error': 'API not configured',
+                'message': 'Exa API key not found. Please configure your .env file.'
+            }), 503
+        
+        def store_batch(batch_result):
+            results = {}
+            for brand, phase1_result in batch_result['brands'].items():
+                session_id = session_store.create(brand, data_source, phase1_result, 'phase1_complete')
+                rollup_store.record(
+                    brand,
+                    phase1_result.get('sentiment_stats', {}),
+                    phase1_result.get('risk_metrics', {}),
+                    phase1_result.get('emotion_analysis', {})
+                )
+                results[brand] = {
+                    'session_id': session_id,
+                    'brand': brand,
+                    'phase': 'phase1_complete',
+                    'sentiment_stats': phase1_result.get('sentiment_stats', {}),
+                    'emotion_analysis': phase1_result.get('emotion_analysis', {}),
+                    'risk_metrics': phase1_result.get('risk_metrics', {}),
+                    'social_media_replies': phase1_result.get('social_media_replies', []),
+                    'rag_findings': phase1_result.get('rag_findings_structured', []),
+                    'research_plan': phase1_result.get('research_plan', [])
+                }
+            return {
+                'brands': results,
+                'comparison': batch_result['comparison'],
+                'sharing': batch_result['sharing'],
+                'timings': batch_result['timings']
+            }
+        
+        print(f"Queueing batch Phase 1 analysis for: {', '.join(brands)}")
+        job = job_manager.submit_task('phase1_batch', lambda job: run_batch_phase1(brands, job.record_steps),
+                                      store_batch, expected_nodes=batch_nodes(brands))
+        
+        return jsonify({
+            'job_id': job.id,
+            'status': job.status,
+            'brands': brands,
+            'status_url': f'/api/jobs/{job.id}',
+            'events_url': f'/api/jobs/{job.id}/events'
+        }), 202
+        
+    except Exception as e:
+        print(f"Error in batch analysis: {str(e)}")
+        return jsonify({
+            'error': 'Batch analysis failed',
+            'message': str(e)
+        }), 500
+
 @app.route('/api/analyze/<session_id>/finalize', methods=['POST'])
 def finalize_analysis(session_id):
     """
     Finalize analysis with approved replies
     Expected payload: { "approved_replies": [...] }
+    
+    With ?stream=1 the response is the job's server-sent event stream,
+    including a `token` event per chunk of the strategy report as it is written.
     """
     try:
-        if session_id not in analysis_sessions:
+        session = session_store.get(session_id)
+        if session is None:
             return jsonify({'error': 'Session not found'}), 404
         
-        session = analysis_sessions[session_id]
         data = request.get_json()
         approved_replies = data.get('approved_replies', [])
         
@@ -275,25 +360,36 @@ def finalize_analysis(session_id):
         current_state = session['state']
         current_state['social_media_replies'] = approved_replies
         
-        # Run Phase 2 (Strategy & Report)
-        print(f"Starting Phase 2 for session: {session_id}")
-        app2 = create_phase2_graph()
-        phase2_result = app2.invoke(current_state)
-        
-        # Update session
-        session['state'] = phase2_result
-        session['phase'] = 'complete'
+        def store_phase2(phase2_result):
+            # Update session
+            session_store.update(session_id, state=phase2_result, phase='complete')
+            
+            # Final report (returned by the job status endpoint)
+            final_report = phase2_result.get('final_report') or phase2_result.get('draft_report') or "Report generation failed"
+            
+            return {
+                'session_id': session_id,
+                'phase': 'complete',
+                'final_report': final_report,
+                'sentiment_stats': phase2_result.get('sentiment_stats', {}),
+                'risk_metrics': phase2_result.get('risk_metrics', {})
+            }
         
-        # Return final report
-        final_report = phase2_result.get('final_report') or phase2_result.get('draft_report') or "Report generation failed"
+        # Queue Phase 2 (Strategy & Report)
+        print(f"Queueing Phase 2 for session: {session_id}")
+        stream = request.args.get('stream', '').lower() in ('1', 'true', 'yes')
+        job = job_manager.submit('phase2', get_phase2_graph(), current_state, store_phase2,
+                                 expected_nodes=PHASE2_NODES, stream_report=stream)
+        if stream:
+            return job_event_response(job)
         
         return jsonify({
+            'job_id': job.id,
+            'status': job.status,
             'session_id': session_id,
-            'phase': 'complete',
-            'final_report': final_report,
-            'sentiment_stats': phase2_result.get('sentiment_stats', {}),
-            'risk_metrics': phase2_result.get('risk_metrics', {})
-        })
+            'status_url': f'/api/jobs/{job.id}',
+            'events_url': f'/api/jobs/{job.id}/events'
+        }), 202
         
     except Exception as e:
         print(f"Error in finalization: {str(e)}")
@@ -302,13 +398,61 @@ def finalize_analysis(session_id):
             'message': str(e)
         }), 500
 
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get status, per-node progress and (when done) the result of an analysis job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
+
+SSE_HEARTBEAT_SECONDS = 15
+
+def job_event_response(job, start=0):
+    """Server-sent event stream of a job's events from index `start` until it finishes"""
+    def generate():
+        index = start
+        while True:
+            events = job.events_since(index, timeout=SSE_HEARTBEAT_SECONDS)
+            if not events:
+                # Comment line keeps proxies from closing an idle stream
+                yield ": heartbeat\n\n"
+                continue
+            for event in events:
+                yield f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event, default=str)}\n\n"
+                if event['event'] in ('done', 'failed'):
+                    return
+            index += len(events)
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def stream_job_events(job_id):
+    """
+    Server-sent events for an analysis job: one event per completed graph node
+    (with timing and the node's partial results), then `done` or `failed`.
+    Reconnecting clients resume after the Last-Event-ID they received.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    try:
+        start = int(request.headers.get('Last-Event-ID', -1)) + 1
+    except ValueError:
+        start = 0
+    return job_event_response(job, start)
+
 @app.route('/api/session/<session_id>', methods=['GET'])
 def get_session(session_id):
     """Get session details"""
-    if session_id not in analysis_sessions:
+    session = session_store.get(session_id)
+    if session is None:
         return jsonify({'error': 'Session not found'}), 404
     
-    session = analysis_sessions[session_id]
     state = session['state']
     
     return jsonify({
@@ -330,224 +474,213 @@ def get_config():
         'huggingface_configured': bool(os.getenv('HUGGINGFACEHUB_API_TOKEN'))
     })
 
+@app.route('/api/stats', methods=['GET'])
+def get_stats():
+    """Get runtime statistics for shared resources (model registry, caches)"""
+    return jsonify({
+        'embeddings': get_embedding_stats(),
+        'search_cache': search_cache.stats(),
+        'llm_cache': get_llm_cache_stats(),
+        'llm_pool': get_llm_pool_stats(),
+        'jobs': job_manager.stats(),
+        'sessions': session_store.stats(),
+        'users': user_store.stats(),
+        'password_hashing': password_hasher.stats(),
+        'monitor': monitor_scheduler.stats()
+    })
+
+def _monitor_summary(info, points=1):
+    series = monitor_store.series(info['brand'], limit=points)
+    latest = series[-1] if series else {}
+    return {
+        **info,
+        'last_error': monitor_scheduler.last_errors.get(info['brand']),
+        'sentiment_stats': latest.get('sentiment_stats', {}),
+        'risk_metrics': latest.get('risk_metrics', {}),
+        'emotion_scores': latest.get('emotion_scores', {}),
+        'series': series if points > 1 else None
+    }
+
+@app.route('/api/monitor', methods=['GET'])
+def list_monitored_brands():
+    """List monitored brands with their watermark and latest window stats"""
+    return jsonify({
+        'brands': [_monitor_summary(info) for info in monitor_store.list_brands()],
+        'scheduler': monitor_scheduler.stats()
+    })
+
+@app.route('/api/monitor', methods=['POST'])
+def register_monitored_brand():
+    """
+    Start (or re-time) continuous monitoring of a brand
+    Expected payload: { "brand": "Tesla", "interval": 900 }
+    """
+    data = request.get_json() or {}
+    brand = data.get('brand', '').strip()
+    if not brand:
+        return jsonify({'error': 'Brand name is required'}), 400
+    try:
+        interval = float(data.get('interval', MONITOR_DEFAULT_INTERVAL))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'interval must be a number of seconds'}), 400
+    if interval < MONITOR_MIN_INTERVAL:
+        return jsonify({'error': f'interval must be at least {MONITOR_MIN_INTERVAL:.0f} seconds'}), 400
+    
+    info = monitor_store.register(brand, interval)
+    monitor_scheduler.wake()
+    return jsonify(info), 201
+
+@app.route('/api/monitor/<brand>', methods=['GET'])
+def get_monitored_brand(brand):
+    """Latest stats and the per-cycle sentiment/emotion series of a monitored brand"""
+    info = monitor_store.get_brand(brand)
+    if info is None:
+        return jsonify({'error': 'Brand is not monitored'}), 404
+    try:
+        points = max(1, min(int(request.args.get('points', 100)), 1000))
+    except ValueError:
+        return jsonify({'error': 'points must be an integer'}), 400
+    return jsonify(_monitor_summary(info, points=points))
+
+@app.route('/api/monitor/<brand>', methods=['DELETE'])
+def unregister_monitored_brand(brand):
+    """Stop monitoring a brand and drop its stored mentions and series"""
+    if not monitor_store.unregister(brand):
+        return jsonify({'error': 'Brand is not monitored'}), 404
+    return jsonify({'message': f'Stopped monitoring {brand}'}), 200
+
+def _bucket_date(bucket_start):
+    return datetime.fromtimestamp(bucket_start).isoformat()
+
 @app.route('/api/insights', methods=['GET'])
 def get_insights():
-    """Get insights from recent analysis sessions"""
+    """Get sentiment/risk timeline from the rollups of recent analyses"""
     try:
         # Get time range parameter (default to 7 days)
         days = int(request.args.get('days', 7))
+        brand = request.args.get('brand') or None
         
-        # Get recent sessions from history
-        from datetime import timedelta
-        cutoff_date = datetime.now() - timedelta(days=days)
-        
-        recent_analyses = [
-            item for item in analysis_history 
-            if datetime.fromisoformat(item['timestamp']) >= cutoff_date
-        ]
-        
-        # If no real data, generate sample data for the last 4 days
-        if not recent_analyses:
-            # Generate sample data
-            sample_data = []
-            for i in range(4):
-                date = datetime.now() - timedelta(days=i)
-                sample_data.append({
-                    'date': date.isoformat(),
-                    'sentiment': {
-                        'positive': 70 + (i * 2),
-                        'neutral': 20 - i,
-                        'negative': 10 - i
-                    },
-                    'aspects': [
-                        {'name': 'Product Design', 'mentions': 642 - (i * 50), 'trend': 'up'},
-                        {'name': 'Price & Value', 'mentions': 412 - (i * 30), 'trend': 'neutral'},
-                        {'name': 'Performance', 'mentions': 891 - (i * 70), 'trend': 'up'},
-                        {'name': 'User Experience', 'mentions': 225 - (i * 20), 'trend': 'down'}
-                    ],
-                    'total_mentions': 2170 - (i * 170)
-                })
-            
-            return jsonify({
-                'timeRange': f'{days}d',
-                'dataPoints': sample_data,
-                'totalSessions': 0,
-                'momentum': {
-                    'positive': 12.4,
-                    'negative': -2.1,
-                    'stability': 88
-                }
-            })
+        # Hourly buckets for short ranges, daily otherwise
+        granularity = 'hour' if days <= 2 else 'day'
+        buckets = rollup_store.query(granularity, time.time() - days * 86400, brand=brand)
         
-        # Process real session data
-        timeline_data = []
-        total_positive = 0
-        total_neutral = 0
-        total_negative = 0
+        # Group brand rows by time bucket
+        by_time = OrderedDict()
+        for bucket in buckets:
+            by_time.setdefault(bucket['bucket_start'], []).append(bucket)
         
-        for analysis in recent_analyses:
-            sentiment_stats = analysis.get('sentiment_stats', {})
-            
+        timeline_data = []
+        previous_mentions = {}
+        for start, group in by_time.items():
+            merged = merge_buckets(group)
+            aspects = []
+            for bucket in group:
+                previous = previous_mentions.get(bucket['brand'])
+                trend = ('neutral' if previous is None or previous == bucket['mentions']
+                         else 'up' if bucket['mentions'] > previous else 'down')
+                previous_mentions[bucket['brand']] = bucket['mentions']
+                aspects.append({
+                    'name': bucket['brand'],
+                    'mentions': bucket['mentions'],
+                    'trend': trend,
+                    'risk_score': bucket['avg_risk_score']
+                })
             timeline_data.append({
-                'brand': analysis.get('brand'),
-                'session_id': analysis.get('session_id'),
-                'timestamp': analysis.get('timestamp'),
-                'sentiment': sentiment_stats,
-                'emotion': analysis.get('emotion_analysis', {}),
-                'risk': analysis.get('risk_metrics', {})
+                'date': _bucket_date(start),
+                'sentiment': merged['sentiment'],
+                'total_mentions': merged['mentions'],
+                'analyses': merged['analyses'],
+                'risk_score': merged['avg_risk_score'],
+                'emotions': merged['emotions'],
+                'aspects': aspects
             })
-            
-            # Aggregate sentiment
-            if sentiment_stats:
-                total_positive += sentiment_stats.get('positive_ratio', 0)
-                total_neutral += sentiment_stats.get('neutral_ratio', 0)
-                total_negative += sentiment_stats.get('negative_ratio', 0)
-        
-        avg_count = len(recent_analyses) if recent_analyses else 1
+        timeline_data.reverse()  # Newest first
+        
+        overall = merge_buckets(buckets)
+        
+        # Momentum: latest bucket vs the range average; stability falls as negative share swings
+        momentum = {'positive': 0.0, 'negative': 0.0, 'stability': 100}
+        if timeline_data:
+            latest = timeline_data[0]['sentiment']
+            negative_shares = [point['sentiment']['negative'] for point in timeline_data]
+            momentum = {
+                'positive': round(latest['positive'] - overall['sentiment']['positive'], 2),
+                'negative': round(latest['negative'] - overall['sentiment']['negative'], 2),
+                'stability': round(max(0.0, 100 - statistics.pstdev(negative_shares)), 1)
+            }
         
         return jsonify({
             'timeRange': f'{days}d',
-            'totalSessions': len(recent_analyses),
-            'timeline': timeline_data,
-            'averageSentiment': {
-                'positive': round((total_positive / avg_count) * 100, 2),
-                'neutral': round((total_neutral / avg_count) * 100, 2),
-                'negative': round((total_negative / avg_count) * 100, 2)
-            },
-            'momentum': {
-                'positive': round((total_positive / avg_count) * 100 - 60, 2),
-                'negative': round((total_negative / avg_count) * 100 - 10, 2),
-                'stability': 88
-            }
+            'granularity': granularity,
+            'dataPoints': timeline_data,
+            'totalSessions': overall['analyses'],
+            'totalMentions': overall['mentions'],
+            'averageSentiment': overall['sentiment'],
+            'averageRiskScore': overall['avg_risk_score'],
+            'emotions': overall['emotions'],
+            'momentum': momentum
         })
         
     except Exception as e:
         print(f"Error getting insights: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+RECENT_COMMENT_SESSIONS = 5
+
 @app.route('/api/trends', methods=['GET'])
 def get_trends():
-    """Get trend analysis from recent sessions"""
+    """Get per-brand trend analysis from the daily rollups"""
     try:
         days = int(request.args.get('days', 30))
-        
-        # Get all sessions
-        sessions_data = []
-        for session_id, session_data in analysis_sessions.items():
-            state = session_data.get('state', {})
-            sessions_data.append({
-                'brand': session_data.get('brand'),
-                'sentiment': state.get('sentiment_stats', {}),
-                'replies': state.get('social_media_replies', []),
-                'findings': state.get('rag_findings_structured', [])
-            })
-        
-        # If no real data, generate sample data
-        if not sessions_data:
-            return jsonify({
-                'timeRange': f'{days}days',
-                'totalComments': 14242,
-                'aspects': [
-                    {
-                        'name': 'Design',
-                        'sentiment': {'positive': 82, 'neutral': 12, 'negative': 6},
-                        'themes': {
-                            'positive': [
-                                {'text': 'Sleek side profile', 'count': 244},
-                                {'text': 'Minimalist interior', 'count': 189},
-                                {'text': 'Headlight signature', 'count': 112},
-                                {'text': 'Wheel design', 'count': 94}
-                            ],
-                            'negative': [
-                                {'text': 'Front grill size', 'count': 112},
-                                {'text': 'Plastic dash trim', 'count': 76},
-                                {'text': 'Rear visibility', 'count': 43}
-                            ]
-                        }
-                    },
-                    {
-                        'name': 'Price',
-                        'sentiment': {'positive': 45, 'neutral': 30, 'negative': 25},
-                        'themes': {
-                            'positive': [
-                                {'text': 'Good value for features', 'count': 156}
-                            ],
-                            'negative': [
-                                {'text': 'Too expensive', 'count': 198},
-                                {'text': 'Long wait times', 'count': 87}
-                            ]
-                        }
-                    },
-                    {
-                        'name': 'Performance',
-                        'sentiment': {'positive': 74, 'neutral': 16, 'negative': 10},
-                        'themes': {
-                            'positive': [
-                                {'text': 'Quick acceleration', 'count': 221},
-                                {'text': 'Smooth handling', 'count': 167}
-                            ],
-                            'negative': [
-                                {'text': 'Range concerns', 'count': 89}
-                            ]
-                        }
-                    },
-                    {
-                        'name': 'UX & Comfort',
-                        'sentiment': {'positive': 61, 'neutral': 20, 'negative': 19},
-                        'themes': {
-                            'positive': [
-                                {'text': 'Comfortable seats', 'count': 198},
-                                {'text': 'Good lumbar support', 'count': 134}
-                            ],
-                            'negative': [
-                                {'text': 'Infotainment lag', 'count': 112},
-                                {'text': 'Complex controls', 'count': 76}
-                            ]
-                        }
-                    }
-                ],
-                'recentComments': [
-                    {
-                        'text': 'The side profile of the new model is absolutely stunning. They finally got the proportions right.',
-                        'aspect': 'Design',
-                        'sentiment': 'positive',
-                        'timestamp': '2 min ago'
-                    },
-                    {
-                        'text': 'Why is the front grill so massive? It ruins the otherwise elegant aesthetic.',
-                        'aspect': 'Design',
-                        'sentiment': 'negative',
-                        'timestamp': '14 min ago'
-                    },
-                    {
-                        'text': 'Acceleration is punchy, but the infotainment system lags when switching between apps.',
-                        'aspect': 'UX',
-                        'sentiment': 'neutral',
-                        'timestamp': '45 min ago'
-                    }
-                ]
+        since = time.time() - days * 86400
+        
+        buckets = rollup_store.query('day', since)
+        per_brand = OrderedDict()
+        for bucket in buckets:
+            per_brand.setdefault(bucket['brand'], []).append(bucket)
+        
+        aspects = []
+        for brand, group in per_brand.items():
+            merged = merge_buckets(group)
+            aspects.append({
+                'name': brand,
+                'sentiment': merged['sentiment'],
+                'mentions': merged['mentions'],
+                'analyses': merged['analyses'],
+                'risk_score': merged['avg_risk_score'],
+                'max_risk_score': merged['risk_score_max'],
+                'emotions': merged['emotions'],
+                'timeline': [{
+                    'date': _bucket_date(bucket['bucket_start']),
+                    'sentiment': bucket['sentiment'],
+                    'mentions': bucket['mentions'],
+                    'risk_score': bucket['avg_risk_score']
+                } for bucket in group],
+                'themes': {'positive': [], 'negative': []}
             })
-        
-        # Process real data
-        all_replies = []
-        aspect_sentiment = {}
-        
-        for session in sessions_data:
-            replies = session.get('replies', [])
-            all_replies.extend(replies)
-            
-            sentiment = session.get('sentiment', {})
-            brand = session.get('brand', 'Unknown')
-            
-            if brand not in aspect_sentiment:
-                aspect_sentiment[brand] = sentiment
+        aspects.sort(key=lambda aspect: aspect['mentions'], reverse=True)
+        overall = merge_buckets(buckets)
+        
+        # Negative mentions the latest analyses drafted replies for
+        recent_comments = []
+        for session_data in session_store.list_sessions(since=since, include_state=True,
+                                                        limit=RECENT_COMMENT_SESSIONS):
+            for reply in session_data['state'].get('social_media_replies', []):
+                recent_comments.append({
+                    'text': reply.get('content', ''),
+                    'aspect': session_data['brand'],
+                    'sentiment': 'negative',
+                    'source': reply.get('source', 'Unknown'),
+                    'timestamp': datetime.fromtimestamp(session_data['updated_at']).isoformat()
+                })
         
         return jsonify({
             'timeRange': f'{days}days',
-            'totalSessions': len(sessions_data),
-            'totalComments': len(all_replies),
-            'aspects': aspect_sentiment,
-            'recentComments': all_replies[:10] if all_replies else []
+            'totalSessions': overall['analyses'],
+            'totalComments': overall['mentions'],
+            'averageSentiment': overall['sentiment'],
+            'aspects': aspects,
+            'recentComments': recent_comments[:10]
         })
         
     except Exception as e:
@@ -558,4 +691,13 @@ if __name__ == '__main__':
     print("🚀 Starting BrandShield AI API Server...")
     print("📡 API will be available at: http://localhost:5000")
     print("🔑 Make sure your .env file is configured with API keys")
+    # Fork the hashing workers before the model and server threads exist
+    password_hasher.start()
+    # Load the embedding model once so the first analysis doesn't pay for it
+    warm_embeddings()
+    warm_graphs()
+    loaded_indexes = preload_brand_indexes(get_cached_embeddings())
+    print(f"💾 Loaded {loaded_indexes} persisted brand vector indexes")
+    if MONITOR_ENABLED:
+        monitor_scheduler.start()
     app.run(debug=True, host='0.0.0.0', port=5000, use_reloader=False)
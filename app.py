@@ -8,16 +8,20 @@ import plotly.graph_objects as go
 from dotenv import load_dotenv
 import os
 import sys
+import queue
+import threading
 
 # Add src to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from src.graph import create_phase1_graph, create_phase2_graph
-from src.state import AgentState
-
-# Load environment variables
+# Load environment variables (before src imports - modules read settings at import time)
 load_dotenv()
 
+from src.graph import get_phase1_graph, get_phase2_graph
+from src.agents import REPORT_TOKEN_CALLBACK
+from src.state import AgentState
+from src.search import get_search_backend
+
 # Page configuration
 st.set_page_config(
     page_title="BrandShield - AI Crisis Predictor",
@@ -221,8 +225,8 @@ def main():
             st.error("⚠️ Please enter a brand name")
             return
         
-        # Check for API key before starting
-        if not os.getenv("EXA_API_KEY"):
+        # Check for API key before starting (not needed when replaying recorded searches)
+        if not get_search_backend().is_available():
             st.error("❌ Exa API key not configured! Please add EXA_API_KEY to your .env file.")
             st.info("Get a free API key at: https://exa.ai/")
             st.stop()
@@ -244,7 +248,7 @@ def main():
             st.write("💬 Social Media Agent: Drafting response strategies...")
             
             try:
-                app1 = create_phase1_graph()
+                app1 = get_phase1_graph()
                 result = app1.invoke(st.session_state.current_state)
                 st.session_state.current_state = result
                 st.session_state.analysis_stage = "phase1_done"
@@ -301,8 +305,34 @@ def main():
             st.write("📝 Critic Agent: Reviewing and refining...")
             
             try:
-                app2 = create_phase2_graph()
-                result = app2.invoke(st.session_state.current_state)
+                app2 = get_phase2_graph()
+                # Run the graph in a worker thread and render the report as it streams in
+                tokens = queue.Queue()
+                outcome = {}
+                config = {"configurable": {REPORT_TOKEN_CALLBACK: lambda token, revision: tokens.put((token, revision))}}
+                
+                def run_phase2(state):
+                    try:
+                        outcome["result"] = app2.invoke(state, config)
+                    except Exception as e:
+                        outcome["error"] = e
+                    finally:
+                        tokens.put(None)
+                
+                def report_stream():
+                    current_revision = None
+                    while (item := tokens.get()) is not None:
+                        token, revision = item
+                        if current_revision is not None and revision != current_revision:
+                            yield "\n\n---\n\n*✍️ Revising after Critic review...*\n\n"
+                        current_revision = revision
+                        yield token
+                
+                threading.Thread(target=run_phase2, args=(st.session_state.current_state,), daemon=True).start()
+                st.write_stream(report_stream())
+                if "error" in outcome:
+                    raise outcome["error"]
+                result = outcome["result"]
                 st.session_state.current_state = result
                 st.session_state.analysis_stage = "complete"
                 status.update(label="✅ Strategy Generation Complete!", state="complete", expanded=False)
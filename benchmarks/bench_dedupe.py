@@ -0,0 +1,93 @@
+"""
+Near-duplicate dedupe benchmark on synthetic mentions.
+
+Builds a corpus where a share of the stories is syndicated (copied under
+other URLs with small edits, e.g. a wire-service footer), times
+dedupe_mentions, checks that every syndicated copy was folded into its
+original, and reports how much downstream work (chunks to embed, VADER
+scoring) the collapsed copies would have cost.
+
+Usage:
+    python benchmarks/bench_dedupe.py --mentions 20000
+    python benchmarks/bench_dedupe.py --mentions 20000 --syndicated-share 0.5 --copies 4
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from src.agents import article_document, split_articles
+from src.advanced_agents import score_sentiment
+from src.dedupe import dedupe_mentions
+from src.state import Mention
+
+WORDS = ("battery recall customers support update launch price delay review outage refund "
+         "safety fire screen crash software service store delivery quality warranty").split()
+
+
+def make_corpus(stories, syndicated_share, copies, seed=42):
+    """Mentions plus the story each one is a copy of."""
+    rng = random.Random(seed)
+    now = time.time()
+    mentions, story_of = [], []
+    for story in range(stories):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(80, 200))] + [f"story{story}"]
+        published = now - rng.uniform(0, 86400)
+        versions = 1 + (copies if rng.random() < syndicated_share else 0)
+        for copy in range(versions):
+            text = list(words)
+            if copy:
+                # Syndicated copies: at most one word changed, plus an outlet footer
+                for _ in range(rng.randint(0, 1)):
+                    text[rng.randrange(len(text))] = rng.choice(WORDS)
+                text += ["via", f"outlet{copy}"]
+            mentions.append(Mention(f"https://outlet{copy}.com/news/{story}", title=f"Story {story}",
+                                    text=" ".join(text), published_timestamp=published + copy * 60))
+            story_of.append(story)
+    return mentions, story_of
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark near-duplicate mention dedupe")
+    parser.add_argument("--mentions", type=int, default=20000, help="Approximate corpus size")
+    parser.add_argument("--syndicated-share", type=float, default=0.3, help="Fraction of stories syndicated")
+    parser.add_argument("--copies", type=int, default=3, help="Extra copies per syndicated story")
+    args = parser.parse_args()
+
+    stories = max(1, int(args.mentions / (1 + args.syndicated_share * args.copies)))
+    mentions, story_of = make_corpus(stories, args.syndicated_share, args.copies)
+    story_by_url = {item.url: story for item, story in zip(mentions, story_of)}
+
+    start = time.perf_counter()
+    deduped = dedupe_mentions(list(mentions))
+    dedupe_seconds = time.perf_counter() - start
+
+    kept_stories = [story_by_url[item.url] for item in deduped]
+    exact = len(set(kept_stories)) == len(kept_stories) == stories
+
+    start = time.perf_counter()
+    score_sentiment(mentions)
+    vader_all = time.perf_counter() - start
+    start = time.perf_counter()
+    score_sentiment(deduped)
+    vader_deduped = time.perf_counter() - start
+
+    chunks_all = len(split_articles([article_document(item, i) for i, item in enumerate(mentions)]))
+    chunks_deduped = len(split_articles([article_document(item, i) for i, item in enumerate(deduped)]))
+
+    print(f"\n📊 DEDUPE BENCHMARK ({len(mentions)} mentions, {stories} stories)")
+    print(f"   dedupe                 {dedupe_seconds * 1000:10.1f} ms")
+    print(f"   canonical mentions     {len(deduped):10d}   (one per story: {'yes' if exact else 'NO'})")
+    print(f"   copies accounted for   {sum(item.duplicate_count for item in deduped):10d}")
+    print(f"   chunks to embed        {chunks_all:10d} -> {chunks_deduped}")
+    print(f"   VADER scoring          {vader_all * 1000:10.1f} ms -> {vader_deduped * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
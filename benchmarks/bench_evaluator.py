@@ -0,0 +1,140 @@
+"""
+Evaluator benchmark on synthetic mentions.
+
+Times the vectorized evaluator_agent against the previous per-item
+implementation (parse every published_date, format time_ago and
+formatted_date for every mention, sort with a key function), checks
+both keep the same mentions in the same order, and times formatting the
+display strings for only the items a report shows.
+
+Usage:
+    python benchmarks/bench_evaluator.py --mentions 100000
+    python benchmarks/bench_evaluator.py --mentions 100000 --repeat 5 --window-share 0.5
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+from datetime import datetime, timedelta
+
+import pytz
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from src.agents import evaluator_agent, format_time_ago, format_published_date, TIME_WINDOW_DAYS
+from src.state import Mention
+
+
+def make_mentions(count, window_share, seed=42):
+    """Mentions as the search backends return them; `window_share` of them inside the window."""
+    rng = random.Random(seed)
+    now = time.time()
+    window = TIME_WINDOW_DAYS * 86400
+    mentions = []
+    for i in range(count):
+        # A minute clear of the window edge, so both evaluators agree whatever their "now"
+        age = rng.uniform(-600, window - 60) if rng.random() < window_share else rng.uniform(window + 60, 3 * window)
+        published = datetime.fromtimestamp(now - age, tz=pytz.UTC)
+        mentions.append({
+            "title": f"Mention {i}",
+            "url": f"https://example.com/mention/{i}",
+            "text": "Customers are discussing the product.",
+            "published_date": published.isoformat(),
+            "published_timestamp": published.timestamp(),
+        })
+    return mentions
+
+
+def legacy_evaluator(raw_content):
+    """The per-item evaluator this benchmark replaces (kept for comparison)."""
+    current_time = datetime.now(pytz.UTC)
+    two_days_ago = current_time - timedelta(days=TIME_WINDOW_DAYS)
+    filtered_content = []
+    for item in raw_content:
+        try:
+            if isinstance(item['published_date'], str):
+                pub_datetime = datetime.fromisoformat(item['published_date'].replace('Z', '+00:00'))
+            else:
+                pub_datetime = item['published_date']
+            if pub_datetime.tzinfo is None:
+                pub_datetime = pytz.UTC.localize(pub_datetime)
+            if pub_datetime >= two_days_ago:
+                time_diff = current_time - pub_datetime
+                if time_diff.total_seconds() < 0:
+                    item['time_ago'] = "Just now"
+                    item['hours_ago'] = 0
+                    item['is_recent'] = True
+                    item['formatted_date'] = pub_datetime.strftime("%B %d, %Y at %I:%M %p UTC")
+                    filtered_content.append(item)
+                    continue
+                if time_diff.total_seconds() < 3600:
+                    minutes = int(time_diff.total_seconds() / 60)
+                    time_ago = f"{minutes} minute{'s' if minutes != 1 else ''} ago"
+                elif time_diff.total_seconds() < 86400:
+                    hours = int(time_diff.total_seconds() / 3600)
+                    time_ago = f"{hours} hour{'s' if hours != 1 else ''} ago"
+                else:
+                    days = int(time_diff.total_seconds() / 86400)
+                    hours = int((time_diff.total_seconds() % 86400) / 3600)
+                    time_ago = f"{days} day{'s' if days != 1 else ''}, {hours} hour{'s' if hours != 1 else ''} ago"
+                item['time_ago'] = time_ago
+                item['hours_ago'] = time_diff.total_seconds() / 3600
+                item['is_recent'] = time_diff.total_seconds() < 21600
+                item['formatted_date'] = pub_datetime.strftime("%B %d, %Y at %I:%M %p UTC")
+                filtered_content.append(item)
+        except Exception:
+            item['time_ago'] = "Unknown"
+            item['formatted_date'] = "Date unavailable"
+            item['is_recent'] = False
+            filtered_content.append(item)
+    filtered_content.sort(key=lambda x: x.get('hours_ago', 999), reverse=False)
+    return filtered_content
+
+
+def _time(fn, repeat, setup=lambda: None):
+    samples, result = [], None
+    for _ in range(repeat):
+        arg = setup()
+        start = time.perf_counter()
+        result = fn(arg)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the evaluator's time filtering")
+    parser.add_argument("--mentions", type=int, default=100000)
+    parser.add_argument("--window-share", type=float, default=0.7, help="Fraction of mentions inside the window")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--display", type=int, default=20, help="Items whose display strings are formatted")
+    args = parser.parse_args()
+
+    # Fresh copies per run (made outside the timer), since both evaluators annotate the mentions.
+    # The legacy loop gets plain dicts; evaluator_agent gets Mention records, as from search_agent.
+    mentions = make_mentions(args.mentions, args.window_share)
+    copy = lambda: [dict(m) for m in mentions]
+    records = lambda: [Mention.from_dict(m) for m in mentions]
+
+    legacy_seconds, legacy = _time(legacy_evaluator, args.repeat, copy)
+    vector_seconds, state = _time(lambda raw: evaluator_agent({"raw_content": raw}), args.repeat, records)
+    vectorized = state["filtered_content"]
+
+    same = [m["url"] for m in legacy] == [m["url"] for m in vectorized]
+    display_seconds, _ = _time(lambda shown: [(format_time_ago(m["published_timestamp"]),
+                                               format_published_date(m["published_timestamp"]))
+                                              for m in shown], args.repeat, lambda: vectorized[:args.display])
+
+    print(f"\n📊 EVALUATOR BENCHMARK ({args.mentions} mentions, {len(vectorized)} in window)")
+    print(f"   legacy per-item loop   {legacy_seconds * 1000:10.1f} ms")
+    print(f"   vectorized             {vector_seconds * 1000:10.1f} ms   ({legacy_seconds / vector_seconds:.1f}x)")
+    print(f"   display strings (top {args.display}) {display_seconds * 1000:8.3f} ms")
+    print(f"   same mentions and order: {'yes' if same else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
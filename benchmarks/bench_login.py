@@ -0,0 +1,125 @@
+"""
+Login throughput benchmark.
+
+Serves the API on a local port, fires concurrent logins at it and, at the
+same time, probes /api/health to see how much the auth load slows down
+everything else. Runs once with hashing on the request threads (inline)
+and once with the process pool, using a throwaway user database.
+
+Usage:
+    python benchmarks/bench_login.py --clients 16 --duration 10
+    python benchmarks/bench_login.py --method pbkdf2:sha256:600000 --mode pool
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import statistics
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep benchmark users and caches out of the real data directory
+os.environ["BRANDSHIELD_CACHE_DIR"] = tempfile.mkdtemp(prefix="bench_login_")
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from werkzeug.serving import make_server
+
+import api_server
+from src.passwords import PasswordHasher, PASSWORD_HASH_METHOD, PASSWORD_HASH_WORKERS
+from src.user_store import UserStore
+
+EMAIL = "bench@brandshield.local"
+PASSWORD = "bench-password"
+
+
+def _percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def _request(url, payload=None):
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=60) as response:
+            status = response.status
+            response.read()
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return status, time.perf_counter() - start
+
+
+def _probe_health(base_url, stop, samples):
+    while not stop.is_set():
+        _, seconds = _request(f"{base_url}/api/health")
+        samples.append(seconds)
+        time.sleep(0.01)
+
+
+def run_mode(mode, base_url, clients, duration, method, workers):
+    api_server.password_hasher = PasswordHasher(method=method, workers=0 if mode == "inline" else workers)
+    api_server.password_hasher.start()
+    api_server.user_store = UserStore(db_path=os.path.join(os.environ["BRANDSHIELD_CACHE_DIR"], f"users_{mode}.sqlite3"))
+    _request(f"{base_url}/api/auth/register", {"email": EMAIL, "password": PASSWORD, "name": "Bench"})
+
+    # Idle baseline for /api/health
+    idle = [_request(f"{base_url}/api/health")[1] for _ in range(50)]
+
+    login_samples, health_samples, statuses = [], [], {}
+    stop = threading.Event()
+    prober = threading.Thread(target=_probe_health, args=(base_url, stop, health_samples))
+    prober.start()
+
+    def client():
+        while not stop.is_set():
+            status, seconds = _request(f"{base_url}/api/auth/login", {"email": EMAIL, "password": PASSWORD})
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == 200:
+                login_samples.append(seconds)
+
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        for _ in range(clients):
+            pool.submit(client)
+        time.sleep(duration)
+        stop.set()
+    prober.join()
+
+    print(f"\n   [{mode}] {len(login_samples) / duration:.1f} logins/s, statuses {statuses}")
+    print(f"   login        p50 {_percentile(login_samples, 50) * 1000:8.1f} ms   p99 {_percentile(login_samples, 99) * 1000:8.1f} ms")
+    print(f"   health idle  p50 {statistics.median(idle) * 1000:8.1f} ms   p99 {_percentile(idle, 99) * 1000:8.1f} ms")
+    print(f"   health load  p50 {_percentile(health_samples, 50) * 1000:8.1f} ms   p99 {_percentile(health_samples, 99) * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark login latency and its impact on other endpoints")
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent login clients")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds of load per mode")
+    parser.add_argument("--method", default=PASSWORD_HASH_METHOD, help="Werkzeug hash method")
+    parser.add_argument("--workers", type=int, default=max(1, PASSWORD_HASH_WORKERS), help="Hashing processes (pool mode)")
+    parser.add_argument("--mode", choices=["inline", "pool", "both"], default="both")
+    parser.add_argument("--port", type=int, default=5055)
+    args = parser.parse_args()
+
+    server = make_server("127.0.0.1", args.port, api_server.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    print(f"\n📊 LOGIN BENCHMARK ({args.method}, {args.clients} clients, {args.duration:.0f}s per mode)")
+    for mode in (["inline", "pool"] if args.mode == "both" else [args.mode]):
+        run_mode(mode, base_url, args.clients, args.duration, args.method, args.workers)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Mention memory benchmark.
+
+Measures what holding N evaluated mentions in session state costs per
+mention, as the previous free-form dicts (search fields plus the keys the
+evaluator used to add: time_ago, hours_ago, is_recent, formatted_date)
+versus Mention records. Title, URL and body strings are created before
+measuring, since both representations reference the same text. Also
+reports the session-store encoding size of the list.
+
+Usage:
+    python benchmarks/bench_mention_memory.py --mentions 100000
+"""
+import os
+import sys
+import gc
+import time
+import random
+import argparse
+import tracemalloc
+from datetime import datetime
+
+import pytz
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from src.agents import evaluator_agent, format_time_ago, format_published_date
+from src.session_store import encode_state
+from src.state import Mention
+
+DOMAINS = ["reddit.com", "twitter.com", "news.ycombinator.com", "theverge.com", "techcrunch.com"]
+
+
+def make_search_results(count, seed=42):
+    rng = random.Random(seed)
+    now = time.time()
+    results = []
+    for i in range(count):
+        published = datetime.fromtimestamp(now - rng.uniform(0, 2 * 86400 - 60), tz=pytz.UTC)
+        results.append({
+            "title": f"Mention {i} about the product",
+            "url": f"https://{DOMAINS[i % len(DOMAINS)]}/posts/{i}",
+            "text": f"Post {i}: customers are discussing the product, some happy, some not.",
+            "published_date": published.isoformat(),
+            "published_timestamp": published.timestamp(),
+        })
+    return results
+
+
+def legacy_records(results):
+    """Mention dicts as the previous evaluator left them in filtered_content."""
+    now = time.time()
+    records = []
+    for result in results:
+        record = dict(result)
+        age = now - record["published_timestamp"]
+        record["time_ago"] = format_time_ago(record["published_timestamp"], now)
+        record["hours_ago"] = age / 3600
+        record["is_recent"] = age < 21600
+        record["formatted_date"] = format_published_date(record["published_timestamp"])
+        records.append(record)
+    return records
+
+
+def mention_records(results):
+    """Mention records after evaluator_agent, as held in filtered_content now."""
+    mentions = [Mention.from_dict(result, source="exa") for result in results]
+    return evaluator_agent({"raw_content": mentions})["filtered_content"]
+
+
+def measure(build, results):
+    gc.collect()
+    tracemalloc.start()
+    records = build(results)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return records, current, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-mention memory in session state")
+    parser.add_argument("--mentions", type=int, default=100000)
+    args = parser.parse_args()
+
+    results = make_search_results(args.mentions)
+
+    print(f"\n📊 MENTION MEMORY BENCHMARK ({args.mentions} mentions)")
+    encoded = {}
+    for name, build in (("dict", legacy_records), ("Mention", mention_records)):
+        records, current, peak = measure(build, results)
+        encoded[name] = len(encode_state({"filtered_content": records}))
+        print(f"   {name:<8} {current / args.mentions:8.1f} B/mention retained   "
+              f"{current / 1e6:7.1f} MB total   (peak {peak / 1e6:.1f} MB)")
+        del records
+    for name, size in encoded.items():
+        print(f"   {name:<8} session blob {size / 1e6:7.2f} MB ({size / args.mentions:.1f} B/mention)")
+
+
+if __name__ == "__main__":
+    main()
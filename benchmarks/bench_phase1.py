@@ -0,0 +1,66 @@
+"""
+Phase-1 pipeline benchmark on replayed search results (no network needed).
+
+Serves recorded Exa fixtures (or a synthetic corpus grown from them) and
+times the search, evaluator, scoring and RAG stages at production volume.
+
+Record fixtures first with SEARCH_BACKEND=record, or run without any to
+use a synthetic seed mention.
+
+Usage:
+    python benchmarks/bench_phase1.py --mentions 10000
+    python benchmarks/bench_phase1.py --mentions 10000 --latency lognormal:-1.5,0.5 --skip-rag
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from src.search import ReplaySearchBackend, set_search_backend, SEARCH_FIXTURE_DIR
+from src.agents import search_agent, evaluator_agent, sentiment_scoring_agent, rag_agent
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark phase-1 stages on replayed search data")
+    parser.add_argument("--brand", default="Tesla")
+    parser.add_argument("--mentions", type=int, default=10000, help="Synthetic corpus size (0 = recordings as-is)")
+    parser.add_argument("--latency", default="none", help="Replay latency distribution, e.g. fixed:0.5")
+    parser.add_argument("--fixtures", default=SEARCH_FIXTURE_DIR)
+    parser.add_argument("--skip-rag", action="store_true", help="Skip embedding/FAISS/verification stage")
+    args = parser.parse_args()
+
+    set_search_backend(ReplaySearchBackend(fixture_dir=args.fixtures, latency=args.latency, scale_to=args.mentions))
+
+    state = {
+        "topic": args.brand,
+        "research_plan": [
+            f"{args.brand} customer reviews complaints",
+            f"{args.brand} problems bugs",
+            f"{args.brand} alternatives",
+        ],
+    }
+    stages = [("search", search_agent), ("evaluator", evaluator_agent), ("scoring", sentiment_scoring_agent)]
+    if not args.skip_rag:
+        stages.append(("rag_analysis", rag_agent))
+
+    timings = []
+    for name, agent in stages:
+        start = time.perf_counter()
+        # Branch nodes return partial updates
+        state.update(agent(state))
+        timings.append((name, time.perf_counter() - start))
+
+    print("\n📊 PHASE-1 BENCHMARK")
+    print(f"   Mentions: {len(state.get('raw_content', []))} raw, {len(state.get('filtered_content', []))} in window")
+    for name, seconds in timings:
+        print(f"   {name:<14} {seconds * 1000:10.1f} ms")
+    print(f"   {'total':<14} {sum(s for _, s in timings) * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
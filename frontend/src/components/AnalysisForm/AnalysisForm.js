@@ -4,6 +4,65 @@ import { FaExclamationTriangle, FaSearch } from 'react-icons/fa';
 import './AnalysisForm.css';
 
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:5000';
+const JOB_POLL_INTERVAL_MS = 1500;
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Poll the job status endpoint until the job finishes
+async function pollJob(jobId, onProgress) {
+  let job;
+  do {
+    await sleep(JOB_POLL_INTERVAL_MS);
+    const jobResponse = await fetch(`${API_BASE_URL}/api/jobs/${jobId}`);
+    if (!jobResponse.ok) {
+      throw new Error('Lost track of the analysis job');
+    }
+    job = await jobResponse.json();
+    const steps = job.progress.steps;
+    onProgress({
+      completed: job.progress.completed_nodes,
+      total: job.progress.total_nodes,
+      node: steps.length ? steps[steps.length - 1].node : null
+    });
+  } while (job.status === 'queued' || job.status === 'running');
+
+  if (job.status === 'failed') {
+    throw new Error(job.error || 'Analysis failed');
+  }
+  return job.result;
+}
+
+// Follow the job's server-sent events; falls back to polling if the stream drops
+function streamJob(jobId, onProgress) {
+  if (!window.EventSource) {
+    return pollJob(jobId, onProgress);
+  }
+  return new Promise((resolve, reject) => {
+    const source = new EventSource(`${API_BASE_URL}/api/jobs/${jobId}/events`);
+    let total = 0;
+    let completed = 0;
+
+    source.addEventListener('started', (e) => {
+      total = JSON.parse(e.data).nodes.length;
+    });
+    source.addEventListener('node', (e) => {
+      completed += 1;
+      onProgress({ completed: Math.min(completed, total), total, node: JSON.parse(e.data).node });
+    });
+    source.addEventListener('done', (e) => {
+      source.close();
+      resolve(JSON.parse(e.data).result);
+    });
+    source.addEventListener('failed', (e) => {
+      source.close();
+      reject(new Error(JSON.parse(e.data).error || 'Analysis failed'));
+    });
+    source.onerror = () => {
+      source.close();
+      pollJob(jobId, onProgress).then(resolve, reject);
+    };
+  });
+}
 
 function AnalysisForm() {
   const navigate = useNavigate();
@@ -11,6 +70,7 @@ function AnalysisForm() {
   const [dataSource, setDataSource] = useState('Reddit Discussions');
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
+  const [progress, setProgress] = useState(null);
 
   const dataSources = [
     'Reddit Discussions',
@@ -31,6 +91,7 @@ function AnalysisForm() {
     
     setLoading(true);
     setError('');
+    setProgress(null);
     
     try {
       const response = await fetch(`${API_BASE_URL}/api/analyze`, {
@@ -49,7 +110,10 @@ function AnalysisForm() {
         throw new Error(errorData.message || 'Analysis failed');
       }
       
-      const data = await response.json();
+      const { job_id: jobId } = await response.json();
+      
+      // Analysis runs as a background job - follow its progress until it finishes
+      const data = await streamJob(jobId, setProgress);
       
       // Store session data in localStorage for ResultsPage
       localStorage.setItem('currentAnalysis', JSON.stringify(data));
@@ -60,6 +124,7 @@ function AnalysisForm() {
       console.error('Analysis error:', err);
     } finally {
       setLoading(false);
+      setProgress(null);
     }
   };
 
@@ -122,7 +187,9 @@ function AnalysisForm() {
 
           <button type="submit" className="submit-btn" disabled={loading}>
             <span className="btn-icon">{loading ? '⏳' : '●'}</span>
-            {loading ? 'Analyzing with AI Agents...' : 'Start AI Analysis'}
+            {loading
+              ? `Analyzing with AI Agents...${progress && progress.node ? ` (${progress.node} ${progress.completed}/${progress.total})` : ''}`
+              : 'Start AI Analysis'}
           </button>
         </form>
       </div>
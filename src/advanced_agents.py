@@ -1,6 +1,6 @@
 """
 Advanced agent implementations for BrandShield_Lite.
-Contains simplified Emotion Analyzer, CRAG Logic, and Critic Agent.
+Contains the Sentiment Table, simplified Emotion Analyzer, CRAG Logic, and Critic Agent.
 Simplified for demo - removed heavy transformers dependency.
 """
 from typing import Dict, Any, List
@@ -15,66 +15,98 @@ from src.llm_utils import get_llm, get_agent_llm
 from langchain_core.prompts import PromptTemplate
 
 
+# ============================================================================
+# SENTIMENT TABLE (Score once, reuse everywhere)
+# ============================================================================
+
+# Columns produced by score_sentiment()
+SENTIMENT_COLUMNS = ('neg', 'neu', 'pos', 'compound')
+
+_vader = SentimentIntensityAnalyzer()
+
+
+def score_sentiment(filtered_content: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Score every mention with VADER exactly once.
+
+    Returns a columnar table (one NumPy array per column, one row per
+    mention, in filtered_content order) holding neg/neu/pos/compound plus
+    published_timestamp, hours_ago and copies (the mention's
+    duplicate_count), so later stages can compute their statistics as
+    vectorized reductions instead of re-scoring text.
+    """
+    n = len(filtered_content)
+    table = {column: np.zeros(n, dtype=np.float64) for column in SENTIMENT_COLUMNS}
+    table['published_timestamp'] = np.zeros(n, dtype=np.float64)
+    table['hours_ago'] = np.zeros(n, dtype=np.float64)
+    table['copies'] = np.ones(n, dtype=np.float64)
+
+    for i, item in enumerate(filtered_content):
+        scores = _vader.polarity_scores(item.get('text', ''))
+        for column in SENTIMENT_COLUMNS:
+            table[column][i] = scores[column]
+        table['published_timestamp'][i] = item.get('published_timestamp', 0) or 0
+        table['hours_ago'][i] = item.get('hours_ago', 99)
+        table['copies'][i] = item.get('duplicate_count', 1)
+
+    return table
+
+
+def get_sentiment_table(state: AgentState) -> Dict[str, np.ndarray]:
+    """Sentiment table from state, scoring now if it's missing or stale."""
+    filtered_content = state.get("filtered_content", [])
+    table = state.get("sentiment_table")
+    if not table or len(table['compound']) != len(filtered_content):
+        return score_sentiment(filtered_content)
+    # Tables restored from a stored session come back as plain lists
+    return {column: np.asarray(values, dtype=np.float64) for column, values in table.items()}
+
+
 # ============================================================================
 # SIMPLIFIED EMOTION ANALYZER (No Transformers)
 # ============================================================================
 
-def analyze_emotions(filtered_content: List[Dict[str, Any]]) -> Dict[str, Any]:
+def analyze_emotions(filtered_content: List[Dict[str, Any]],
+                     sentiment_table: Dict[str, np.ndarray] = None) -> Dict[str, Any]:
     """
     Simplified emotion analysis using VADER only (fast & demo-ready).
     Tracks basic emotions without heavy ML models.
+    
+    Reuses the scores in `sentiment_table` when given (see score_sentiment).
     """
-    vader = SentimentIntensityAnalyzer()
+    if sentiment_table is None:
+        sentiment_table = score_sentiment(filtered_content)
     
-    # Analyze emotions for each article
-    emotions = {'anger': [], 'neutral': [], 'joy': []}
-    
-    for item in filtered_content:
-        text = item.get('text', '')[:512]  # Truncate for speed
-        scores = vader.polarity_scores(text)
-        
-        # Map VADER scores to basic emotions
-        emotions['anger'].append(scores['neg'])
-        emotions['neutral'].append(scores['neu'])
-        emotions['joy'].append(scores['pos'])
+    # Map VADER scores to basic emotions
+    anger = sentiment_table['neg']
+    neutral = sentiment_table['neu']
+    joy = sentiment_table['pos']
+    # VADER doesn't have fear, approximate it (e.g. low compound + high neg)
+    fear = np.where(sentiment_table['compound'] < -0.3, anger * 0.5, 0.0)
     
     # Calculate averages
-    avg_anger = np.mean(emotions['anger']) if emotions['anger'] else 0
-    avg_neutral = np.mean(emotions['neutral']) if emotions['neutral'] else 0
-    avg_joy = np.mean(emotions['joy']) if emotions['joy'] else 0
+    avg_anger = float(anger.mean()) if anger.size else 0
+    avg_neutral = float(neutral.mean()) if neutral.size else 0
+    avg_joy = float(joy.mean()) if joy.size else 0
     
     # --- Velocity Calculation ---
     # Split content into recent (last 12h) vs older to track change
     current_time = datetime.now().timestamp()
     recent_limit = current_time - (12 * 3600)
-    
-    recent_scores = {'anger': [], 'fear': [], 'neutral': [], 'joy': []}
-    past_scores = {'anger': [], 'fear': [], 'neutral': [], 'joy': []}
-    
-    for item in filtered_content:
-        text = item.get('text', '')[:512]
-        scores = vader.polarity_scores(text)
-        is_recent = item.get('published_timestamp', 0) > recent_limit
-        
-        target = recent_scores if is_recent else past_scores
-        target['anger'].append(scores['neg'])
-        target['neutral'].append(scores['neu'])
-        target['joy'].append(scores['pos'])
-        # VADER doesn't have fear, approximate it (e.g. low compound + high neg)
-        fear_score = scores['neg'] * 0.5 if scores['compound'] < -0.3 else 0
-        target['fear'].append(fear_score)
-
-    def calculate_velocity(emotion_name, recent, past):
-        avg_recent = np.mean(recent) if recent else 0
-        avg_past = np.mean(past) if past else 0
+    is_recent = sentiment_table['published_timestamp'] > recent_limit
+
+    def calculate_velocity(values):
+        recent, past = values[is_recent], values[~is_recent]
+        avg_recent = recent.mean() if recent.size else 0
+        avg_past = past.mean() if past.size else 0
         if avg_past == 0: return 0 if avg_recent == 0 else 100
-        return ((avg_recent - avg_past) / avg_past) * 100
+        return float(((avg_recent - avg_past) / avg_past) * 100)
 
     velocities = {
-        'anger': calculate_velocity('anger', recent_scores['anger'], past_scores['anger']),
-        'fear': calculate_velocity('fear', recent_scores['fear'], past_scores['fear']),
-        'neutral': calculate_velocity('neutral', recent_scores['neutral'], past_scores['neutral']),
-        'joy': calculate_velocity('joy', recent_scores['joy'], past_scores['joy']),
+        'anger': calculate_velocity(anger),
+        'fear': calculate_velocity(fear),
+        'neutral': calculate_velocity(neutral),
+        'joy': calculate_velocity(joy),
     }
 
     # Format for Monitor Component
@@ -90,7 +122,7 @@ def analyze_emotions(filtered_content: List[Dict[str, Any]]) -> Dict[str, Any]:
             'name': 'FEAR',
             'multiplier': f"{'+' if velocities['fear'] > 0 else ''}{velocities['fear']/100:.1f}x",
             'color': 'amber',
-            'filled': min(16, int(np.mean([x for x in recent_scores['fear'] + past_scores['fear']] or [0]) * 20)),
+            'filled': min(16, int((fear.mean() if fear.size else 0) * 20)),
             'status': 'UNCERTAINTY'
         },
         {
@@ -3,8 +3,13 @@ Agent implementations for BrandShield_Lite.
 Contains Search Agent, Evaluator Agent, Advanced RAG Agent, and Strategy Agent.
 """
 import os
-from typing import Dict, Any, List
+import re
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, wait, FIRST_COMPLETED
+from typing import Dict, Any, List, Optional, Callable, Tuple
 from datetime import datetime, timedelta
+import numpy as np
 import pytz
 
 # Sentiment Analysis
@@ -20,22 +25,20 @@ from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 
 # LangChain & RAG
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import FAISS
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_core.documents import Document
 
-# Search
-try:
-    from exa_py import Exa
-    EXA_AVAILABLE = True
-except ImportError:
-    EXA_AVAILABLE = False
-    print("⚠️ Exa API not installed. Run: pip install exa-py")
-
-from src.state import AgentState
-from src.advanced_agents import analyze_emotions, check_rag_relevance, refine_search_query
-from src.llm_utils import get_llm, get_agent_llm
+from src.state import AgentState, Mention, to_mentions
+from src.advanced_agents import (
+    analyze_emotions, check_rag_relevance, refine_search_query,
+    score_sentiment, get_sentiment_table
+)
+from src.llm_utils import get_llm, get_agent_llm, stream_llm
+from src.embeddings import get_cached_embeddings, EMBEDDING_MODEL_NAME
+from src.vector_index import get_brand_index
+from src.search import get_search_backend, bucketed_start_date, TIME_WINDOW_DAYS, SEARCH_RESULTS_PER_QUERY
+from src.dedupe import dedupe_mentions, DEDUPE_ENABLED, DEDUPE_WEIGHT_BY_REACH
 from langchain_core.prompts import PromptTemplate
+from langchain_core.runnables import RunnableConfig
 
 
 # ============================================================================
@@ -85,62 +88,110 @@ def planning_agent(state: AgentState) -> AgentState:
 # SEARCH AGENT
 # ============================================================================
 
+# Concurrent search settings
+SEARCH_MAX_WORKERS = int(os.getenv("SEARCH_MAX_WORKERS", "4"))
+SEARCH_QUERY_TIMEOUT = float(os.getenv("SEARCH_QUERY_TIMEOUT", "20"))  # seconds
+
+
+def call_with_timeouts(fn: Callable[..., Any], calls: List[tuple], concurrency: int, timeout: float,
+                       thread_name_prefix: str) -> List[Tuple[Any, Optional[BaseException]]]:
+    """
+    Run fn(*args) for every args tuple, at most `concurrency` at a time,
+    giving each call `timeout` seconds from the moment it starts.
+
+    A call that overruns is abandoned (its thread finishes in the
+    background) and frees its slot, so calls queued behind it still start.
+    Returns (result, error) per call in input order; error is a
+    FuturesTimeoutError for calls that overran.
+    """
+    outcomes: List[Tuple[Any, Optional[BaseException]]] = [(None, None)] * len(calls)
+    if not calls:
+        return outcomes
+    # One thread per call at most, so a started call never waits for a worker
+    executor = ThreadPoolExecutor(max_workers=len(calls), thread_name_prefix=thread_name_prefix)
+    running: Dict[Any, Tuple[int, float]] = {}
+    next_call = 0
+    while next_call < len(calls) or running:
+        while next_call < len(calls) and len(running) < max(1, concurrency):
+            running[executor.submit(fn, *calls[next_call])] = (next_call, time.monotonic() + timeout)
+            next_call += 1
+        earliest = min(deadline for _, deadline in running.values())
+        wait(running, timeout=max(0, earliest - time.monotonic()), return_when=FIRST_COMPLETED)
+        now = time.monotonic()
+        for future, (index, deadline) in list(running.items()):
+            if future.done():
+                error = future.exception()
+                outcomes[index] = (None, error) if error else (future.result(), None)
+            elif deadline <= now:
+                outcomes[index] = (None, FuturesTimeoutError())
+            else:
+                continue
+            del running[future]
+    # Don't block on stragglers - their results are discarded
+    executor.shutdown(wait=False)
+    return outcomes
+
+
+def fetch_mentions(backend, queries: List[str], start_date: str) -> tuple:
+    """
+    Run search queries concurrently (SEARCH_MAX_WORKERS at a time, each
+    bounded by SEARCH_QUERY_TIMEOUT from when it starts) and merge their
+    results. A query that fails or times out is skipped; the rest still
+    count. URLs are deduplicated in query order (then result rank), so
+    the output does not depend on which query finished first.
+    Returns (Mention records, number of queries that succeeded).
+    """
+    def search(query: str, position: int) -> List[Dict[str, Any]]:
+        return backend.search(query, start_date, num_results=SEARCH_RESULTS_PER_QUERY, plan_position=position)
+    
+    outcomes = call_with_timeouts(search, [(query, position) for position, query in enumerate(queries)],
+                                  SEARCH_MAX_WORKERS, SEARCH_QUERY_TIMEOUT, "search")
+    
+    per_query_results = []
+    for query, (results, error) in zip(queries, outcomes):
+        if isinstance(error, FuturesTimeoutError):
+            print(f"   ⏱️ Search query timed out: {query}")
+        elif error is not None:
+            print(f"   ⚠️ Search query failed ({query}): {error}")
+        else:
+            per_query_results.append(results)
+    
+    mentions = []
+    seen_urls = set()
+    for results in per_query_results:
+        for mention in results:
+            if mention["url"] in seen_urls:
+                continue
+            seen_urls.add(mention["url"])
+            mentions.append(Mention.from_dict(mention, source=backend.name))
+    return mentions, len(per_query_results)
+
+
 def search_agent(state: AgentState) -> AgentState:
     """
     Search Agent: Fetches web mentions using the Research Plan.
-    Uses Exa API ONLY - simplified for demo.
+    Uses Exa API by default; SEARCH_BACKEND=record/replay captures or
+    replays Exa responses for offline benchmarking.
+    
+    Plan queries run concurrently (see fetch_mentions).
     """
     topic = state["topic"]
     queries = state.get("research_plan", [f"{topic} brand mention reviews"])
     
     print(f"🔍 Search Agent: Executing Deep Research Plan ({len(queries)} queries)...")
     
-    raw_content = []
-    seen_urls = set()
-    current_time = datetime.now(pytz.UTC)
-    two_days_ago = current_time - timedelta(days=2)
-    
-    # Use Exa API
-    if EXA_AVAILABLE and os.getenv("EXA_API_KEY"):
+    # Use Exa API (shared pooled client, responses cached per date bucket)
+    backend = get_search_backend()
+    if backend.is_available() and queries:
         try:
-            exa = Exa(api_key=os.getenv("EXA_API_KEY"))
-            start_date = two_days_ago.strftime("%Y-%m-%dT%H:%M:%S.000Z")
-            
-            for query in queries:
-                print(f"   🔎 Exa query: {query}")
-                results = exa.search_and_contents(
-                    query=query,
-                    num_results=5,
-                    text=True,
-                    start_published_date=start_date,
-                    use_autoprompt=True
-                )
-                
-                for result in results.results:
-                    if result.url in seen_urls:
-                        continue
-                    seen_urls.add(result.url)
-                    
-                    pub_date = getattr(result, 'published_date', None)
-                    if pub_date:
-                        try:
-                            pub_datetime = datetime.fromisoformat(pub_date.replace('Z', '+00:00')) if isinstance(pub_date, str) else pub_date
-                        except:
-                            pub_datetime = current_time
-                    else:
-                        pub_datetime = current_time
-                    
-                    raw_content.append({
-                        "title": result.title,
-                        "url": result.url,
-                        "text": result.text[:1500] if result.text else "",
-                        "published_date": pub_datetime.isoformat(),
-                        "published_timestamp": pub_datetime.timestamp()
-                    })
+            start_date = bucketed_start_date(TIME_WINDOW_DAYS)
+            raw_content, succeeded = fetch_mentions(backend, queries, start_date)
             
-            print(f"✅ Found {len(raw_content)} unique results via Exa API")
-            state["raw_content"] = raw_content
-            return state
+            if succeeded:
+                print(f"✅ Found {len(raw_content)} unique results via {backend.name} backend "
+                      f"({succeeded}/{len(queries)} queries succeeded)")
+                state["raw_content"] = raw_content
+                return state
             
         except Exception as e:
             print(f"❌ Exa API error: {e}")
@@ -161,90 +212,82 @@ def search_agent(state: AgentState) -> AgentState:
 # EVALUATOR AGENT
 # ============================================================================
 
+# Mentions younger than this are flagged as breaking news
+RECENT_HOURS = 6
+
+
+def format_time_ago(published_timestamp: Optional[float], now: Optional[float] = None) -> str:
+    """Human-readable age of a mention, e.g. "3 hours ago" (computed when displayed)."""
+    if published_timestamp is None or published_timestamp != published_timestamp:
+        return "Unknown"
+    seconds = (time.time() if now is None else now) - published_timestamp
+    # Handle future dates (clock skew or API issues)
+    if seconds < 0:
+        return "Just now"
+    if seconds < 3600:  # Less than 1 hour
+        minutes = int(seconds / 60)
+        return f"{minutes} minute{'s' if minutes != 1 else ''} ago"
+    if seconds < 86400:  # Less than 1 day
+        hours = int(seconds / 3600)
+        return f"{hours} hour{'s' if hours != 1 else ''} ago"
+    days = int(seconds / 86400)
+    hours = int((seconds % 86400) / 3600)
+    return f"{days} day{'s' if days != 1 else ''}, {hours} hour{'s' if hours != 1 else ''} ago"
+
+
+def format_published_date(published_timestamp: Optional[float]) -> str:
+    """Publication date as shown in reports and embedded chunk text."""
+    if published_timestamp is None or published_timestamp != published_timestamp:
+        return "Date unavailable"
+    return datetime.fromtimestamp(published_timestamp, tz=pytz.UTC).strftime("%B %d, %Y at %I:%M %p UTC")
+
+
 def evaluator_agent(state: AgentState) -> AgentState:
     """
     Evaluator Agent: Filters and validates content from the past 2 days only.
     
-    - Checks timestamps of all content
-    - Filters out content older than 2 days
-    - Adds time-since-posted information
-    - Validates data quality
+    - Reads each mention's published_timestamp into one array of epoch
+      seconds (Mention.from_dict already parsed published_date if needed)
+    - Filters out content older than 2 days with a single window mask
+    - Adds hours_ago / is_recent and sorts by recency with an argsort
+    
+    Display strings (time_ago, formatted date) are not stored; they are
+    produced on demand with format_time_ago / format_published_date.
     """
     print("⚖️ Evaluator Agent: Filtering content by time (past 2 days only)...")
     
-    raw_content = state["raw_content"]
-    current_time = datetime.now(pytz.UTC)
-    two_days_ago = current_time - timedelta(days=2)
+    raw_content = to_mentions(state["raw_content"])
+    now = time.time()
     
-    filtered_content = []
-    filtered_out = 0
+    epochs = np.fromiter(
+        (np.nan if item.published_timestamp is None else item.published_timestamp for item in raw_content),
+        dtype=np.float64, count=len(raw_content)
+    )
     
-    for item in raw_content:
-        try:
-            # Parse the published date
-            if isinstance(item['published_date'], str):
-                pub_datetime = datetime.fromisoformat(item['published_date'].replace('Z', '+00:00'))
-            else:
-                pub_datetime = item['published_date']
-            
-            # Ensure timezone awareness
-            if pub_datetime.tzinfo is None:
-                pub_datetime = pytz.UTC.localize(pub_datetime)
-            
-            # Filter: Only keep content from past 2 days
-            if pub_datetime >= two_days_ago:
-                # Calculate time ago
-                time_diff = current_time - pub_datetime
-                
-                # Handle future dates (clock skew or API issues)
-                if time_diff.total_seconds() < 0:
-                    time_ago = "Just now"
-                    item['time_ago'] = time_ago
-                    item['hours_ago'] = 0
-                    item['is_recent'] = True
-                    item['formatted_date'] = pub_datetime.strftime("%B %d, %Y at %I:%M %p UTC")
-                    filtered_content.append(item)
-                    continue
-
-                # Format time ago string
-                if time_diff.total_seconds() < 3600:  # Less than 1 hour
-                    minutes = int(time_diff.total_seconds() / 60)
-                    time_ago = f"{minutes} minute{'s' if minutes != 1 else ''} ago"
-                elif time_diff.total_seconds() < 86400:  # Less than 1 day
-                    hours = int(time_diff.total_seconds() / 3600)
-                    time_ago = f"{hours} hour{'s' if hours != 1 else ''} ago"
-                else:  # Days
-                    days = int(time_diff.total_seconds() / 86400)
-                    hours = int((time_diff.total_seconds() % 86400) / 3600)
-                    time_ago = f"{days} day{'s' if days != 1 else ''}, {hours} hour{'s' if hours != 1 else ''} ago"
-                
-                # Add enriched metadata
-                item['time_ago'] = time_ago
-                item['hours_ago'] = time_diff.total_seconds() / 3600
-                item['is_recent'] = time_diff.total_seconds() < 21600  # < 6 hours
-                item['formatted_date'] = pub_datetime.strftime("%B %d, %Y at %I:%M %p UTC")
-                
-                filtered_content.append(item)
-            else:
-                filtered_out += 1
-                
-        except Exception as e:
-            print(f"  ⚠️ Error parsing date for item: {e}")
-            # If we can't parse the date, include it anyway (benefit of doubt)
-            item['time_ago'] = "Unknown"
-            item['formatted_date'] = "Date unavailable"
-            item['is_recent'] = False
-            filtered_content.append(item)
+    # Undated mentions are kept (benefit of doubt) and sorted last
+    undated = np.isnan(epochs)
+    keep = np.flatnonzero(undated | (epochs >= now - TIME_WINDOW_DAYS * 86400))
+    hours_ago = np.maximum(now - epochs[keep], 0.0) / 3600  # future dates count as "just now"
+    order = np.argsort(np.where(undated[keep], np.inf, hours_ago), kind="stable")
+    keep, hours_ago = keep[order], hours_ago[order]
+    is_recent = ~undated[keep] & (hours_ago < RECENT_HOURS)
     
-    # Sort by recency (most recent first)
-    filtered_content.sort(key=lambda x: x.get('hours_ago', 999), reverse=False)
+    filtered_content = []
+    for i, hours, recent, no_date in zip(keep.tolist(), hours_ago.tolist(), is_recent.tolist(),
+                                         undated[keep].tolist()):
+        item = raw_content[i]
+        if not no_date:
+            item.hours_ago = hours
+        item.is_recent = recent
+        filtered_content.append(item)
+    filtered_out = len(raw_content) - len(filtered_content)
     
     print(f"✅ Evaluator: Kept {len(filtered_content)} articles (past 2 days)")
     if filtered_out > 0:
         print(f"   🚫 Filtered out {filtered_out} old articles (>2 days)")
     
     # Count recent articles (< 6 hours)
-    recent_count = sum(1 for item in filtered_content if item.get('is_recent', False))
+    recent_count = int(is_recent.sum())
     if recent_count > 0:
         print(f"   🔥 {recent_count} breaking news articles (< 6 hours old)")
     
@@ -253,22 +296,227 @@ def evaluator_agent(state: AgentState) -> AgentState:
     return state
 
 
+# ============================================================================
+# NEAR-DUPLICATE STAGE
+# ============================================================================
+
+def dedupe_agent(state: AgentState) -> Dict[str, Any]:
+    """
+    Dedupe Stage: Collapses syndicated copies and reposts (near-duplicate
+    text under different URLs) to one canonical mention per cluster, with
+    the cluster size in duplicate_count, so scoring, embedding, LLM
+    verification and reply drafting each see the text once.
+    
+    Search only drops exact URL repeats; see src.dedupe for the MinHash/LSH
+    clustering. DEDUPE_ENABLED=false passes the mentions through unchanged.
+    """
+    filtered_content = state["filtered_content"]
+    if not DEDUPE_ENABLED:
+        return {"filtered_content": filtered_content}
+    
+    print(f"🧬 Dedupe: Clustering {len(filtered_content)} mentions by near-duplicate text...")
+    deduped = dedupe_mentions(to_mentions(filtered_content))
+    removed = len(filtered_content) - len(deduped)
+    if removed:
+        clusters = sum(1 for item in deduped if item.duplicate_count > 1)
+        print(f"   ✂️ Collapsed {removed} near-duplicate copies into {clusters} canonical mentions")
+    print(f"✅ Dedupe: {len(deduped)} unique mentions")
+    return {"filtered_content": deduped}
+
+
+# ============================================================================
+# SENTIMENT SCORING STAGE
+# ============================================================================
+
+def sentiment_scoring_agent(state: AgentState) -> Dict[str, Any]:
+    """
+    Sentiment Scoring: Runs VADER once per filtered mention and stores the
+    scores as NumPy columns in state["sentiment_table"] for later stages.
+    
+    Runs on the RAG branch of the fan-out, so it returns only the key it owns.
+    """
+    filtered_content = state["filtered_content"]
+    print(f"🧮 Sentiment Scoring: Scoring {len(filtered_content)} mentions once...")
+    return {"sentiment_table": score_sentiment(filtered_content)}
+
+
 # ============================================================================
 # ADVANCED RAG AGENT
 # ============================================================================
 
-def rag_agent(state: AgentState) -> AgentState:
+# Chunks per LLM verification prompt
+VERIFY_BATCH_SIZE = 8
+
+
+def _parse_verdicts(response_text: str, count: int) -> Dict[int, bool]:
+    """
+    Parse a batched YES/NO answer into {item_number: is_negative}.
+    Expects a JSON object like {"1": "YES", "2": "NO"}; falls back to
+    "1: YES" style lines if the model doesn't return valid JSON.
+    """
+    answers = {}
+    match = re.search(r"\{.*\}", response_text, re.DOTALL)
+    if match:
+        try:
+            answers = {str(k).strip(): str(v) for k, v in json.loads(match.group(0)).items()}
+        except (ValueError, AttributeError):
+            answers = {}
+    if not answers:
+        for number, answer in re.findall(r"(\d+)\s*[:.)-]\s*(YES|NO)", response_text, re.IGNORECASE):
+            answers[number] = answer
+    
+    verdicts = {}
+    for number in range(1, count + 1):
+        answer = answers.get(str(number), "").strip().upper()
+        if answer.startswith("YES"):
+            verdicts[number] = True
+        elif answer.startswith("NO"):
+            verdicts[number] = False
+    return verdicts
+
+
+def _verify_negative_chunks(llm, texts: List[str]) -> Dict[str, bool]:
+    """
+    Ask the LLM whether each chunk really criticizes the brand, several chunks
+    per prompt. Returns {chunk_text: is_negative}; chunks the LLM didn't
+    answer for are left out so callers keep the VADER label.
+    """
+    verdicts = {}
+    batches = [texts[i:i + VERIFY_BATCH_SIZE] for i in range(0, len(texts), VERIFY_BATCH_SIZE)]
+    print(f"   🤖 Verifying {len(texts)} negative chunks in {len(batches)} batched LLM call(s)...")
+    for batch in batches:
+        numbered = "\n\n".join(f"[{n}] {text[:500]}" for n, text in enumerate(batch, 1))
+        prompt = (f"Analyze each numbered text. Is it expressing negative sentiment, frustration, or criticism "
+                  f"towards the brand/product?\n"
+                  f"Return ONLY a JSON object mapping each number to \"YES\" or \"NO\", "
+                  f"e.g. {{\"1\": \"YES\", \"2\": \"NO\"}}.\n\n{numbered}")
+        try:
+            llm_response = llm.invoke(prompt)
+            # Handle both string and chat response formats
+            response_text = llm_response.content if hasattr(llm_response, 'content') else str(llm_response)
+            for number, is_negative in _parse_verdicts(response_text, len(batch)).items():
+                verdicts[batch[number - 1]] = is_negative
+        except Exception as e:
+            print(f"      ⚠️ LLM verification failed: {e}")
+    return verdicts
+
+
+def compute_sentiment_statistics(sentiment_table: Dict[str, Any],
+                                 emotion_analysis: Dict[str, Any]) -> tuple:
+    """
+    Sentiment distribution and risk metrics as vectorized reductions over
+    the sentiment table. Returns (sentiment_stats, risk_metrics);
+    sentiment_stats["risk_score"] is left for the RAG findings to fill in.
+    
+    Each row counts once; with DEDUPE_WEIGHT_BY_REACH it counts once per
+    copy the dedupe stage collapsed into it (the table's "copies" column).
+    """
+    compound = sentiment_table['compound']
+    hours_ago = sentiment_table['hours_ago']
+    copies = sentiment_table.get('copies')
+    if copies is None or len(copies) != compound.size:
+        copies = np.ones(compound.size)
+    weights = copies if DEDUPE_WEIGHT_BY_REACH else np.ones(compound.size)
+    total = int(weights.sum())
+    
+    # Calculate sentiment distribution
+    is_positive = compound > 0.05
+    is_negative = compound < -0.05
+    positive_count = int(weights[is_positive].sum())
+    negative_count = int(weights[is_negative].sum())
+    neutral_count = total - positive_count - negative_count
+    
+    # Overall sentiment is the (weighted) mean of per-mention scores
+    overall_compound = float(np.average(compound, weights=weights)) if total else 0.0
+    
+    # --- NEW: Calculate Risk Metrics (VoltGear Scenario) ---
+    # 1. Risk Score (0-100)
+    # Formula: (Negative% * 0.6) + (Viral Risk * 0.4)
+    negative_pct = (negative_count / (total or 1)) * 100
+    viral_risk_val = 0
+    if emotion_analysis['viral_risk'] == "High": viral_risk_val = 100
+    elif emotion_analysis['viral_risk'] == "Medium": viral_risk_val = 50
+    
+    reputation_risk_score = (negative_pct * 0.6) + (viral_risk_val * 0.4)
+    
+    # 2. Sentiment Velocity
+    # Compare negative posts in last 1 hour vs previous 4 hours
+    recent_negatives = int(weights[is_negative & (hours_ago <= 1)].sum())
+    past_negatives = int(weights[is_negative & (hours_ago > 1) & (hours_ago <= 5)].sum())
+                
+    # Avoid division by zero
+    base = past_negatives if past_negatives > 0 else 1
+    velocity = ((recent_negatives - past_negatives) / base) * 100
+    
+    risk_metrics = {
+        "score": round(reputation_risk_score, 1),
+        "level": "CRITICAL" if reputation_risk_score > 80 else "HIGH" if reputation_risk_score > 50 else "MEDIUM" if reputation_risk_score > 20 else "LOW",
+        "velocity": round(velocity, 1),
+        "recent_negatives": recent_negatives,
+        "past_negatives": past_negatives
+    }
+    
+    sentiment_stats = {
+        "positive": positive_count,
+        "negative": negative_count,
+        "neutral": neutral_count,
+        "total": total,
+        "unique_mentions": int(compound.size),
+        "copies_found": int(copies.sum()),
+        "vader_compound": overall_compound,
+        # Use VADER compound score as fallback when TextBlob is unavailable
+        "textblob_polarity": overall_compound,
+        "overall_sentiment": "Negative" if overall_compound < -0.05 else 
+                           "Positive" if overall_compound > 0.05 else "Neutral",
+        "risk_score": 0
+    }
+    return sentiment_stats, risk_metrics
+
+
+def article_document(item: Dict[str, Any], doc_id: int) -> Document:
+    """Turn one filtered mention into the document the RAG index chunks and embeds."""
+    # time_ago is kept out of the chunk text so re-seen articles hit the embedding cache
+    content = (f"Title: {item['title']}\n"
+              f"Published: {format_published_date(item.get('published_timestamp'))}\n"
+              f"URL: {item['url']}\n"
+              f"Content: {item['text']}")
+    return Document(
+        page_content=content,
+        metadata={
+            "source": item["url"],
+            "title": item["title"],
+            "doc_id": doc_id,
+            "is_recent": item.get('is_recent', False),
+            "published_timestamp": item.get('published_timestamp')
+        }
+    )
+
+
+def split_articles(documents: List[Document]) -> List[Document]:
+    """Split article documents into the chunks stored in the vector index."""
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=500,
+        chunk_overlap=50,
+        separators=["\n\n", "\n", ". ", " ", ""]
+    )
+    return text_splitter.split_documents(documents)
+
+
+def rag_agent(state: AgentState) -> Dict[str, Any]:
     """
     Advanced RAG Agent: Uses semantic search to identify brand issues.
     
     ✅ REAL RAG FEATURES:
     - Chunks the raw content with RecursiveCharacterTextSplitter
-    - Embeds using HuggingFaceEmbeddings (all-MiniLM-L6-v2)
-    - Stores in FAISS vector database (in-memory)
+    - Embeds using HuggingFaceEmbeddings (all-MiniLM-L6-v2, loaded once per process)
+    - Stores in a persistent per-brand FAISS index (only new URLs are embedded)
     - Uses semantic retrieval (not keyword matching!)
     - Performs targeted queries for: hate speech, product frustration, 
       technical bugs, and safety risks
     - Extracts evidence-based findings with context
+    
+    Runs in parallel with the Social Media Agent, so it returns only the
+    keys it owns (sentiment/emotion/risk stats and findings).
     """
     print("🧠 RAG Agent: Initializing Vector Store for Semantic Analysis...")
     
@@ -277,71 +525,60 @@ def rag_agent(state: AgentState) -> AgentState:
     
     if not filtered_content:
         print("⚠️ No content to analyze after filtering")
-        state["sentiment_stats"] = {
-            "positive": 0, "negative": 0, "neutral": 0, "total": 0,
-            "vader_compound": 0, "textblob_polarity": 0,
-            "overall_sentiment": "Neutral", "risk_score": 0
+        return {
+            "sentiment_stats": {
+                "positive": 0, "negative": 0, "neutral": 0, "total": 0,
+                "vader_compound": 0, "textblob_polarity": 0,
+                "overall_sentiment": "Neutral", "risk_score": 0
+            },
+            "rag_findings": "No recent content found (past 2 days)."
         }
-        state["rag_findings"] = "No recent content found (past 2 days)."
-        return state
     
     # ============================================================================
-    # STEP 1: CONVERT FILTERED CONTENT TO DOCUMENTS
+    # STEP 1: OPEN THE BRAND'S PERSISTENT VECTOR INDEX
     # ============================================================================
-    print("📚 Step 1: Converting filtered content to documents...")
-    documents = []
-    for idx, item in enumerate(filtered_content):
-        content = (f"Title: {item['title']}\n"
-                  f"Published: {item.get('formatted_date', 'Unknown')} ({item.get('time_ago', 'Unknown')})\n"
-                  f"URL: {item['url']}\n"
-                  f"Content: {item['text']}")
-        documents.append(Document(
-            page_content=content,
-            metadata={
-                "source": item["url"],
-                "title": item["title"],
-                "doc_id": idx,
-                "time_ago": item.get('time_ago', 'Unknown'),
-                "is_recent": item.get('is_recent', False)
-            }
-        ))
+    # Chunks embedded in earlier runs are served from the on-disk cache
+    print("🔢 Step 1: Opening persistent vector index (all-MiniLM-L6-v2, cached)...")
+    embeddings = get_cached_embeddings(EMBEDDING_MODEL_NAME)
+    brand_index = get_brand_index(state["topic"], embeddings)
+    
+    # Drop chunks that have aged out of the evaluator's time window
+    window_start = (datetime.now(pytz.UTC) - timedelta(days=TIME_WINDOW_DAYS)).timestamp()
+    evicted = brand_index.evict_older_than(window_start)
+    if evicted:
+        print(f"   🗑️ Evicted {evicted} chunks older than {TIME_WINDOW_DAYS} days")
     
     # ============================================================================
-    # STEP 2: SPLIT TEXT INTO CHUNKS (Critical for RAG!)
+    # STEP 2: CONVERT NEW CONTENT TO DOCUMENTS
     # ============================================================================
-    print("✂️ Step 2: Splitting documents into semantic chunks...")
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=500,
-        chunk_overlap=50,
-        separators=["\n\n", "\n", ". ", " ", ""]
-    )
-    splits = text_splitter.split_documents(documents)
-    print(f"   ✅ Created {len(splits)} searchable chunks")
+    print("📚 Step 2: Converting new content to documents...")
+    indexed_urls = brand_index.indexed_urls()
+    documents = []
+    for idx, item in enumerate(filtered_content):
+        if item["url"] in indexed_urls:
+            # Already embedded - just refresh the recency flag
+            brand_index.update_metadata(item["url"], is_recent=item.get('is_recent', False))
+            continue
+        documents.append(article_document(item, idx))
+    print(f"   ✅ {len(documents)} new articles, {len(filtered_content) - len(documents)} already indexed")
     
     # ============================================================================
-    # STEP 3: INITIALIZE EMBEDDING MODEL (Converts text → semantic vectors)
+    # STEP 3: SPLIT TEXT INTO CHUNKS (Critical for RAG!)
     # ============================================================================
-    print("🔢 Step 3: Loading embedding model (all-MiniLM-L6-v2)...")
-    embeddings = HuggingFaceEmbeddings(
-        model_name="sentence-transformers/all-MiniLM-L6-v2",
-        model_kwargs={'device': 'cpu'},
-        encode_kwargs={'normalize_embeddings': True}
-    )
+    print("✂️ Step 3: Splitting new documents into semantic chunks...")
+    splits = split_articles(documents)
+    print(f"   ✅ Created {len(splits)} new searchable chunks")
     
     # ============================================================================
-    # STEP 4: CREATE VECTOR DATABASE (The "Intelligence" Layer)
+    # STEP 4: APPEND TO VECTOR DATABASE (The "Intelligence" Layer)
     # ============================================================================
-    print("💾 Step 4: Building vector database...")
-    vectorstore = FAISS.from_documents(
-        documents=splits,
-        embedding=embeddings
-    )
+    print("💾 Step 4: Appending new chunks to vector database...")
+    brand_index.add_documents(splits)
+    brand_index.save()
     
-    # Create retriever for semantic search
-    retriever = vectorstore.as_retriever(
-        search_kwargs={"k": 3}  # Retrieve top 3 most relevant chunks
-    )
-    print("   ✅ Vector store ready for semantic queries")
+    cache_stats = embeddings.cache.stats()
+    print(f"   ✅ Vector store ready for semantic queries: {brand_index.ntotal} chunks "
+          f"(embedding cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses)")
     
     # ============================================================================
     # STEP 5: PERFORM TARGETED RAG QUERIES (Semantic Understanding!)
@@ -369,11 +606,13 @@ def rag_agent(state: AgentState) -> AgentState:
         llm_strict = None
         print("   ⚠️ LLM not available for strict verification, falling back to VADER")
     
+    # Retrieve evidence for every category first, so verification can be batched
+    retrieved = []
     for category, query in risk_queries.items():
         print(f"  🎯 Semantic search: {category.replace('_', ' ').title()}")
         
-        # Use retriever for semantic search (not keyword matching!)
-        results = retriever.invoke(query)
+        # Use the vector index for semantic search (not keyword matching!)
+        results = brand_index.similarity_search(query, k=3)
         
         # ✅ CRAG: Check relevance
         is_relevant = check_rag_relevance(results, query, threshold=0.25)
@@ -382,11 +621,26 @@ def rag_agent(state: AgentState) -> AgentState:
             print(f"     🔄 CRAG: Low relevance detected. Refining query...")
             # Refine the query
             refined_query = refine_search_query(query, filtered_content[0]['title'] if filtered_content else "brand")
-            results = retriever.invoke(refined_query)
+            results = brand_index.similarity_search(refined_query, k=3)
             print(f"     ✅ CRAG: Retrieved with refined query")
         
         total_relevance += (1 if is_relevant else 0.5)
-        
+        retrieved.append((category, is_relevant, results))
+    
+    # Score each distinct chunk once, even if several categories retrieved it
+    chunk_scores = {}
+    for _, _, results in retrieved:
+        for doc in results:
+            if doc.page_content not in chunk_scores:
+                chunk_scores[doc.page_content] = sentiment_vader.polarity_scores(doc.page_content)['compound']
+    
+    # STRICT ANALYSIS: Use LLM to verify negative sentiment (batched, deduplicated)
+    negative_chunks = [text for text, score in chunk_scores.items() if score < -0.05]
+    verdicts = {}
+    if llm_strict and negative_chunks:
+        verdicts = _verify_negative_chunks(llm_strict, negative_chunks)
+    
+    for category, is_relevant, results in retrieved:
         if results:
             category_findings = {
                 "category": category.replace('_', ' ').title(),
@@ -399,26 +653,15 @@ def rag_agent(state: AgentState) -> AgentState:
             
             for doc in results:
                 # Extract sentiment for evidence
-                sentiment_score = sentiment_vader.polarity_scores(doc.page_content)
-                compound_score = sentiment_score['compound']
+                compound_score = chunk_scores[doc.page_content]
                 
-                # STRICT ANALYSIS: Use LLM to verify negative sentiment
                 sentiment_label = "Neutral"
                 if compound_score < -0.05:
                     sentiment_label = "Negative"
-                    # Verify with LLM if available
-                    if llm_strict:
-                        try:
-                            prompt = (f"Analyze this text. Is it expressing negative sentiment, frustration, or criticism "
-                                     f"towards the brand/product? Answer only YES or NO.\n\nText: {doc.page_content[:500]}")
-                            llm_response = llm_strict.invoke(prompt)
-                            # Handle both string and chat response formats
-                            response_text = llm_response.content if hasattr(llm_response, 'content') else str(llm_response)
-                            if "NO" in response_text.upper():
-                                sentiment_label = "Neutral" # Downgrade if LLM disagrees
-                                compound_score = 0.0 # Reset score
-                        except Exception as e:
-                            print(f"      ⚠️ LLM verification failed: {e}")
+                    # Downgrade if LLM disagrees (unverified chunks stay negative)
+                    if verdicts.get(doc.page_content) is False:
+                        sentiment_label = "Neutral"
+                        compound_score = 0.0 # Reset score
                 elif compound_score > 0.05:
                     sentiment_label = "Positive"
                 
@@ -434,7 +677,7 @@ def rag_agent(state: AgentState) -> AgentState:
                 category_findings["items"].append({
                     "source": doc.metadata.get('title', 'Unknown'),
                     "url": doc.metadata.get('source', '#'),
-                    "time_ago": doc.metadata.get('time_ago', 'Unknown'),
+                    "time_ago": format_time_ago(doc.metadata.get('published_timestamp')),
                     "sentiment_label": sentiment_label,
                     "sentiment_display": sentiment_display,
                     "score": compound_score,
@@ -443,15 +686,13 @@ def rag_agent(state: AgentState) -> AgentState:
 
                 findings.append(f"**Evidence #{results.index(doc) + 1}:**")
                 findings.append(f"- Source: {doc.metadata.get('title', 'Unknown')}")
-                findings.append(f"- Posted: {doc.metadata.get('time_ago', 'Unknown')}")
+                findings.append(f"- Posted: {format_time_ago(doc.metadata.get('published_timestamp'))}")
                 findings.append(f"- Sentiment: {sentiment_display} (Score: {compound_score:.2f})")
                 findings.append(f"- Context: \"{doc.page_content[:250]}...\"")
                 findings.append("")
             
             structured_findings.append(category_findings)
     
-    state["rag_findings_structured"] = structured_findings
-    
     # Calculate CRAG quality score
     rag_quality_score = total_relevance / len(risk_queries)
     print(f"   ✅ Semantic analysis complete. Risk Score: {risk_score}, RAG Quality: {rag_quality_score:.2f}")
@@ -461,8 +702,8 @@ def rag_agent(state: AgentState) -> AgentState:
     # ============================================================================
     print("😊 Step 6: Analyzing emotion velocity and trends...")
     
-    emotion_analysis = analyze_emotions(filtered_content)
-    state["emotion_analysis"] = emotion_analysis
+    sentiment_table = get_sentiment_table(state)
+    emotion_analysis = analyze_emotions(filtered_content, sentiment_table)
     
     print(f"   🎭 Dominant Emotion: {emotion_analysis['dominant_emotion'].upper()}")
     print(f"   📈 Viral Risk: {emotion_analysis['viral_risk']}")
@@ -473,76 +714,13 @@ def rag_agent(state: AgentState) -> AgentState:
     # ============================================================================
     print("📊 Step 7: Computing overall sentiment statistics...")
     
-    all_text = " ".join([item["text"] for item in filtered_content])
-    
-    # VADER sentiment
-    vader_scores = sentiment_vader.polarity_scores(all_text)
+    sentiment_stats, risk_metrics = compute_sentiment_statistics(sentiment_table, emotion_analysis)
+    sentiment_stats["risk_score"] = risk_score
     
     # TextBlob sentiment (optional)
     if TEXTBLOB_AVAILABLE:
-        blob = TextBlob(all_text)
-        textblob_polarity = blob.sentiment.polarity
-    else:
-        # Use VADER compound score as fallback
-        textblob_polarity = vader_scores['compound']
-    
-    # Calculate sentiment distribution
-    positive_count = sum(1 for item in filtered_content 
-                        if sentiment_vader.polarity_scores(item["text"])['compound'] > 0.05)
-    negative_count = sum(1 for item in filtered_content 
-                        if sentiment_vader.polarity_scores(item["text"])['compound'] < -0.05)
-    neutral_count = len(filtered_content) - positive_count - negative_count
-    
-    # --- NEW: Calculate Risk Metrics (VoltGear Scenario) ---
-    # 1. Risk Score (0-100)
-    # Formula: (Negative% * 0.6) + (Viral Risk * 0.4)
-    total_items = len(filtered_content) if filtered_content else 1
-    negative_pct = (negative_count / total_items) * 100
-    viral_risk_val = 0
-    if emotion_analysis['viral_risk'] == "High": viral_risk_val = 100
-    elif emotion_analysis['viral_risk'] == "Medium": viral_risk_val = 50
-    
-    reputation_risk_score = (negative_pct * 0.6) + (viral_risk_val * 0.4)
-    
-    # 2. Sentiment Velocity
-    # Compare negative posts in last 1 hour vs previous 4 hours
-    recent_negatives = 0
-    past_negatives = 0
-    
-    for item in filtered_content:
-        is_negative = sentiment_vader.polarity_scores(item["text"])['compound'] < -0.05
-        if is_negative:
-            hours_ago = item.get('hours_ago', 99)
-            if hours_ago <= 1:
-                recent_negatives += 1
-            elif 1 < hours_ago <= 5:
-                past_negatives += 1
-                
-    # Avoid division by zero
-    base = past_negatives if past_negatives > 0 else 1
-    velocity = ((recent_negatives - past_negatives) / base) * 100
-    
-    state["risk_metrics"] = {
-        "score": round(reputation_risk_score, 1),
-        "level": "CRITICAL" if reputation_risk_score > 80 else "HIGH" if reputation_risk_score > 50 else "MEDIUM" if reputation_risk_score > 20 else "LOW",
-        "velocity": round(velocity, 1),
-        "recent_negatives": recent_negatives,
-        "past_negatives": past_negatives
-    }
-    
-    state["sentiment_stats"] = {
-        "positive": positive_count,
-        "negative": negative_count,
-        "neutral": neutral_count,
-        "total": len(filtered_content),
-        "vader_compound": vader_scores['compound'],
-        "textblob_polarity": textblob_polarity,
-        "overall_sentiment": "Negative" if vader_scores['compound'] < -0.05 else 
-                           "Positive" if vader_scores['compound'] > 0.05 else "Neutral",
-        "risk_score": risk_score
-    }
-    
-    state["rag_quality_score"] = rag_quality_score
+        blob = TextBlob(" ".join([item["text"] for item in filtered_content]))
+        sentiment_stats["textblob_polarity"] = blob.sentiment.polarity
     
     # ============================================================================
     # STEP 8: SYNTHESIZE FINDINGS
@@ -553,9 +731,9 @@ def rag_agent(state: AgentState) -> AgentState:
 
 **Analysis Method:** Semantic Vector Search + Corrective RAG
 **Time Filter:** Past 2 days only (Evaluator Agent filtered)
-**Embedding Model:** sentence-transformers/all-MiniLM-L6-v2
-**Vector Database:** FAISS (in-memory)
-**Chunks Analyzed:** {len(splits)}
+**Embedding Model:** {EMBEDDING_MODEL_NAME}
+**Vector Database:** FAISS (persistent, per-brand)
+**Chunks Analyzed:** {brand_index.ntotal} ({len(splits)} new this run)
 **RAG Quality Score:** {rag_quality_score:.2f}/1.0 (CRAG relevance checking)
 **Risk Score:** {risk_score}/12 (Higher = More concerning)
 
@@ -585,16 +763,23 @@ def rag_agent(state: AgentState) -> AgentState:
 - ✅ **Evidence-Based**: Every finding is backed by actual retrieved content
 - ✅ **Time-Filtered**: Evaluator Agent ensures only recent data (past 2 days)
 """
-        state["rag_findings"] = summary
+        rag_findings = summary
     else:
-        state["rag_findings"] = "No significant issues detected in semantic analysis (past 2 days)."
+        rag_findings = "No significant issues detected in semantic analysis (past 2 days)."
     
     print("✅ Advanced RAG Analysis complete")
-    print(f"   📊 Overall Sentiment: {state['sentiment_stats']['overall_sentiment']}")
+    print(f"   📊 Overall Sentiment: {sentiment_stats['overall_sentiment']}")
     print(f"   🎯 Risk Score: {risk_score}/12")
     print(f"   🎭 Emotion: {emotion_analysis['dominant_emotion']}, Viral Risk: {emotion_analysis['viral_risk']}")
     
-    return state
+    return {
+        "sentiment_stats": sentiment_stats,
+        "risk_metrics": risk_metrics,
+        "emotion_analysis": emotion_analysis,
+        "rag_findings": rag_findings,
+        "rag_findings_structured": structured_findings,
+        "rag_quality_score": rag_quality_score
+    }
 
 
 # ============================================================================
@@ -605,9 +790,37 @@ def rag_agent(state: AgentState) -> AgentState:
 # SOCIAL MEDIA AGENT
 # ============================================================================
 
-def social_media_agent(state: AgentState) -> AgentState:
+# Concurrent reply drafting settings
+SOCIAL_REPLY_CONCURRENCY = int(os.getenv("SOCIAL_REPLY_CONCURRENCY", "5"))
+SOCIAL_REPLY_TIMEOUT = float(os.getenv("SOCIAL_REPLY_TIMEOUT", "20"))  # seconds
+TEMPLATE_REPLY = "We're sorry to hear this. Please contact support."
+
+
+def _draft_reply(llm, topic: str, item: Dict[str, Any]) -> str:
+    """Draft one social media reply with the LLM."""
+    # Truncate text for prompt
+    context_text = item.get('text', '')[:300]
+    prompt_text = (f"You are a social media manager for '{topic}'.\n"
+              f"Draft a polite, professional, and empathetic social media reply (max 280 chars) "
+              f"to this customer observation.\n"
+              f"Observation: \"{context_text}...\"\n"
+              f"Reply:")
+    response = llm.invoke(prompt_text)
+    # Handle both string and chat response formats
+    draft = response.content if hasattr(response, 'content') else str(response)
+    return draft.strip().replace('"', '')
+
+
+def social_media_agent(state: AgentState) -> Dict[str, Any]:
     """
     Social Media Agent: Drafts replies to negative feedback.
+    
+    Replies are drafted concurrently (up to SOCIAL_REPLY_CONCURRENCY at a
+    time). A reply that fails or takes longer than SOCIAL_REPLY_TIMEOUT
+    from when its call started falls back to the template draft.
+    
+    Runs in parallel with the RAG branch and only reads filtered_content, so
+    it returns only the key it owns (social_media_replies).
     """
     print("💬 Social Media Agent: Analyzing content for reply opportunities...")
     # Use filtered content as the source
@@ -633,24 +846,20 @@ def social_media_agent(state: AgentState) -> AgentState:
         
     print(f"   Found {len(negative_items)} negative items to address.")
 
-    for item in negative_items:
-        draft = "We're sorry to hear this. Please contact support."
-        if llm:
-            try:
-                # Truncate text for prompt
-                context_text = item.get('text', '')[:300]
-                prompt_text = (f"You are a social media manager for '{topic}'.\n"
-                          f"Draft a polite, professional, and empathetic social media reply (max 280 chars) "
-                          f"to this customer observation.\n"
-                          f"Observation: \"{context_text}...\"\n"
-                          f"Reply:")
-                response = llm.invoke(prompt_text)
-                # Handle both string and chat response formats
-                draft = response.content if hasattr(response, 'content') else str(response)
-                draft = draft.strip().replace('"', '')
-            except Exception as e:
-                print(f"Error generating reply: {e}")
-        
+    drafts = [TEMPLATE_REPLY] * len(negative_items)
+    if llm and negative_items:
+        outcomes = call_with_timeouts(_draft_reply, [(llm, topic, item) for item in negative_items],
+                                      SOCIAL_REPLY_CONCURRENCY, SOCIAL_REPLY_TIMEOUT, "social-reply")
+        for i, (draft, error) in enumerate(outcomes):
+            if isinstance(error, FuturesTimeoutError):
+                print(f"   ⏱️ Reply #{i + 1} timed out, using template draft")
+            elif error is not None:
+                print(f"Error generating reply: {error}")
+            else:
+                drafts[i] = draft
+
+    # Replies stay in recency order regardless of completion order
+    for item, draft in zip(negative_items, drafts):
         replies.append({
             "id": item.get('url', str(len(replies))),
             "content": item.get('text', '')[:200] + "...",
@@ -659,18 +868,26 @@ def social_media_agent(state: AgentState) -> AgentState:
             "status": "draft"
         })
         
-    state["social_media_replies"] = replies
     print(f"✅ Drafted {len(replies)} replies.")
-    return state
+    return {"social_media_replies": replies}
 
 
 # ============================================================================
 # STRATEGY AGENT
 # ============================================================================
 
-def strategy_agent(state: AgentState) -> AgentState:
+# Key in config["configurable"] for a callback(token, revision_count) that
+# receives the report as it is generated
+REPORT_TOKEN_CALLBACK = "on_report_token"
+
+
+def strategy_agent(state: AgentState, config: Optional[RunnableConfig] = None) -> AgentState:
     """
     Strategy Agent: Creates a detailed CEO-level strategic report DRAFT.
+    
+    If the graph is invoked with config["configurable"][REPORT_TOKEN_CALLBACK],
+    the report is streamed from the LLM and each text chunk is passed to the
+    callback as soon as it arrives.
     """
     print("📊 Strategy Agent: Generating strategic report draft using LLM...")
     
@@ -681,6 +898,10 @@ def strategy_agent(state: AgentState) -> AgentState:
     revision_count = state.get("revision_count", 0)
     critic_feedback = state.get("critic_feedback", "")
     social_media_replies = state.get("social_media_replies", [])
+    # Rerun after a Critic rejection: count it so should_revise can stop the loop
+    if critic_feedback and not state.get("critic_approved", False):
+        revision_count += 1
+    on_token = ((config or {}).get("configurable") or {}).get(REPORT_TOKEN_CALLBACK)
     
     # Prepare Social Media Summary
     sm_summary = ""
@@ -732,6 +953,8 @@ This report analyzes recent brand sentiment and potential crisis indicators for
         state["draft_report"] = report
         state["revision_count"] = revision_count
         state["final_report"] = report
+        if on_token:
+            on_token(report, revision_count)
         print("✅ Strategic report template generated (LLM unavailable)")
         return state
     
@@ -792,13 +1015,25 @@ Include:
     
     try:
         print("   🧠 Invoking LLM for strategy generation...")
-        response = llm.invoke(formatted_prompt)
-        # Handle both string and chat response formats
-        report = response.content if hasattr(response, 'content') else str(response)
-        report += "\n\n---\n\n*Generated by BrandShield Deep Research Agent*"
+        if on_token:
+            chunks = []
+            for chunk in stream_llm(llm, formatted_prompt):
+                chunks.append(chunk)
+                on_token(chunk, revision_count)
+            report = "".join(chunks)
+        else:
+            response = llm.invoke(formatted_prompt)
+            # Handle both string and chat response formats
+            report = response.content if hasattr(response, 'content') else str(response)
+        footer = "\n\n---\n\n*Generated by BrandShield Deep Research Agent*"
+        if on_token:
+            on_token(footer, revision_count)
+        report += footer
     except Exception as e:
         print(f"   ❌ LLM Generation Failed: {e}")
         report = f"ERROR: Could not generate report.\n\nDetails: {e}"
+        if on_token:
+            on_token(f"\n\n{report}", revision_count)
 
     state["draft_report"] = report
     state["revision_count"] = revision_count
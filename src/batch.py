@@ -0,0 +1,196 @@
+"""
+Multi-brand batch analysis for BrandShield.
+Runs Phase 1 for a brand and its competitors together: every brand's
+research runs in parallel, the chunks all brands need are embedded once
+in shared batches (an article that mentions several brands is embedded a
+single time), then each brand's analysis runs in parallel and the results
+are compared side by side.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Callable
+
+from src.agents import article_document, split_articles
+from src.embeddings import get_cached_embeddings, EMBEDDING_MODEL_NAME
+from src.graph import get_compiled_graph, PHASE1_RESEARCH_NODES, PHASE1_ANALYSIS_NODES
+from src.jobs import node_payload
+from src.vector_index import get_brand_index
+
+
+BATCH_MAX_BRANDS = int(os.getenv("BATCH_MAX_BRANDS", "6"))
+BATCH_EMBED_BATCH_SIZE = int(os.getenv("BATCH_EMBED_BATCH_SIZE", "256"))  # chunks per embedding call
+
+# Progress step recorded between the research and analysis halves
+SHARED_EMBEDDING_STEP = "shared_embedding"
+
+StepCallback = Callable[..., None]
+
+
+def initial_phase1_state(brand: str) -> Dict[str, Any]:
+    return {
+        "topic": brand,
+        "raw_content": [],
+        "filtered_content": [],
+        "sentiment_stats": {},
+        "emotion_analysis": {},
+        "social_media_replies": [],
+        "risk_metrics": {},
+        "rag_findings_structured": [],
+        "research_plan": []
+    }
+
+
+def batch_nodes(brands: List[str]) -> List[str]:
+    """Progress step names of a batch run, e.g. "Tesla/search"."""
+    research = [f"{brand}/{node}" for brand in brands for node in PHASE1_RESEARCH_NODES]
+    analysis = [f"{brand}/{node}" for brand in brands for node in PHASE1_ANALYSIS_NODES]
+    return research + [SHARED_EMBEDDING_STEP] + analysis
+
+
+def _stream_brand(graph, state: Dict[str, Any], brand: str,
+                  on_steps: Optional[StepCallback]) -> Dict[str, Any]:
+    final_state = state
+    for mode, chunk in graph.stream(state, stream_mode=["updates", "values"]):
+        if mode == "values":
+            final_state = chunk
+            continue
+        if on_steps is not None:
+            on_steps({f"{brand}/{node}": node_payload(node, output) for node, output in chunk.items()},
+                     brand=brand)
+    return final_state
+
+
+def _for_each_brand(brands: List[str], fn: Callable[[str], Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    with ThreadPoolExecutor(max_workers=len(brands), thread_name_prefix="batch-brand") as executor:
+        futures = {brand: executor.submit(fn, brand) for brand in brands}
+        return {brand: future.result() for brand, future in futures.items()}
+
+
+def pre_embed_shared_chunks(states: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Embed every chunk the brands' RAG stages are about to index, once.
+
+    Chunks are built exactly as the RAG agent builds them, deduplicated
+    across brands, and pushed through the shared cache-backed model in
+    batches, so each brand's RAG stage is served from the embedding cache.
+    """
+    embeddings = get_cached_embeddings(EMBEDDING_MODEL_NAME)
+    url_brands: Dict[str, List[str]] = {}
+    chunk_texts: List[str] = []
+    for brand, state in states.items():
+        indexed_urls = get_brand_index(brand, embeddings).indexed_urls()
+        documents = []
+        for idx, item in enumerate(state.get("filtered_content", [])):
+            url_brands.setdefault(item["url"], []).append(brand)
+            if item["url"] not in indexed_urls:
+                documents.append(article_document(item, idx))
+        chunk_texts.extend(chunk.page_content for chunk in split_articles(documents))
+
+    unique_texts = list(dict.fromkeys(chunk_texts))
+    for i in range(0, len(unique_texts), BATCH_EMBED_BATCH_SIZE):
+        embeddings.embed_documents(unique_texts[i:i + BATCH_EMBED_BATCH_SIZE])
+
+    shared_urls = {url: brands for url, brands in url_brands.items() if len(set(brands)) > 1}
+    print(f"   🔗 Shared embedding: {len(chunk_texts)} chunks, {len(unique_texts)} unique, "
+          f"{len(shared_urls)} URLs found for several brands")
+    return {
+        "chunks": len(chunk_texts),
+        "unique_chunks": len(unique_texts),
+        "shared_urls": shared_urls,
+    }
+
+
+def compare_brands(results: Dict[str, Dict[str, Any]], shared_urls: Dict[str, List[str]]) -> Dict[str, Any]:
+    """Side-by-side view of the brands' Phase 1 results."""
+    total_mentions = sum(state.get("sentiment_stats", {}).get("total", 0) for state in results.values())
+    rows = []
+    for brand, state in results.items():
+        stats = state.get("sentiment_stats", {})
+        risk = state.get("risk_metrics", {})
+        emotions = state.get("emotion_analysis", {})
+        mentions = stats.get("total", 0)
+        rows.append({
+            "brand": brand,
+            "mentions": mentions,
+            "share_of_voice": round(mentions / total_mentions * 100, 2) if total_mentions else 0.0,
+            "sentiment": {
+                sentiment: round(stats.get(sentiment, 0) / mentions * 100, 2) if mentions else 0.0
+                for sentiment in ("positive", "neutral", "negative")
+            },
+            "overall_sentiment": stats.get("overall_sentiment", "Neutral"),
+            "vader_compound": stats.get("vader_compound", 0),
+            "risk_score": risk.get("score", 0),
+            "risk_level": risk.get("level", "LOW"),
+            "velocity": risk.get("velocity", 0),
+            "dominant_emotion": emotions.get("dominant_emotion"),
+            "danger_score": emotions.get("danger_score", 0),
+        })
+    rows.sort(key=lambda row: row["risk_score"], reverse=True)
+
+    def leader(key: Callable[[Dict[str, Any]], Any], reverse: bool = True) -> Optional[str]:
+        ranked = sorted((row for row in rows if row["mentions"]), key=key, reverse=reverse)
+        return ranked[0]["brand"] if ranked else None
+
+    return {
+        "brands": rows,
+        "total_mentions": total_mentions,
+        "highest_risk": leader(lambda row: row["risk_score"]),
+        "most_positive": leader(lambda row: row["vader_compound"]),
+        "most_negative": leader(lambda row: row["vader_compound"], reverse=False),
+        "most_discussed": leader(lambda row: row["mentions"]),
+        "shared_mentions": [{"url": url, "brands": brands} for url, brands in shared_urls.items()],
+    }
+
+
+def run_batch_phase1(brands: List[str], on_steps: Optional[StepCallback] = None) -> Dict[str, Any]:
+    """
+    Run Phase 1 for several brands, sharing the embedding work between them.
+
+    `on_steps(payloads, brand=..., seconds=...)` receives each completed
+    node as {"<brand>/<node>": payload} (AnalysisJob.record_steps fits).
+    Returns the final state per brand plus the cross-brand comparison.
+    """
+    if not brands:
+        raise ValueError("At least one brand is required")
+    if len(brands) > BATCH_MAX_BRANDS:
+        raise ValueError(f"At most {BATCH_MAX_BRANDS} brands per batch")
+
+    print(f"🏁 Batch analysis for {len(brands)} brands: {', '.join(brands)}")
+    start = time.perf_counter()
+
+    # Research halves in parallel (planner/search/evaluator are I/O bound)
+    research_graph = get_compiled_graph("phase1_research")
+    states = _for_each_brand(
+        brands, lambda brand: _stream_brand(research_graph, initial_phase1_state(brand), brand, on_steps))
+    research_seconds = time.perf_counter() - start
+
+    embed_start = time.perf_counter()
+    sharing = pre_embed_shared_chunks(states)
+    embed_seconds = time.perf_counter() - embed_start
+    if on_steps is not None:
+        on_steps({SHARED_EMBEDDING_STEP: {key: value for key, value in sharing.items() if key != "shared_urls"}},
+                 seconds=embed_seconds)
+
+    # Analysis halves in parallel; their RAG stages now hit the embedding cache
+    analysis_graph = get_compiled_graph("phase1_analysis")
+    results = _for_each_brand(
+        brands, lambda brand: _stream_brand(analysis_graph, states[brand], brand, on_steps))
+
+    total_seconds = time.perf_counter() - start
+    print(f"   ✅ Batch done in {total_seconds:.1f}s (research {research_seconds:.1f}s, "
+          f"shared embedding {embed_seconds:.1f}s)")
+    return {
+        "brands": results,
+        "comparison": compare_brands(results, sharing["shared_urls"]),
+        "sharing": {
+            "chunks": sharing["chunks"],
+            "unique_chunks": sharing["unique_chunks"],
+            "shared_urls": len(sharing["shared_urls"]),
+        },
+        "timings": {
+            "research": round(research_seconds, 3),
+            "shared_embedding": round(embed_seconds, 3),
+            "total": round(total_seconds, 3),
+        },
+    }
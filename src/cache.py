@@ -0,0 +1,127 @@
+"""
+Shared caching primitives for BrandShield.
+A two-tier TTL cache (in-memory LRU in front of SQLite) used for search
+responses and LLM generations.
+"""
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+
+# Local directory for caches, vector indexes and databases
+CACHE_DIR = os.getenv("BRANDSHIELD_CACHE_DIR", ".brandshield_cache")
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Stable sha256 key for a tuple of JSON-serializable parts."""
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+class TieredCache:
+    """
+    Two-tier TTL cache for JSON-serializable values.
+
+    The memory tier is an LRU bounded by `max_entries`. The optional SQLite
+    tier is shared between processes and bounded by `db_max_entries`.
+    Hits found on disk are promoted to memory.
+    """
+
+    def __init__(self, db_path: Optional[str], table: str, ttl: float,
+                 max_entries: int, db_max_entries: int):
+        self.db_path = db_path
+        self.table = table
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.db_max_entries = db_max_entries
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        if self.db_path is None:
+            return None
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "key TEXT PRIMARY KEY, expires_at REAL NOT NULL, payload TEXT NOT NULL)"
+            )
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_expires ON {self.table} (expires_at)")
+            self._conn.commit()
+        return self._conn
+
+    def _remember(self, key: str, expires_at: float, value: Any) -> None:
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return entry[1]
+                del self._memory[key]
+            row = None
+            try:
+                db = self._db()
+                if db is not None:
+                    row = db.execute(
+                        f"SELECT expires_at, payload FROM {self.table} WHERE key = ? AND expires_at > ?",
+                        (key, now)
+                    ).fetchone()
+            except sqlite3.Error as e:
+                print(f"⚠️ Cache read failed ({self.table}): {e}")
+            if row is None:
+                self.misses += 1
+                return None
+            value = json.loads(row[1])
+            self._remember(key, row[0], value)
+            self.disk_hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._remember(key, expires_at, value)
+            try:
+                db = self._db()
+                if db is None:
+                    return
+                db.execute(f"INSERT OR REPLACE INTO {self.table} (key, expires_at, payload) VALUES (?, ?, ?)",
+                           (key, expires_at, json.dumps(value)))
+                db.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (time.time(),))
+                # Size bound: keep the entries that expire last
+                db.execute(
+                    f"DELETE FROM {self.table} WHERE key NOT IN "
+                    f"(SELECT key FROM {self.table} ORDER BY expires_at DESC LIMIT ?)",
+                    (self.db_max_entries,)
+                )
+                db.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️ Cache write failed ({self.table}): {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "ttl_seconds": self.ttl,
+            "memory_entries": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+        }
@@ -0,0 +1,145 @@
+"""
+Near-duplicate mention detection for BrandShield.
+Syndicated press releases and reposts come back from search under many
+URLs with (nearly) the same text. Mentions are MinHashed over word
+shingles, candidate pairs are found with LSH banding, and each cluster of
+near-duplicates is collapsed to one canonical mention that carries the
+cluster size in `duplicate_count`.
+"""
+import os
+import re
+import zlib
+from itertools import chain
+from typing import List, Tuple
+
+import numpy as np
+
+from src.state import Mention
+
+
+DEDUPE_ENABLED = os.getenv("DEDUPE_ENABLED", "true").lower() == "true"
+DEDUPE_THRESHOLD = float(os.getenv("DEDUPE_THRESHOLD", "0.7"))  # estimated Jaccard similarity
+DEDUPE_SHINGLE_SIZE = int(os.getenv("DEDUPE_SHINGLE_SIZE", "5"))  # words per shingle
+# Weight sentiment counts by how many copies of each mention were found
+DEDUPE_WEIGHT_BY_REACH = os.getenv("DEDUPE_WEIGHT_BY_REACH", "false").lower() == "true"
+
+# MinHash signature: NUM_PERM hash functions split into LSH_BANDS bands of
+# rows each (a pair becomes a candidate when one band matches exactly)
+NUM_PERM = 64
+LSH_BANDS = 16
+_ROWS = NUM_PERM // LSH_BANDS
+_SHINGLE_BASE = np.uint64(1000003)
+_DOCS_PER_BLOCK = 1024  # bounds the (NUM_PERM x shingles) matrix
+
+# Multiply-shift hash functions: h_i(x) = (A_i * x + B_i mod 2**64) >> 32, A_i odd
+_rng = np.random.RandomState(1)
+_A = (_rng.randint(0, 1 << 62, size=(NUM_PERM, 1), dtype=np.int64).astype(np.uint64) << np.uint64(1)) | np.uint64(1)
+_B = _rng.randint(0, 1 << 62, size=(NUM_PERM, 1), dtype=np.int64).astype(np.uint64)
+
+_WORD = re.compile(r"\w+")
+
+
+def shingle_hashes(texts: List[str], size: int = DEDUPE_SHINGLE_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    32-bit hashes of every `size`-word shingle of each lowercased text (a
+    text shorter than that is one shingle), as one flat array plus each
+    text's offset into it.
+
+    Words are CRC32-hashed once and combined into shingle hashes with a
+    vectorized polynomial over each text's word sequence, padded with
+    size - 1 zeros so windows never span two texts.
+    """
+    words = [_WORD.findall(text.lower()) for text in texts]
+    lengths = np.array([len(w) for w in words], dtype=np.int64)
+    word_hash = {word: zlib.crc32(word.encode()) for word in set(chain.from_iterable(words))}
+    word_hash[""] = 0  # padding ("" is never a word)
+    padding = [""] * (size - 1)
+    hashes = np.fromiter((word_hash[word] for w in words for word in chain(w, padding)),
+                         dtype=np.uint64, count=int(lengths.sum()) + len(words) * (size - 1))
+
+    windows = np.zeros(len(hashes) - size + 1, dtype=np.uint64)
+    for j in range(size):
+        windows = windows * _SHINGLE_BASE + hashes[j:j + len(windows)]
+
+    # Keep the windows that start inside a text and don't run into its padding
+    counts = np.maximum(lengths - size + 1, 1)
+    text_starts = np.cumsum(lengths + size - 1) - (lengths + size - 1)
+    offsets = np.cumsum(counts) - counts
+    starts = np.repeat(text_starts - offsets, counts) + np.arange(counts.sum())
+    windows = windows[starts]
+    return (windows ^ (windows >> np.uint64(32))) & np.uint64(0xFFFFFFFF), offsets
+
+
+def minhash_signatures(texts: List[str]) -> np.ndarray:
+    """(len(texts), NUM_PERM) MinHash signatures, computed a block of texts at a time."""
+    signatures = np.empty((len(texts), NUM_PERM), dtype=np.uint32)
+    for start in range(0, len(texts), _DOCS_PER_BLOCK):
+        block = texts[start:start + _DOCS_PER_BLOCK]
+        hashes, offsets = shingle_hashes(block)
+        permuted = _A * hashes
+        permuted += _B
+        permuted >>= np.uint64(32)
+        signatures[start:start + len(block)] = np.minimum.reduceat(permuted, offsets, axis=1).T
+    return signatures
+
+
+def _find(parent: List[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def cluster_near_duplicates(texts: List[str], threshold: float = DEDUPE_THRESHOLD) -> np.ndarray:
+    """
+    Cluster label per text: the index of the first text in its cluster.
+
+    Texts sharing an LSH band bucket are compared with the bucket's first
+    member and joined when their signatures agree on at least `threshold`
+    of the hash functions (the MinHash estimate of Jaccard similarity).
+    """
+    n = len(texts)
+    parent = list(range(n))
+    if n < 2:
+        return np.arange(n)
+    signatures = minhash_signatures(texts)
+    for band in range(LSH_BANDS):
+        rows = np.ascontiguousarray(signatures[:, band * _ROWS:(band + 1) * _ROWS])
+        _, first, bucket = np.unique(rows.view([("", rows.dtype)] * _ROWS).ravel(),
+                                     return_index=True, return_inverse=True)
+        candidates = np.flatnonzero(first[bucket] != np.arange(n))
+        if not candidates.size:
+            continue
+        heads = first[bucket[candidates]]
+        similarity = (signatures[candidates] == signatures[heads]).mean(axis=1)
+        for i, head in zip(candidates[similarity >= threshold].tolist(), heads[similarity >= threshold].tolist()):
+            root_i, root_head = _find(parent, i), _find(parent, head)
+            if root_i != root_head:
+                parent[max(root_i, root_head)] = min(root_i, root_head)
+    return np.array([_find(parent, i) for i in range(n)])
+
+
+def dedupe_mentions(mentions: List[Mention], threshold: float = DEDUPE_THRESHOLD) -> List[Mention]:
+    """
+    Keep one mention per near-duplicate cluster, in the input order.
+
+    The canonical mention is the first of its cluster (the evaluator sorts
+    newest first, so it is the most recent copy); its duplicate_count is the
+    sum of the cluster's counts, so re-deduping already deduped mentions is
+    stable.
+    """
+    n = len(mentions)
+    texts = [item.text or item.title for item in mentions]
+    # Mentions without any words are never treated as copies of each other
+    comparable = np.array([_WORD.search(text) is not None for text in texts], dtype=bool)
+    if comparable.sum() < 2:
+        return list(mentions)
+    labels = np.arange(n)
+    indices = np.flatnonzero(comparable)
+    labels[indices] = indices[cluster_near_duplicates([texts[i] for i in indices.tolist()], threshold)]
+    copies = np.bincount(labels, weights=[item.duplicate_count for item in mentions], minlength=n)
+    canonical = []
+    for i in np.flatnonzero(labels == np.arange(n)).tolist():
+        mentions[i].duplicate_count = int(copies[i])
+        canonical.append(mentions[i])
+    return canonical
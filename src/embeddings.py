@@ -0,0 +1,347 @@
+"""
+Embedding model registry and cache for BrandShield.
+Loads each sentence-transformers model once per process and shares it
+across request threads, and keeps computed chunk vectors on disk so
+articles seen in earlier runs are never re-embedded.
+"""
+import os
+import sys
+import json
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_huggingface import HuggingFaceEmbeddings
+
+from src.cache import CACHE_DIR
+
+
+# Default model used by the RAG agent
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+# ============================================================================
+# PROCESS-WIDE MODEL REGISTRY
+# ============================================================================
+
+_models: Dict[str, HuggingFaceEmbeddings] = {}
+_model_stats: Dict[str, Dict[str, Any]] = {}
+_model_locks: Dict[str, threading.Lock] = {}
+_registry_lock = threading.Lock()
+
+
+def _current_rss_mb() -> Optional[float]:
+    """Resident memory of this process in MB (None if it can't be read)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS, KB on Linux
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except (ImportError, AttributeError):
+        return None
+
+
+def _model_lock(model_name: str) -> threading.Lock:
+    with _registry_lock:
+        if model_name not in _model_locks:
+            _model_locks[model_name] = threading.Lock()
+        return _model_locks[model_name]
+
+
+def get_embeddings(model_name: str = EMBEDDING_MODEL_NAME) -> HuggingFaceEmbeddings:
+    """
+    Get the shared embedding model, loading it on first use.
+
+    Loading is serialized per model (two threads asking for the same model
+    wait for one load), while different models can load in parallel.
+    Inference on the returned model is read-only and safe to call from
+    concurrent request threads.
+    """
+    model = _models.get(model_name)
+    if model is not None:
+        _model_stats[model_name]["requests"] += 1
+        return model
+
+    with _model_lock(model_name):
+        # Another thread may have finished loading while we waited
+        model = _models.get(model_name)
+        if model is not None:
+            _model_stats[model_name]["requests"] += 1
+            return model
+
+        print(f"🔢 Loading embedding model ({model_name})...")
+        rss_before = _current_rss_mb()
+        start = time.perf_counter()
+        model = HuggingFaceEmbeddings(
+            model_name=model_name,
+            model_kwargs={'device': 'cpu'},
+            encode_kwargs={'normalize_embeddings': True}
+        )
+        load_seconds = time.perf_counter() - start
+        rss_after = _current_rss_mb()
+
+        _model_stats[model_name] = {
+            "load_seconds": round(load_seconds, 3),
+            "rss_delta_mb": round(rss_after - rss_before, 1) if rss_before is not None and rss_after is not None else None,
+            "loaded_at": time.time(),
+            "requests": 1,
+        }
+        _models[model_name] = model
+        print(f"   ✅ Embedding model ready in {load_seconds:.2f}s")
+        return model
+
+
+def warm_embeddings(model_names: Optional[List[str]] = None) -> None:
+    """Load embedding models ahead of the first request (call at server startup)."""
+    for model_name in model_names or [EMBEDDING_MODEL_NAME]:
+        try:
+            get_embeddings(model_name)
+        except Exception as e:
+            print(f"⚠️ Failed to warm embedding model {model_name}: {e}")
+
+
+def get_embedding_stats() -> Dict[str, Any]:
+    """
+    Report per-model load time, memory footprint and reuse.
+
+    `seconds_saved` is the load time multiplied by the number of requests
+    that reused the already-loaded model instead of building a new one.
+    """
+    models = {}
+    for model_name, stats in _model_stats.items():
+        reuses = max(0, stats["requests"] - 1)
+        models[model_name] = {
+            **stats,
+            "reuses": reuses,
+            "seconds_saved": round(stats["load_seconds"] * reuses, 2),
+        }
+    return {
+        "models": models,
+        "process_rss_mb": _current_rss_mb(),
+        "cache": {name: cached.cache.stats() for name, cached in _cached_embeddings.items()},
+    }
+
+
+# ============================================================================
+# CONTENT-ADDRESSED EMBEDDING CACHE (memory-mapped, LRU-bounded)
+# ============================================================================
+
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "50000"))
+EMBEDDING_CACHE_DTYPE = os.getenv("EMBEDDING_CACHE_DTYPE", "float32")
+
+
+class EmbeddingCache:
+    """
+    Persistent vector cache keyed by sha256(model name + chunk text).
+
+    Vectors live in a single memory-mapped array file (one row per entry);
+    an index file maps keys to rows in least-recently-used order. When the
+    cache is full, the least recently used rows are reused for new entries.
+    max_entries=0 disables the cache (nothing is stored, every lookup misses).
+    """
+
+    def __init__(self, model_name: str, cache_dir: str = CACHE_DIR,
+                 max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES,
+                 dtype: str = EMBEDDING_CACHE_DTYPE):
+        if dtype not in ("float32", "float16"):
+            raise ValueError(f"Unsupported embedding cache dtype: {dtype}")
+        if max_entries < 0:
+            raise ValueError(f"Embedding cache max_entries must be >= 0, got {max_entries}")
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.dtype = np.dtype(dtype)
+        self.directory = os.path.join(cache_dir, "embeddings",
+                                      hashlib.sha256(model_name.encode()).hexdigest()[:16])
+        self.vectors_path = os.path.join(self.directory, "vectors.bin")
+        self.index_path = os.path.join(self.directory, "index.json")
+
+        self.dim: Optional[int] = None
+        self.capacity = 0
+        self._vectors: Optional[np.memmap] = None
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._free_rows: List[int] = []
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._load()
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\x00{text}".encode("utf-8")).hexdigest()
+
+    # ------------------------------------------------------------------ storage
+
+    def _load(self) -> None:
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path) as f:
+                meta = json.load(f)
+            if meta.get("dtype") != self.dtype.name:
+                print(f"⚠️ Embedding cache dtype changed ({meta.get('dtype')} → {self.dtype.name}). Starting fresh.")
+                return
+            self.dim = meta["dim"]
+            self.capacity = meta["capacity"]
+            self._index = OrderedDict((key, row) for key, row in meta["entries"])
+            used = set(self._index.values())
+            self._free_rows = [row for row in range(self.capacity) if row not in used]
+            self._vectors = np.memmap(self.vectors_path, dtype=self.dtype, mode="r+",
+                                      shape=(self.capacity, self.dim))
+        except Exception as e:
+            print(f"⚠️ Embedding cache unreadable ({e}). Starting fresh.")
+            self.dim, self.capacity, self._vectors = None, 0, None
+            self._index, self._free_rows = OrderedDict(), []
+
+    def _grow(self, needed_rows: int) -> None:
+        """Extend the vectors file so at least `needed_rows` more rows fit."""
+        new_capacity = min(self.max_entries, max(1024, self.capacity * 2, self.capacity + needed_rows))
+        if new_capacity <= self.capacity:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        with open(self.vectors_path, "ab") as f:
+            f.truncate(new_capacity * self.dim * self.dtype.itemsize)
+        self._free_rows.extend(range(self.capacity, new_capacity))
+        self.capacity = new_capacity
+        self._vectors = np.memmap(self.vectors_path, dtype=self.dtype, mode="r+",
+                                  shape=(self.capacity, self.dim))
+
+    def _take_row(self) -> int:
+        if self._free_rows:
+            return self._free_rows.pop()
+        # Cache is full: evict least recently used entry
+        _, row = self._index.popitem(last=False)
+        self.evictions += 1
+        return row
+
+    def _save_index(self) -> None:
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "model_name": self.model_name,
+                "dtype": self.dtype.name,
+                "dim": self.dim,
+                "capacity": self.capacity,
+                "entries": list(self._index.items()),
+            }, f)
+        os.replace(tmp_path, self.index_path)
+
+    # ------------------------------------------------------------------ public API
+
+    def get_many(self, keys: List[str]) -> List[Optional[List[float]]]:
+        """Look up vectors by key; misses come back as None."""
+        found: List[Optional[List[float]]] = []
+        with self._lock:
+            for key in keys:
+                row = self._index.get(key)
+                if row is None:
+                    self.misses += 1
+                    found.append(None)
+                    continue
+                self._index.move_to_end(key)
+                self.hits += 1
+                found.append(np.asarray(self._vectors[row], dtype=np.float32).tolist())
+        return found
+
+    def put_many(self, keys: List[str], vectors: List[List[float]]) -> None:
+        """Store vectors for keys and persist the index."""
+        if not keys or self.max_entries == 0:
+            return
+        with self._lock:
+            if self.dim is None:
+                self.dim = len(vectors[0])
+            new_keys = list(dict.fromkeys(key for key in keys if key not in self._index))
+            if len(self._free_rows) < len(new_keys) and self.capacity < self.max_entries:
+                self._grow(len(new_keys) - len(self._free_rows))
+
+            # New keys join the index only once their vectors are written
+            evictions = self.evictions
+            pending: Dict[str, int] = {}
+            for key in new_keys:
+                if not self._free_rows and not self._index:
+                    break  # batch larger than the whole cache
+                pending[key] = self._take_row()
+            if self.evictions > evictions:
+                # Persist the evictions before their rows are overwritten, so
+                # after a crash an evicted key can't serve the new vector
+                self._save_index()
+
+            for key, vector in zip(keys, vectors):
+                row = self._index.get(key, pending.get(key))
+                if row is not None:
+                    self._vectors[row] = np.asarray(vector, dtype=self.dtype)
+            self._vectors.flush()
+            self._index.update(pending)
+            for key in keys:
+                if key in self._index:
+                    self._index.move_to_end(key)
+            self._save_index()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._index),
+            "capacity": self.capacity,
+            "max_entries": self.max_entries,
+            "dtype": self.dtype.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    LangChain Embeddings wrapper that consults an EmbeddingCache first.
+
+    Only texts missing from the cache are sent to the underlying model, in
+    a single batch; a fully cached call never touches the model at all.
+    """
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME, cache: Optional[EmbeddingCache] = None):
+        self.model_name = model_name
+        self.cache = cache or EmbeddingCache(model_name)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self.cache.key(text) for text in texts]
+        vectors = self.cache.get_many(keys)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            # Dedupe within the batch so repeated chunks are embedded once
+            unique_texts: Dict[str, str] = {}
+            for i in missing:
+                unique_texts.setdefault(keys[i], texts[i])
+            new_vectors = get_embeddings(self.model_name).embed_documents(list(unique_texts.values()))
+            computed = dict(zip(unique_texts.keys(), new_vectors))
+            self.cache.put_many(list(computed.keys()), list(computed.values()))
+            for i in missing:
+                vectors[i] = computed[keys[i]]
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+_cached_embeddings: Dict[str, CachedEmbeddings] = {}
+
+
+def get_cached_embeddings(model_name: str = EMBEDDING_MODEL_NAME) -> CachedEmbeddings:
+    """Get the process-wide cache-backed embeddings for a model."""
+    with _registry_lock:
+        if model_name not in _cached_embeddings:
+            _cached_embeddings[model_name] = CachedEmbeddings(model_name)
+        return _cached_embeddings[model_name]
@@ -1,19 +1,31 @@
 """
 LangGraph workflow definition for BrandShield Deep Research.
-Orchestrates: Planner -> Search -> Evaluator -> RAG -> Social Media -> Human Review -> Strategy -> Critic
+Orchestrates: Planner -> Search -> Evaluator -> Dedupe -> (Scoring -> RAG || Social Media) -> Human Review -> Strategy -> Critic
 """
-from langgraph.graph import StateGraph, END
+import threading
+from typing import Dict, Any
+
+from langgraph.graph import StateGraph, START, END
 from src.state import AgentState
 from src.agents import (
     planning_agent, 
     search_agent, 
     evaluator_agent, 
+    dedupe_agent,
+    sentiment_scoring_agent,
     rag_agent, 
     strategy_agent, 
     social_media_agent
 )
 from src.advanced_agents import critic_agent
 
+# Node names in execution order (used for job progress reporting)
+PHASE1_NODES = ["planner", "search", "evaluator", "dedupe", "scoring", "rag_analysis", "social_media"]
+PHASE2_NODES = ["strategy", "critic"]
+# Phase 1 split after dedupe, so batch runs can share work between the halves
+PHASE1_RESEARCH_NODES = ["planner", "search", "evaluator", "dedupe"]
+PHASE1_ANALYSIS_NODES = ["scoring", "rag_analysis", "social_media"]
+
 def human_approval_node(state: AgentState) -> AgentState:
     """
     Checkpoint node for Human-in-the-Loop.
@@ -38,23 +50,70 @@ def should_revise(state: AgentState) -> str:
         return "approve"
 
 def create_phase1_graph():
-    """Phase 1: Research & Social Media Drafts"""
+    """
+    Phase 1: Research & Social Media Drafts
+    
+    The dedupe stage collapses near-duplicate mentions right after the
+    evaluator. The graph then fans out into two branches that only
+    share filtered_content: Scoring -> RAG (embeddings, FAISS, verification)
+    and Social Media (reply drafting). Both branches return partial updates
+    with disjoint keys, and the run ends once both have finished.
+    """
     workflow = StateGraph(AgentState)
     workflow.add_node("planner", planning_agent)
     workflow.add_node("search", search_agent)
     workflow.add_node("evaluator", evaluator_agent)
+    workflow.add_node("dedupe", dedupe_agent)
+    workflow.add_node("scoring", sentiment_scoring_agent)
     workflow.add_node("rag_analysis", rag_agent)
     workflow.add_node("social_media", social_media_agent)
     
     workflow.set_entry_point("planner")
     workflow.add_edge("planner", "search")
     workflow.add_edge("search", "evaluator")
-    workflow.add_edge("evaluator", "rag_analysis")
-    workflow.add_edge("rag_analysis", "social_media")
+    workflow.add_edge("evaluator", "dedupe")
+    # Fan out: both branches start as soon as dedupe finishes
+    workflow.add_edge("dedupe", "scoring")
+    workflow.add_edge("dedupe", "social_media")
+    workflow.add_edge("scoring", "rag_analysis")
+    # Fan in: the run completes when both branches reach END
+    workflow.add_edge("rag_analysis", END)
     workflow.add_edge("social_media", END)
     
     return workflow.compile()
 
+def create_phase1_research_graph():
+    """Phase 1, first half: Planner -> Search -> Evaluator -> Dedupe"""
+    workflow = StateGraph(AgentState)
+    workflow.add_node("planner", planning_agent)
+    workflow.add_node("search", search_agent)
+    workflow.add_node("evaluator", evaluator_agent)
+    workflow.add_node("dedupe", dedupe_agent)
+    
+    workflow.set_entry_point("planner")
+    workflow.add_edge("planner", "search")
+    workflow.add_edge("search", "evaluator")
+    workflow.add_edge("evaluator", "dedupe")
+    workflow.add_edge("dedupe", END)
+    return workflow.compile()
+
+def create_phase1_analysis_graph():
+    """
+    Phase 1, second half: (Scoring -> RAG || Social Media), starting from
+    a state that already holds filtered_content.
+    """
+    workflow = StateGraph(AgentState)
+    workflow.add_node("scoring", sentiment_scoring_agent)
+    workflow.add_node("rag_analysis", rag_agent)
+    workflow.add_node("social_media", social_media_agent)
+    
+    workflow.add_edge(START, "scoring")
+    workflow.add_edge(START, "social_media")
+    workflow.add_edge("scoring", "rag_analysis")
+    workflow.add_edge("rag_analysis", END)
+    workflow.add_edge("social_media", END)
+    return workflow.compile()
+
 def create_phase2_graph():
     """Phase 2: Strategy & Final Report"""
     workflow = StateGraph(AgentState)
@@ -74,6 +133,50 @@ def create_phase2_graph():
     )
     return workflow.compile()
 
+# ============================================================================
+# COMPILED GRAPH REGISTRY
+# ============================================================================
+# Compiled graphs hold no per-run state (no checkpointer), so one instance
+# per workflow is shared by every request thread.
+
+GRAPH_BUILDERS = {
+    "phase1": create_phase1_graph,
+    "phase2": create_phase2_graph,
+    "phase1_research": create_phase1_research_graph,
+    "phase1_analysis": create_phase1_analysis_graph,
+}
+
+_compiled_graphs: Dict[str, Any] = {}
+_graphs_lock = threading.Lock()
+
+
+def get_compiled_graph(name: str):
+    """Get the shared compiled graph for a workflow, building it on first use."""
+    graph = _compiled_graphs.get(name)
+    if graph is not None:
+        return graph
+    with _graphs_lock:
+        if name not in _compiled_graphs:
+            _compiled_graphs[name] = GRAPH_BUILDERS[name]()
+        return _compiled_graphs[name]
+
+
+def get_phase1_graph():
+    """Shared compiled Phase 1 graph."""
+    return get_compiled_graph("phase1")
+
+
+def get_phase2_graph():
+    """Shared compiled Phase 2 graph."""
+    return get_compiled_graph("phase2")
+
+
+def warm_graphs() -> None:
+    """Compile every workflow ahead of the first request (call at startup)."""
+    for name in GRAPH_BUILDERS:
+        get_compiled_graph(name)
+
+
 def run_analysis(brand_name: str) -> None:
     pass
 
@@ -0,0 +1,251 @@
+"""
+Background analysis jobs for BrandShield.
+Runs LangGraph workflows on an in-process worker pool so API request
+threads return immediately, and records per-node progress that clients
+can poll, or follow as an event stream, while a job runs.
+"""
+import os
+import uuid
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable
+
+from src.agents import REPORT_TOKEN_CALLBACK
+
+
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "2"))
+ANALYSIS_JOB_HISTORY = int(os.getenv("ANALYSIS_JOB_HISTORY", "200"))  # finished jobs kept for polling
+
+# Job lifecycle
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+# ============================================================================
+# PARTIAL PAYLOADS (what each node contributes, small enough to stream)
+# ============================================================================
+
+def _count(key: str) -> Callable[[Dict[str, Any]], int]:
+    return lambda output: len(output.get(key) or [])
+
+
+NODE_PAYLOADS: Dict[str, Dict[str, Callable[[Dict[str, Any]], Any]]] = {
+    "planner": {"research_plan": lambda output: output.get("research_plan", [])},
+    "search": {"raw_mentions": _count("raw_content")},
+    "evaluator": {"recent_mentions": _count("filtered_content")},
+    "dedupe": {
+        "unique_mentions": _count("filtered_content"),
+        "duplicates_removed": lambda output: sum(item["duplicate_count"] - 1
+                                                 for item in output.get("filtered_content") or []),
+    },
+    "scoring": {"scored_mentions": lambda output: len((output.get("sentiment_table") or {}).get("compound", []))},
+    "rag_analysis": {
+        "sentiment_stats": lambda output: output.get("sentiment_stats", {}),
+        "emotion_analysis": lambda output: output.get("emotion_analysis", {}),
+        "risk_metrics": lambda output: output.get("risk_metrics", {}),
+        "rag_findings": lambda output: output.get("rag_findings_structured", []),
+    },
+    "social_media": {"social_media_replies": lambda output: output.get("social_media_replies", [])},
+    "strategy": {
+        "draft_report": lambda output: output.get("draft_report", ""),
+        "revision_count": lambda output: output.get("revision_count", 0),
+    },
+    "critic": {
+        "critic_approved": lambda output: output.get("critic_approved", False),
+        "critic_feedback": lambda output: output.get("critic_feedback", ""),
+    },
+}
+
+
+def node_payload(node: str, output: Any) -> Dict[str, Any]:
+    """Extract the partial result a node produced (empty for unknown nodes)."""
+    if not isinstance(output, dict):
+        return {}
+    return {field: extract(output) for field, extract in NODE_PAYLOADS.get(node, {}).items()}
+
+
+class AnalysisJob:
+    """
+    State of one queued graph run.
+
+    Every state change is also appended to `events` (queued, started, one
+    per node completion, then done/failed), so stream consumers can replay
+    a job from any point and wait for what comes next. Jobs submitted with
+    stream_report=True also publish a `token` event per report chunk.
+    """
+
+    def __init__(self, kind: str, expected_nodes: List[str]):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.expected_nodes = expected_nodes
+        self.status = JOB_QUEUED
+        self.progress: List[Dict[str, Any]] = []
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.events: List[Dict[str, Any]] = []
+        self._changed = threading.Condition()
+        self._last_step: Dict[Optional[str], float] = {}
+        self.publish("queued")
+
+    def publish(self, event: str, **data: Any) -> None:
+        with self._changed:
+            self.events.append({"id": len(self.events), "event": event,
+                                "job_id": self.id, "timestamp": time.time(), **data})
+            self._changed.notify_all()
+
+    def record_steps(self, payloads: Dict[str, Dict[str, Any]], seconds: Optional[float] = None,
+                     **extra: Any) -> None:
+        """
+        Record nodes that completed together (one graph superstep), each with
+        its partial payload. Durations run from the previous step with the
+        same `brand` (batch jobs interleave brands) unless `seconds` is given.
+        Thread-safe, so task jobs can report from their own workers.
+        """
+        with self._changed:
+            now = time.time()
+            lane = extra.get("brand")
+            if seconds is None:
+                seconds = now - self._last_step.get(lane, self.started_at or now)
+            self._last_step[lane] = now
+            for node, payload in payloads.items():
+                step = {
+                    "node": node,
+                    **extra,
+                    "seconds": round(seconds, 3),
+                    "elapsed": round(now - (self.started_at or now), 3),
+                    "completed_at": datetime.fromtimestamp(now).isoformat(),
+                }
+                self.progress.append(step)
+                self.publish("node", **step, payload=payload)
+
+    def events_since(self, index: int, timeout: float) -> List[Dict[str, Any]]:
+        """Events from `index` on, waiting up to `timeout` seconds if there are none yet."""
+        with self._changed:
+            if len(self.events) <= index:
+                self._changed.wait(timeout)
+            return self.events[index:]
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JOB_DONE, JOB_FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        completed = {step["node"] for step in self.progress}
+        data = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": {
+                "completed_nodes": len(completed & set(self.expected_nodes)),
+                "total_nodes": len(self.expected_nodes),
+                "steps": list(self.progress),
+            },
+            "created_at": datetime.fromtimestamp(self.created_at).isoformat(),
+            "started_at": datetime.fromtimestamp(self.started_at).isoformat() if self.started_at else None,
+            "finished_at": datetime.fromtimestamp(self.finished_at).isoformat() if self.finished_at else None,
+        }
+        if self.status == JOB_DONE:
+            data["result"] = self.result
+        if self.status == JOB_FAILED:
+            data["error"] = self.error
+        return data
+
+
+class JobManager:
+    """
+    Bounded worker pool for graph runs.
+
+    `submit` queues a compiled graph with its input state and returns at
+    once. The worker streams the graph so each node completion is recorded
+    with its duration; when the run ends, `on_complete` turns the final
+    state into the job's result payload. `submit_task` queues any callable
+    that takes the job (to record its own steps) and returns a result state.
+    """
+
+    def __init__(self, max_workers: int = ANALYSIS_WORKERS, max_history: int = ANALYSIS_JOB_HISTORY):
+        self.max_history = max_history
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis-job")
+        self._jobs: "OrderedDict[str, AnalysisJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, graph, initial_state: Dict[str, Any],
+               on_complete: Callable[[Dict[str, Any]], Dict[str, Any]],
+               expected_nodes: Optional[List[str]] = None, stream_report: bool = False) -> AnalysisJob:
+        job = AnalysisJob(kind, expected_nodes or [])
+        config: Dict[str, Any] = {}
+        if stream_report:
+            def on_token(token: str, revision: int) -> None:
+                job.publish("token", node="strategy", token=token, revision=revision)
+            config = {"configurable": {REPORT_TOKEN_CALLBACK: on_token}}
+        return self._enqueue(job, lambda: self._stream_graph(job, graph, initial_state, config), on_complete)
+
+    def submit_task(self, kind: str, task: Callable[[AnalysisJob], Dict[str, Any]],
+                    on_complete: Callable[[Dict[str, Any]], Dict[str, Any]],
+                    expected_nodes: Optional[List[str]] = None) -> AnalysisJob:
+        job = AnalysisJob(kind, expected_nodes or [])
+        return self._enqueue(job, lambda: task(job), on_complete)
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _enqueue(self, job: AnalysisJob, execute: Callable[[], Dict[str, Any]],
+                 on_complete: Callable[[Dict[str, Any]], Dict[str, Any]]) -> AnalysisJob:
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job, execute, on_complete)
+        return job
+
+    def _prune(self) -> None:
+        # Drop the oldest finished jobs; queued/running ones are always kept
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.max_history)]:
+            del self._jobs[job_id]
+
+    @staticmethod
+    def _stream_graph(job: AnalysisJob, graph, initial_state: Dict[str, Any],
+                      config: Dict[str, Any]) -> Dict[str, Any]:
+        final_state = initial_state
+        for mode, chunk in graph.stream(initial_state, config, stream_mode=["updates", "values"]):
+            if mode == "values":
+                final_state = chunk
+                continue
+            job.record_steps({node: node_payload(node, output) for node, output in chunk.items()})
+        return final_state
+
+    def _run(self, job: AnalysisJob, execute: Callable[[], Dict[str, Any]],
+             on_complete: Callable[[Dict[str, Any]], Dict[str, Any]]) -> None:
+        job.status = JOB_RUNNING
+        job.started_at = time.time()
+        job.publish("started", kind=job.kind, nodes=job.expected_nodes)
+        print(f"🧵 Job {job.id[:8]} ({job.kind}) started")
+        try:
+            job.result = on_complete(execute())
+            job.status = JOB_DONE
+            job.publish("done", elapsed=round(time.time() - job.started_at, 3), result=job.result)
+            print(f"   ✅ Job {job.id[:8]} ({job.kind}) done in {time.time() - job.started_at:.1f}s")
+        except Exception as e:
+            job.error = str(e)
+            job.status = JOB_FAILED
+            job.publish("failed", error=job.error)
+            print(f"   ❌ Job {job.id[:8]} ({job.kind}) failed: {e}")
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                self._prune()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = {status: 0 for status in (JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED)}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        return {"workers": self._executor._max_workers, "jobs": counts}
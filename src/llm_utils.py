@@ -2,9 +2,14 @@
 LLM Utilities for BrandShield
 Primary: Google Gemini API (fast, high quality)
 Fallback: HuggingFace Inference API
+Caching: prompt-keyed response cache (memory LRU + optional SQLite tier)
 """
 import os
-from typing import Optional
+import threading
+import time
+from typing import Optional, Dict, Any, Iterator
+
+from src.cache import CACHE_DIR, TieredCache, make_cache_key
 
 # Google Gemini
 try:
@@ -28,6 +33,12 @@ except ImportError:
         print("⚠️ langchain-huggingface not installed. Run: pip install langchain-huggingface")
 
 
+class LLMResponse:
+    """Response object with a .content attribute, like LangChain chat messages"""
+    def __init__(self, text):
+        self.content = text
+
+
 class GeminiLLM:
     """Wrapper for Google Gemini to work like LangChain LLM"""
     def __init__(self, model_name="gemini-pro", temperature=0.7, max_tokens=2048):
@@ -53,10 +64,119 @@ class GeminiLLM:
             generation_config=generation_config
         )
         # Return object with .content attribute for compatibility
-        class Response:
-            def __init__(self, text):
-                self.content = text
-        return Response(response.text)
+        return LLMResponse(response.text)
+    
+    def stream(self, prompt) -> Iterator[str]:
+        """Generate response from Gemini, yielding text chunks as they arrive"""
+        generation_config = genai.types.GenerationConfig(
+            temperature=self.temperature,
+            max_output_tokens=self.max_tokens,
+        )
+        response = self.model.generate_content(
+            prompt,
+            generation_config=generation_config,
+            stream=True
+        )
+        for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+
+def stream_llm(llm, prompt) -> Iterator[str]:
+    """
+    Yield the response to prompt as text chunks.
+    Uses the client's stream() when it has one (Gemini, HuggingFace
+    endpoints); otherwise yields the whole invoke() response at once.
+    """
+    if not hasattr(llm, "stream"):
+        response = llm.invoke(prompt)
+        # Handle both string and chat response formats
+        yield response.content if hasattr(response, 'content') else str(response)
+        return
+    for chunk in llm.stream(prompt):
+        # LangChain chat models yield message chunks, plain LLMs yield str
+        yield chunk.content if hasattr(chunk, 'content') else str(chunk)
+
+
+# ============================================================================
+# LLM CLIENT POOL
+# ============================================================================
+
+LLM_POOL_MAX_FAILURES = int(os.getenv("LLM_POOL_MAX_FAILURES", "3"))
+LLM_PROBE_COOLDOWN = float(os.getenv("LLM_PROBE_COOLDOWN", "300"))  # seconds before retrying Gemini
+
+_llm_pool: Dict[tuple, "PooledLLM"] = {}
+_llm_pool_lock = threading.Lock()
+_llm_pool_stats = {"constructions": 0, "reuses": 0, "evictions": 0, "construction_seconds": 0.0}
+_gemini_unavailable_until = 0.0
+
+
+class PooledLLM:
+    """
+    A pooled, reusable LLM client.
+    After LLM_POOL_MAX_FAILURES consecutive failed calls it is evicted from
+    the pool, so the next get_llm() builds a fresh client.
+    """
+    def __init__(self, llm, key: tuple):
+        self.llm = llm
+        self.key = key
+        self.failures = 0
+    
+    def invoke(self, prompt):
+        try:
+            response = self.llm.invoke(prompt)
+        except Exception:
+            self._record_failure()
+            raise
+        self.failures = 0
+        return response
+    
+    def stream(self, prompt) -> Iterator[str]:
+        try:
+            yield from stream_llm(self.llm, prompt)
+        except Exception:
+            self._record_failure()
+            raise
+        self.failures = 0
+    
+    def _record_failure(self) -> None:
+        self.failures += 1
+        if self.failures >= LLM_POOL_MAX_FAILURES:
+            with _llm_pool_lock:
+                if _llm_pool.get(self.key) is self:
+                    del _llm_pool[self.key]
+                    _llm_pool_stats["evictions"] += 1
+                    print(f"⚠️ Evicting unhealthy LLM client {self.key[:2]} after {self.failures} failures")
+    
+    def __getattr__(self, name):
+        # Anything else (model_name, ...) comes from the wrapped client
+        return getattr(self.llm, name)
+
+
+def _get_pooled_llm(key: tuple, factory) -> PooledLLM:
+    """Return the pooled client for key, constructing it on first use."""
+    with _llm_pool_lock:
+        client = _llm_pool.get(key)
+        if client is not None:
+            _llm_pool_stats["reuses"] += 1
+            return client
+        start = time.perf_counter()
+        client = PooledLLM(factory(), key)
+        _llm_pool_stats["construction_seconds"] += time.perf_counter() - start
+        _llm_pool_stats["constructions"] += 1
+        _llm_pool[key] = client
+        return client
+
+
+def get_llm_pool_stats() -> Dict[str, Any]:
+    """Pool size, reuse counts and the construction time reuse avoided."""
+    with _llm_pool_lock:
+        stats = dict(_llm_pool_stats)
+        stats["pooled_clients"] = len(_llm_pool)
+    avg_construction = stats["construction_seconds"] / stats["constructions"] if stats["constructions"] else 0.0
+    stats["construction_seconds"] = round(stats["construction_seconds"], 3)
+    stats["construction_seconds_avoided"] = round(avg_construction * stats["reuses"], 3)
+    return stats
 
 
 def get_llm(
@@ -69,6 +189,10 @@ def get_llm(
     """
     Get an LLM instance. Prefers Google Gemini, falls back to HuggingFace.
     
+    Clients are pooled per (backend, model, temperature, max_tokens) and
+    reused across requests. If Gemini fails to initialize, it is skipped for
+    LLM_PROBE_COOLDOWN seconds instead of being re-probed on every call.
+    
     Args:
         model_type: "gemini" (default) or "huggingface"
         temperature: Creativity of the model (0.0 to 1.0)
@@ -79,17 +203,21 @@ def get_llm(
     Returns:
         LLM instance
     """
+    global _gemini_unavailable_until
     
     # Try Gemini first if available
-    if GEMINI_AVAILABLE and os.getenv("GEMINI_API_KEY"):
-        try:
+    if GEMINI_AVAILABLE and os.getenv("GEMINI_API_KEY") and time.time() >= _gemini_unavailable_until:
+        def build_gemini():
             llm = GeminiLLM(
                 temperature=temperature,
                 max_tokens=max_tokens
             )
             print(f"✅ Using Google Gemini ({llm.model_name}, temperature={temperature})")
             return llm
+        try:
+            return _get_pooled_llm(("gemini", "gemini-pro", temperature, max_tokens), build_gemini)
         except Exception as e:
+            _gemini_unavailable_until = time.time() + LLM_PROBE_COOLDOWN
             print(f"⚠️ Gemini failed: {e}. Falling back to HuggingFace...")
             print(f"   Note: Make sure your API key is valid and has Gemini API enabled")
     
@@ -101,7 +229,7 @@ def get_llm(
     if not sec_key:
         raise Exception("HUGGINGFACEHUB_API_TOKEN not found. Add it to .env file.")
     
-    try:
+    def build_huggingface():
         # Use HuggingFaceEndpoint with the new API
         llm = HuggingFaceEndpoint(
             repo_id=hf_model,
@@ -111,11 +239,136 @@ def get_llm(
         )
         print(f"✅ Using HuggingFace Inference: {hf_model}")
         return llm
+    
+    try:
+        return _get_pooled_llm(("huggingface", hf_model, temperature, max_tokens), build_huggingface)
     except Exception as e:
         raise Exception(f"Failed to initialize HuggingFace: {e}")
 
 
-def get_agent_llm(agent_name: str, temperature: float = 0.7):
+# ============================================================================
+# LLM RESPONSE CACHE
+# ============================================================================
+
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+LLM_CACHE_DB_MAX_ENTRIES = int(os.getenv("LLM_CACHE_DB_MAX_ENTRIES", "20000"))
+LLM_CACHE_DISK = os.getenv("LLM_CACHE_DISK", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_DEFAULT_TTL = 3600
+
+# Cache TTL per agent in seconds. None = don't cache (creative generations
+# such as reports and social replies should vary between runs).
+AGENT_CACHE_TTL = {
+    "search": 6 * 3600,      # planner prompts for a brand
+    "extraction": 24 * 3600, # YES/NO verification of a chunk
+    "critic": 3600,          # review of an identical draft
+    "report": None,
+}
+
+llm_cache = TieredCache(
+    db_path=os.path.join(CACHE_DIR, "llm_cache.sqlite3") if LLM_CACHE_DISK else None,
+    table="llm_cache",
+    ttl=LLM_CACHE_DEFAULT_TTL,
+    max_entries=LLM_CACHE_MAX_ENTRIES,
+    db_max_entries=LLM_CACHE_DB_MAX_ENTRIES
+)
+_agent_cache_stats: Dict[str, Dict[str, int]] = {}
+_agent_cache_stats_lock = threading.Lock()
+
+
+class CachedLLM:
+    """
+    Wraps an LLM so identical prompts are answered from llm_cache.
+    Keyed by (model, temperature, max_tokens, prompt hash).
+    """
+    def __init__(self, llm, agent_name: str, model: str, temperature: float, max_tokens: int, ttl: float):
+        self.llm = llm
+        self.agent_name = agent_name
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.ttl = ttl
+    
+    def _record(self, outcome: str) -> None:
+        with _agent_cache_stats_lock:
+            stats = _agent_cache_stats.setdefault(self.agent_name, {"hits": 0, "misses": 0})
+            stats[outcome] += 1
+    
+    def _key(self, prompt) -> str:
+        return make_cache_key(self.model, self.temperature, self.max_tokens,
+                              make_cache_key(str(prompt)))
+    
+    def invoke(self, prompt):
+        key = self._key(prompt)
+        cached = llm_cache.get(key)
+        if cached is not None:
+            self._record("hits")
+            return LLMResponse(cached)
+        
+        self._record("misses")
+        response = self.llm.invoke(prompt)
+        # Handle both string and chat response formats
+        text = response.content if hasattr(response, 'content') else str(response)
+        llm_cache.set(key, text, ttl=self.ttl)
+        return response
+    
+    def stream(self, prompt) -> Iterator[str]:
+        """Stream a response; cache hits arrive as one chunk, completed streams are cached."""
+        key = self._key(prompt)
+        cached = llm_cache.get(key)
+        if cached is not None:
+            self._record("hits")
+            yield cached
+            return
+        
+        self._record("misses")
+        chunks = []
+        for chunk in stream_llm(self.llm, prompt):
+            chunks.append(chunk)
+            yield chunk
+        llm_cache.set(key, "".join(chunks), ttl=self.ttl)
+    
+    def __getattr__(self, name):
+        # Anything else (model_name, ...) comes from the wrapped LLM
+        return getattr(self.llm, name)
+
+
+def get_llm_cache_stats() -> Dict[str, Any]:
+    """Overall and per-agent LLM cache hit rates."""
+    with _agent_cache_stats_lock:
+        agents = {
+            name: {**stats, "hit_rate": round(stats["hits"] / (stats["hits"] + stats["misses"]), 3)
+                   if stats["hits"] + stats["misses"] else 0.0}
+            for name, stats in _agent_cache_stats.items()
+        }
+    return {**llm_cache.stats(), "agents": agents}
+
+
+# Per-agent model settings (temperature is overridden by the caller)
+AGENT_CONFIGS = {
+    "search": {
+        "max_tokens": 512,
+        "temperature": 0.5,
+        "hf_model": "google/flan-t5-base"
+    },
+    "extraction": {
+        "max_tokens": 1024,
+        "temperature": 0.3,
+        "hf_model": "google/flan-t5-base"
+    },
+    "report": {
+        "max_tokens": 2048,
+        "temperature": 0.7,
+        "hf_model": "google/flan-t5-large"
+    },
+    "critic": {
+        "max_tokens": 1024,
+        "temperature": 0.2,
+        "hf_model": "google/flan-t5-base"
+    }
+}
+
+
+def get_agent_llm(agent_name: str, temperature: float = 0.7, cache: Optional[bool] = None):
     """
     Get optimized LLM for specific agent tasks.
     Uses HuggingFace with simpler models.
@@ -125,38 +378,30 @@ def get_agent_llm(agent_name: str, temperature: float = 0.7):
     - extraction: Accurate analysis  
     - report: Creative writing
     - critic: Strict evaluation
-    """
     
-    agent_configs = {
-        "search": {
-            "max_tokens": 512,
-            "temperature": 0.5,
-            "hf_model": "google/flan-t5-base"
-        },
-        "extraction": {
-            "max_tokens": 1024,
-            "temperature": 0.3,
-            "hf_model": "google/flan-t5-base"
-        },
-        "report": {
-            "max_tokens": 2048,
-            "temperature": 0.7,
-            "hf_model": "google/flan-t5-large"
-        },
-        "critic": {
-            "max_tokens": 1024,
-            "temperature": 0.2,
-            "hf_model": "google/flan-t5-base"
-        }
-    }
+    Responses are cached per AGENT_CACHE_TTL. Pass cache=False to opt out
+    (or cache=True to cache an agent that is uncached by default).
+    """
     
-    config = agent_configs.get(agent_name, agent_configs["report"])
+    config = dict(AGENT_CONFIGS.get(agent_name, AGENT_CONFIGS["report"]))
     config["temperature"] = temperature
     
     # Use HuggingFace
-    return get_llm(
+    llm = get_llm(
         model_type="huggingface",
         temperature=config["temperature"],
         max_tokens=config["max_tokens"],
         hf_model=config["hf_model"]
     )
+    
+    ttl = AGENT_CACHE_TTL.get(agent_name)
+    if cache is False or (ttl is None and not cache):
+        return llm
+    return CachedLLM(
+        llm,
+        agent_name=agent_name,
+        model=getattr(llm, "model_name", None) or getattr(llm, "repo_id", None) or config["hf_model"],
+        temperature=config["temperature"],
+        max_tokens=config["max_tokens"],
+        ttl=ttl if ttl is not None else LLM_CACHE_DEFAULT_TTL
+    )
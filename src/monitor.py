@@ -0,0 +1,417 @@
+"""
+Continuous brand monitoring for BrandShield.
+Re-analyzes registered brands on an interval. Each brand keeps a
+high-water mark of the newest mention it has seen, so a cycle fetches,
+scores and embeds only mentions published since then and folds them into
+the brand's stored scores, stats and emotion series.
+"""
+import os
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pytz
+
+from src.cache import CACHE_DIR
+from src.agents import (
+    planning_agent, evaluator_agent, fetch_mentions, compute_sentiment_statistics,
+    article_document, split_articles, TIME_WINDOW_DAYS
+)
+from src.advanced_agents import score_sentiment, analyze_emotions, SENTIMENT_COLUMNS
+from src.embeddings import get_cached_embeddings, EMBEDDING_MODEL_NAME
+from src.search import get_search_backend, bucketed_start_date
+from src.vector_index import get_brand_index
+
+
+MONITOR_ENABLED = os.getenv("MONITOR_ENABLED", "true").lower() in ("1", "true", "yes")
+MONITOR_DEFAULT_INTERVAL = float(os.getenv("MONITOR_DEFAULT_INTERVAL", "900"))  # seconds between cycles
+MONITOR_MIN_INTERVAL = float(os.getenv("MONITOR_MIN_INTERVAL", "60"))  # seconds
+MONITOR_WATERMARK_OVERLAP = float(os.getenv("MONITOR_WATERMARK_OVERLAP", "600"))  # re-search seconds before the mark
+MONITOR_WORKERS = int(os.getenv("MONITOR_WORKERS", "2"))  # brands refreshed at once
+MONITOR_SERIES_POINTS = int(os.getenv("MONITOR_SERIES_POINTS", "500"))  # series points kept per brand
+
+
+# ============================================================================
+# MONITOR STORE (brands, watermarks, scored mentions, series)
+# ============================================================================
+
+class MonitorStore:
+    """
+    SQLite state for monitored brands.
+
+    `brands` holds each brand's interval, research plan and watermark (the
+    newest published_timestamp seen). `mentions` keeps one row of VADER
+    scores per URL inside the time window, which is all the window stats
+    need, so old mentions are never re-scored. `series` gets one point per
+    cycle with the window's sentiment and emotion scores.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or os.path.join(CACHE_DIR, "monitor.sqlite3")
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS brands ("
+                "brand TEXT PRIMARY KEY, interval REAL NOT NULL, research_plan TEXT, "
+                "watermark REAL, last_run REAL, next_run REAL NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS mentions ("
+                "brand TEXT NOT NULL, url TEXT NOT NULL, published_timestamp REAL NOT NULL, "
+                f"{', '.join(f'{column} REAL NOT NULL' for column in SENTIMENT_COLUMNS)}, "
+                "PRIMARY KEY (brand, url))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_mentions_published ON mentions (brand, published_timestamp)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS series ("
+                "brand TEXT NOT NULL, run_at REAL NOT NULL, new_mentions INTEGER NOT NULL, "
+                "window_mentions INTEGER NOT NULL, point TEXT NOT NULL, PRIMARY KEY (brand, run_at))"
+            )
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def _to_brand(row) -> Dict[str, Any]:
+        brand, interval, plan, watermark, last_run, next_run, created_at = row
+        return {
+            "brand": brand,
+            "interval": interval,
+            "research_plan": json.loads(plan) if plan else [],
+            "watermark": watermark,
+            "last_run": last_run,
+            "next_run": next_run,
+            "created_at": created_at,
+        }
+
+    # ------------------------------------------------------------------ brands
+
+    def register(self, brand: str, interval: float) -> Dict[str, Any]:
+        """Add a brand (due immediately) or change its interval."""
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT INTO brands (brand, interval, next_run, created_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (brand) DO UPDATE SET interval = excluded.interval, "
+                "next_run = MIN(next_run, COALESCE(last_run, 0) + excluded.interval)",
+                (brand, interval, now, now)
+            )
+            db.commit()
+        return self.get_brand(brand)
+
+    def unregister(self, brand: str) -> bool:
+        with self._lock:
+            db = self._db()
+            cursor = db.execute("DELETE FROM brands WHERE brand = ?", (brand,))
+            db.execute("DELETE FROM mentions WHERE brand = ?", (brand,))
+            db.execute("DELETE FROM series WHERE brand = ?", (brand,))
+            db.commit()
+            return cursor.rowcount > 0
+
+    def get_brand(self, brand: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db().execute(
+                "SELECT brand, interval, research_plan, watermark, last_run, next_run, created_at "
+                "FROM brands WHERE brand = ?", (brand,)
+            ).fetchone()
+        return self._to_brand(row) if row else None
+
+    def list_brands(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT brand, interval, research_plan, watermark, last_run, next_run, created_at "
+                "FROM brands ORDER BY brand"
+            ).fetchall()
+        return [self._to_brand(row) for row in rows]
+
+    def due_brands(self, now: float) -> List[str]:
+        with self._lock:
+            rows = self._db().execute("SELECT brand FROM brands WHERE next_run <= ? ORDER BY next_run",
+                                      (now,)).fetchall()
+        return [row[0] for row in rows]
+
+    def next_due(self) -> Optional[float]:
+        with self._lock:
+            return self._db().execute("SELECT MIN(next_run) FROM brands").fetchone()[0]
+
+    def set_research_plan(self, brand: str, plan: List[str]) -> None:
+        with self._lock:
+            db = self._db()
+            db.execute("UPDATE brands SET research_plan = ? WHERE brand = ?", (json.dumps(plan), brand))
+            db.commit()
+
+    def finish_cycle(self, brand: str, watermark: Optional[float], run_at: float) -> None:
+        """Advance the watermark (never backwards) and schedule the next cycle."""
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "UPDATE brands SET watermark = MAX(COALESCE(watermark, 0), COALESCE(?, 0)), "
+                "last_run = ?, next_run = ? + interval WHERE brand = ?",
+                (watermark, run_at, run_at, brand)
+            )
+            db.commit()
+
+    # ------------------------------------------------------------------ mentions
+
+    def known_urls(self, brand: str, urls: List[str]) -> set:
+        if not urls:
+            return set()
+        with self._lock:
+            db = self._db()
+            known = set()
+            # Stay well under SQLite's bound-parameter limit
+            for i in range(0, len(urls), 500):
+                batch = urls[i:i + 500]
+                known.update(row[0] for row in db.execute(
+                    f"SELECT url FROM mentions WHERE brand = ? AND url IN ({', '.join('?' for _ in batch)})",
+                    (brand, *batch)
+                ))
+            return known
+
+    def add_mentions(self, brand: str, urls: List[str], table: Dict[str, np.ndarray]) -> None:
+        columns = ", ".join(SENTIMENT_COLUMNS)
+        rows = [
+            (brand, url, float(table["published_timestamp"][i]), *[float(table[column][i]) for column in SENTIMENT_COLUMNS])
+            for i, url in enumerate(urls)
+        ]
+        with self._lock:
+            db = self._db()
+            db.executemany(
+                f"INSERT OR IGNORE INTO mentions (brand, url, published_timestamp, {columns}) "
+                f"VALUES (?, ?, ?, {', '.join('?' for _ in SENTIMENT_COLUMNS)})",
+                rows
+            )
+            db.commit()
+
+    def window_table(self, brand: str, since: float, now: float) -> Dict[str, np.ndarray]:
+        """
+        Drop mentions older than `since` and return the rest as a sentiment
+        table (same columns as score_sentiment, hours_ago relative to now).
+        """
+        with self._lock:
+            db = self._db()
+            db.execute("DELETE FROM mentions WHERE brand = ? AND published_timestamp < ?", (brand, since))
+            db.commit()
+            rows = db.execute(
+                f"SELECT published_timestamp, {', '.join(SENTIMENT_COLUMNS)} FROM mentions "
+                "WHERE brand = ? ORDER BY published_timestamp DESC", (brand,)
+            ).fetchall()
+        values = np.asarray(rows, dtype=np.float64).reshape(len(rows), 1 + len(SENTIMENT_COLUMNS))
+        table = {column: values[:, i + 1] for i, column in enumerate(SENTIMENT_COLUMNS)}
+        table["published_timestamp"] = values[:, 0]
+        table["hours_ago"] = np.maximum(0.0, now - values[:, 0]) / 3600
+        return table
+
+    # ------------------------------------------------------------------ series
+
+    def add_point(self, brand: str, run_at: float, new_mentions: int, window_mentions: int,
+                  point: Dict[str, Any]) -> None:
+        with self._lock:
+            db = self._db()
+            db.execute("INSERT OR REPLACE INTO series (brand, run_at, new_mentions, window_mentions, point) "
+                       "VALUES (?, ?, ?, ?, ?)",
+                       (brand, run_at, new_mentions, window_mentions, json.dumps(point)))
+            db.execute(
+                "DELETE FROM series WHERE brand = ? AND run_at NOT IN "
+                "(SELECT run_at FROM series WHERE brand = ? ORDER BY run_at DESC LIMIT ?)",
+                (brand, brand, MONITOR_SERIES_POINTS)
+            )
+            db.commit()
+
+    def series(self, brand: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Most recent series points, oldest first."""
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT run_at, new_mentions, window_mentions, point FROM series "
+                "WHERE brand = ? ORDER BY run_at DESC LIMIT ?", (brand, limit)
+            ).fetchall()
+        return [{"run_at": run_at, "new_mentions": new_mentions, "window_mentions": window_mentions,
+                 **json.loads(point)} for run_at, new_mentions, window_mentions, point in reversed(rows)]
+
+
+# ============================================================================
+# INCREMENTAL CYCLE
+# ============================================================================
+
+def _start_date(watermark: Optional[float]) -> str:
+    """Search from just before the watermark (first cycle: the whole window)."""
+    if watermark is None:
+        return bucketed_start_date(TIME_WINDOW_DAYS)
+    start = max(watermark - MONITOR_WATERMARK_OVERLAP, time.time() - TIME_WINDOW_DAYS * 86400)
+    return datetime.fromtimestamp(start, tz=pytz.UTC).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def run_monitor_cycle(store: MonitorStore, brand: str) -> Dict[str, Any]:
+    """
+    One incremental refresh of a brand. Only mentions with URLs the brand
+    hasn't stored yet are evaluated, scored and embedded; the window's
+    stats are then recomputed from the stored scores.
+    """
+    run_at = time.time()
+    info = store.get_brand(brand)
+    if info is None:
+        raise KeyError(brand)
+
+    # Plan once per brand; later cycles reuse the queries
+    plan = info["research_plan"]
+    if not plan:
+        plan = planning_agent({"topic": brand})["research_plan"]
+        store.set_research_plan(brand, plan)
+
+    backend = get_search_backend()
+    if not backend.is_available():
+        raise RuntimeError("Search backend not available")
+    fetched, succeeded = fetch_mentions(backend, plan, _start_date(info["watermark"]))
+    if not succeeded:
+        raise RuntimeError("All monitoring queries failed")
+
+    # Overlap with the previous cycle is expected; keep URLs we haven't stored
+    known = store.known_urls(brand, [mention["url"] for mention in fetched])
+    new_mentions = [mention for mention in fetched if mention["url"] not in known]
+    new_content = evaluator_agent({"topic": brand, "raw_content": new_mentions})["filtered_content"] if new_mentions else []
+
+    if new_content:
+        table = score_sentiment(new_content)
+        # Undated mentions (kept by the evaluator) are stored as published when first
+        # fetched, so they stay in the window and in known_urls instead of being
+        # dropped by window_table and re-scored every cycle
+        undated = table["published_timestamp"] <= 0
+        table["published_timestamp"][undated] = run_at
+        store.add_mentions(brand, [item["url"] for item in new_content], table)
+
+        embeddings = get_cached_embeddings(EMBEDDING_MODEL_NAME)
+        brand_index = get_brand_index(brand, embeddings)
+        indexed_urls = brand_index.indexed_urls()
+        documents = [article_document(item, idx) for idx, item in enumerate(new_content)
+                     if item["url"] not in indexed_urls]
+        if documents:
+            brand_index.add_documents(split_articles(documents))
+
+    # Merge: stats over everything still in the window, from stored scores
+    window_start = run_at - TIME_WINDOW_DAYS * 86400
+    table = store.window_table(brand, window_start, run_at)
+    emotion_analysis = analyze_emotions([], table)
+    sentiment_stats, risk_metrics = compute_sentiment_statistics(table, emotion_analysis)
+    if new_content:
+        brand_index.evict_older_than(window_start)
+        brand_index.save()
+
+    watermark = max((item.get("published_timestamp") or 0 for item in new_content), default=None)
+    store.add_point(brand, run_at, len(new_content), sentiment_stats["total"], {
+        "sentiment_stats": sentiment_stats,
+        "risk_metrics": risk_metrics,
+        "emotion_scores": emotion_analysis["emotion_scores"],
+        "danger_score": emotion_analysis["danger_score"],
+        "dominant_emotion": emotion_analysis["dominant_emotion"],
+    })
+    store.finish_cycle(brand, watermark, run_at)
+    print(f"📡 Monitor {brand}: {len(fetched)} fetched, {len(new_content)} new, "
+          f"{sentiment_stats['total']} in window ({time.time() - run_at:.1f}s)")
+    return {
+        "brand": brand,
+        "fetched": len(fetched),
+        "new_mentions": len(new_content),
+        "sentiment_stats": sentiment_stats,
+        "risk_metrics": risk_metrics,
+        "emotion_analysis": emotion_analysis,
+    }
+
+
+# ============================================================================
+# SCHEDULER
+# ============================================================================
+
+class MonitorScheduler:
+    """
+    Background thread that runs due brands' cycles on a small pool.
+
+    Sleeps until the earliest next_run (or until `wake()` after a brand is
+    registered). A brand is never run twice at once; a failed cycle is
+    retried at its next interval.
+    """
+
+    def __init__(self, store: MonitorStore, workers: int = MONITOR_WORKERS):
+        self.store = store
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._running: set = set()
+        self._lock = threading.Lock()
+        self._stats = {"cycles": 0, "failures": 0, "new_mentions": 0}
+        self.last_errors: Dict[str, str] = {}
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="monitor")
+            self._thread = threading.Thread(target=self._loop, name="monitor-scheduler", daemon=True)
+            self._thread.start()
+        print(f"📡 Monitoring scheduler started ({len(self.store.list_brands())} brands)")
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            now = time.time()
+            for brand in self.store.due_brands(now):
+                with self._lock:
+                    if brand in self._running:
+                        continue
+                    self._running.add(brand)
+                self._executor.submit(self._run, brand)
+            next_due = self.store.next_due()
+            timeout = MONITOR_MIN_INTERVAL if next_due is None else min(MONITOR_MIN_INTERVAL, max(1.0, next_due - time.time()))
+            self._wake.wait(timeout)
+            self._wake.clear()
+
+    def _run(self, brand: str) -> None:
+        try:
+            result = run_monitor_cycle(self.store, brand)
+            with self._lock:
+                self._stats["cycles"] += 1
+                self._stats["new_mentions"] += result["new_mentions"]
+                self.last_errors.pop(brand, None)
+        except KeyError:
+            pass  # Unregistered while queued
+        except Exception as e:
+            print(f"⚠️ Monitor cycle failed for {brand}: {e}")
+            with self._lock:
+                self._stats["failures"] += 1
+                self.last_errors[brand] = str(e)
+            # Try again next interval rather than immediately
+            self.store.finish_cycle(brand, None, time.time())
+        finally:
+            with self._lock:
+                self._running.discard(brand)
+            self._wake.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "running": self._thread is not None and not self._stop.is_set(),
+                "workers": self.workers,
+                "brands": len(self.store.list_brands()),
+                "in_progress": sorted(self._running),
+                **self._stats,
+            }
@@ -0,0 +1,101 @@
+"""
+Password hashing for BrandShield auth routes.
+Runs the deliberately slow hash/verify calls in a small process pool with
+a cap on in-flight requests, so a login burst can't starve the request
+threads serving every other endpoint.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, Optional
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+# Werkzeug method string, e.g. "scrypt", "scrypt:16384:8:1" or "pbkdf2:sha256:600000".
+# Existing hashes keep verifying whatever method they were created with.
+PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))  # 0 = hash inline
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", "5"))  # seconds
+
+
+class PasswordHashingBusy(Exception):
+    """Raised when too many hash/verify calls are already queued."""
+
+
+class PasswordHasher:
+    """
+    Process-pool password hashing with bounded concurrency.
+
+    At most `max_pending` calls are queued or running; further callers wait
+    up to `queue_timeout` seconds for a slot and then get PasswordHashingBusy
+    (the API answers 503). Call `start()` before the server spawns threads
+    so the pool forks from a single-threaded process.
+    """
+
+    def __init__(self, method: str = PASSWORD_HASH_METHOD, workers: int = PASSWORD_HASH_WORKERS,
+                 max_pending: int = PASSWORD_HASH_MAX_PENDING, queue_timeout: float = PASSWORD_HASH_QUEUE_TIMEOUT):
+        self.method = method
+        self.workers = workers
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "rejected": 0, "pool_restarts": 0, "seconds": 0.0}
+
+    def _pool(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers <= 0:
+            return None
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def start(self) -> None:
+        """Start the worker processes now instead of on the first login."""
+        pool = self._pool()
+        if pool is not None:
+            for future in [pool.submit(os.getpid) for _ in range(self.workers)]:
+                future.result()
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            with self._lock:
+                self._stats["rejected"] += 1
+            raise PasswordHashingBusy("Too many concurrent authentication requests")
+        start = time.perf_counter()
+        try:
+            pool = self._pool()
+            if pool is None:
+                return fn(*args)
+            try:
+                return pool.submit(fn, *args).result()
+            except BrokenProcessPool:
+                # A worker died; replace the pool and finish this call inline
+                with self._lock:
+                    if self._executor is pool:
+                        self._executor = None
+                        self._stats["pool_restarts"] += 1
+                print("⚠️ Password hashing pool broke, restarting it")
+                return fn(*args)
+        finally:
+            self._slots.release()
+            with self._lock:
+                self._stats["calls"] += 1
+                self._stats["seconds"] += time.perf_counter() - start
+
+    def hash(self, password: str) -> str:
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash: str, password: str) -> bool:
+        return self._run(check_password_hash, pwhash, password)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["avg_ms"] = round(stats.pop("seconds") / stats["calls"] * 1000, 1) if stats["calls"] else 0.0
+        return {"method": self.method, "workers": self.workers, "max_pending": self.max_pending, **stats}
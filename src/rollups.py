@@ -0,0 +1,151 @@
+"""
+Time-bucketed analysis rollups for BrandShield.
+Every completed analysis is folded into per-brand hourly and daily
+buckets (sentiment counts, risk and emotion sums), so dashboards read
+O(buckets in range) rows instead of rescanning past analyses.
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+from src.cache import CACHE_DIR
+
+
+# Bucket sizes in seconds (buckets are aligned to UTC)
+GRANULARITIES = {
+    "hour": 3600,
+    "day": 86400,
+}
+
+# Emotion scores averaged per bucket (keys of emotion_analysis["emotion_scores"])
+ROLLUP_EMOTIONS = ("anger", "joy", "neutral", "sadness", "fear", "surprise", "disgust")
+
+# Summed columns: analyses and mention counts, then per-analysis sums for averages
+_SUM_COLUMNS = (
+    ["analyses", "mentions", "positive", "neutral", "negative", "compound_sum",
+     "risk_score_sum", "danger_score_sum", "velocity_sum"]
+    + [f"{emotion}_sum" for emotion in ROLLUP_EMOTIONS]
+)
+
+
+def bucket_start(timestamp: float, granularity: str) -> int:
+    size = GRANULARITIES[granularity]
+    return int(timestamp // size * size)
+
+
+class RollupStore:
+    """
+    Incrementally maintained per-brand rollups in SQLite.
+
+    `record` upserts one analysis into its hour and day buckets. `query`
+    returns the buckets in a time range with sums turned into ratios and
+    averages; mention-weighted for sentiment, per-analysis for risk and
+    emotions.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or os.path.join(CACHE_DIR, "rollups.sqlite3")
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            columns = ", ".join(
+                f"{column} {'INTEGER' if column in ('analyses', 'mentions', 'positive', 'neutral', 'negative') else 'REAL'} "
+                "NOT NULL DEFAULT 0"
+                for column in _SUM_COLUMNS
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS rollups ("
+                "granularity TEXT NOT NULL, bucket_start INTEGER NOT NULL, brand TEXT NOT NULL, "
+                f"{columns}, risk_score_max REAL NOT NULL DEFAULT 0, "
+                "PRIMARY KEY (granularity, bucket_start, brand))"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def record(self, brand: str, sentiment_stats: Dict[str, Any], risk_metrics: Dict[str, Any],
+               emotion_analysis: Dict[str, Any], timestamp: Optional[float] = None) -> None:
+        """Fold one completed analysis into its hour and day buckets."""
+        timestamp = time.time() if timestamp is None else timestamp
+        mentions = int(sentiment_stats.get("total", 0) or 0)
+        emotion_scores = emotion_analysis.get("emotion_scores", {}) or {}
+        risk_score = float(risk_metrics.get("score", 0) or 0)
+        values = {
+            "analyses": 1,
+            "mentions": mentions,
+            "positive": int(sentiment_stats.get("positive", 0) or 0),
+            "neutral": int(sentiment_stats.get("neutral", 0) or 0),
+            "negative": int(sentiment_stats.get("negative", 0) or 0),
+            "compound_sum": float(sentiment_stats.get("vader_compound", 0) or 0) * mentions,
+            "risk_score_sum": risk_score,
+            "danger_score_sum": float(emotion_analysis.get("danger_score", 0) or 0),
+            "velocity_sum": float(risk_metrics.get("velocity", 0) or 0),
+            **{f"{emotion}_sum": float(emotion_scores.get(emotion, 0) or 0) for emotion in ROLLUP_EMOTIONS},
+        }
+        columns = ", ".join(_SUM_COLUMNS)
+        placeholders = ", ".join("?" for _ in _SUM_COLUMNS)
+        updates = ", ".join(f"{column} = {column} + excluded.{column}" for column in _SUM_COLUMNS)
+        with self._lock:
+            db = self._db()
+            for granularity in GRANULARITIES:
+                db.execute(
+                    f"INSERT INTO rollups (granularity, bucket_start, brand, {columns}, risk_score_max) "
+                    f"VALUES (?, ?, ?, {placeholders}, ?) "
+                    f"ON CONFLICT (granularity, bucket_start, brand) DO UPDATE SET {updates}, "
+                    "risk_score_max = MAX(risk_score_max, excluded.risk_score_max)",
+                    (granularity, bucket_start(timestamp, granularity), brand,
+                     *[values[column] for column in _SUM_COLUMNS], risk_score)
+                )
+            db.commit()
+
+    def query(self, granularity: str, since: float, until: Optional[float] = None,
+              brand: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Buckets from `since` to `until` (oldest first), one row per brand and bucket."""
+        until = time.time() if until is None else until
+        sql = (f"SELECT bucket_start, brand, {', '.join(_SUM_COLUMNS)}, risk_score_max FROM rollups "
+               "WHERE granularity = ? AND bucket_start >= ? AND bucket_start <= ?")
+        params: List[Any] = [granularity, bucket_start(since, granularity), until]
+        if brand:
+            sql += " AND brand = ?"
+            params.append(brand)
+        sql += " ORDER BY bucket_start, brand"
+        with self._lock:
+            rows = self._db().execute(sql, params).fetchall()
+        return [summarize_bucket({
+            "bucket_start": row[0],
+            "brand": row[1],
+            **dict(zip(_SUM_COLUMNS, row[2:2 + len(_SUM_COLUMNS)])),
+            "risk_score_max": row[-1],
+        }) for row in rows]
+
+
+def merge_buckets(buckets: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Add up raw bucket sums (e.g. all brands in one hour, or one brand over a range)."""
+    merged = {column: sum(bucket[column] for bucket in buckets) for column in _SUM_COLUMNS}
+    merged["risk_score_max"] = max((bucket["risk_score_max"] for bucket in buckets), default=0)
+    return summarize_bucket(merged)
+
+
+def summarize_bucket(bucket: Dict[str, Any]) -> Dict[str, Any]:
+    """Attach ratios (percent of mentions) and per-analysis averages to a bucket of sums."""
+    mentions = bucket["mentions"] or 0
+    analyses = bucket["analyses"] or 0
+    bucket["sentiment"] = {
+        sentiment: round(bucket[sentiment] / mentions * 100, 2) if mentions else 0.0
+        for sentiment in ("positive", "neutral", "negative")
+    }
+    bucket["avg_compound"] = round(bucket["compound_sum"] / mentions, 4) if mentions else 0.0
+    bucket["avg_risk_score"] = round(bucket["risk_score_sum"] / analyses, 2) if analyses else 0.0
+    bucket["avg_danger_score"] = round(bucket["danger_score_sum"] / analyses, 4) if analyses else 0.0
+    bucket["avg_velocity"] = round(bucket["velocity_sum"] / analyses, 2) if analyses else 0.0
+    bucket["emotions"] = {
+        emotion: round(bucket[f"{emotion}_sum"] / analyses, 4) if analyses else 0.0
+        for emotion in ROLLUP_EMOTIONS
+    }
+    return bucket
@@ -0,0 +1,416 @@
+"""
+Search client utilities for BrandShield.
+Shares one pooled Exa client across requests and caches query responses
+(memory first, SQLite second), so repeated dashboard refreshes and
+concurrent analysts looking at the same brand don't each pay full search
+latency and API quota.
+"""
+import os
+import json
+import hashlib
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+import pytz
+
+# Search
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from exa_py import Exa
+    EXA_AVAILABLE = True
+except ImportError:
+    EXA_AVAILABLE = False
+    print("⚠️ Exa API not installed. Run: pip install exa-py")
+
+from src.cache import CACHE_DIR, TieredCache, make_cache_key
+
+
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "900"))  # seconds
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "256"))  # memory tier
+SEARCH_CACHE_DB_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_DB_MAX_ENTRIES", "5000"))  # SQLite tier
+SEARCH_DATE_BUCKET = int(os.getenv("SEARCH_DATE_BUCKET", "900"))  # seconds
+SEARCH_POOL_SIZE = int(os.getenv("SEARCH_POOL_SIZE", "10"))
+SEARCH_HTTP_TIMEOUT = float(os.getenv("SEARCH_HTTP_TIMEOUT", "30"))  # seconds
+
+
+# ============================================================================
+# POOLED EXA CLIENT
+# ============================================================================
+
+if EXA_AVAILABLE:
+    class PooledExa(Exa):
+        """Exa client that reuses keep-alive connections from a shared session."""
+
+        def __init__(self, api_key: str, pool_size: int = SEARCH_POOL_SIZE):
+            super().__init__(api_key=api_key)
+            self.session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            self.session.mount("https://", adapter)
+            self.session.mount("http://", adapter)
+
+        def request(self, endpoint: str, data):
+            res = self.session.post(self.base_url + endpoint, json=data, headers=self.headers,
+                                    timeout=SEARCH_HTTP_TIMEOUT)
+            if res.status_code != 200:
+                raise ValueError(
+                    f"Request failed with status code {res.status_code}: {res.text}"
+                )
+            return res.json()
+
+
+_exa_client = None
+_exa_client_key: Optional[str] = None
+_exa_client_lock = threading.Lock()
+
+
+def get_exa_client():
+    """Get the shared Exa client (rebuilt only if EXA_API_KEY changes)."""
+    global _exa_client, _exa_client_key
+    api_key = os.getenv("EXA_API_KEY")
+    with _exa_client_lock:
+        if _exa_client is None or _exa_client_key != api_key:
+            _exa_client = PooledExa(api_key=api_key)
+            _exa_client_key = api_key
+        return _exa_client
+
+
+# ============================================================================
+# TTL RESPONSE CACHE (memory -> SQLite)
+# ============================================================================
+
+search_cache = TieredCache(
+    db_path=os.path.join(CACHE_DIR, "search_cache.sqlite3"),
+    table="search_cache",
+    ttl=SEARCH_CACHE_TTL,
+    max_entries=SEARCH_CACHE_MAX_ENTRIES,
+    db_max_entries=SEARCH_CACHE_DB_MAX_ENTRIES
+)
+
+
+# ============================================================================
+# CACHED EXA SEARCH
+# ============================================================================
+
+# Evaluator time window - content older than this is dropped (re-exported by src.agents)
+TIME_WINDOW_DAYS = 2
+# Results requested from the search backend per plan query
+SEARCH_RESULTS_PER_QUERY = 5
+
+
+def bucketed_start_date(window_days: int, bucket_seconds: int = SEARCH_DATE_BUCKET) -> str:
+    """
+    Start of the search window, rounded down to a bucket boundary so that
+    requests made within the same bucket share a cache key.
+    """
+    now = time.time()
+    bucket_start = datetime.fromtimestamp(now - (now % bucket_seconds), tz=pytz.UTC)
+    return (bucket_start - timedelta(days=window_days)).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def _normalize_results(results) -> List[Dict[str, Any]]:
+    """Convert Exa results into plain mention dicts."""
+    current_time = datetime.now(pytz.UTC)
+    mentions = []
+    for result in results.results:
+        pub_date = getattr(result, 'published_date', None)
+        if pub_date:
+            try:
+                pub_datetime = datetime.fromisoformat(pub_date.replace('Z', '+00:00')) if isinstance(pub_date, str) else pub_date
+            except:
+                pub_datetime = current_time
+        else:
+            pub_datetime = current_time
+
+        mentions.append({
+            "title": result.title,
+            "url": result.url,
+            "text": result.text[:1500] if result.text else "",
+            "published_date": pub_datetime.isoformat(),
+            "published_timestamp": pub_datetime.timestamp()
+        })
+    return mentions
+
+
+_inflight: Dict[str, threading.Event] = {}
+_inflight_lock = threading.Lock()
+
+
+def search_exa(query: str, start_published_date: str,
+               num_results: int = SEARCH_RESULTS_PER_QUERY) -> List[Dict[str, Any]]:
+    """
+    Search Exa for mentions of a query, serving repeats from the TTL cache.
+    Concurrent identical requests share a single API call.
+    """
+    key = make_cache_key(query, start_published_date, num_results)
+    while True:
+        cached = search_cache.get(key)
+        if cached is not None:
+            print(f"   ⚡ Exa query (cached): {query}")
+            # Shared with the cache - fetch_mentions builds new Mention records from these
+            return cached
+        with _inflight_lock:
+            pending = _inflight.get(key)
+            if pending is None:
+                pending = _inflight[key] = threading.Event()
+                break
+        # Someone else is fetching this query - wait for their result
+        pending.wait(SEARCH_HTTP_TIMEOUT)
+        with _inflight_lock:
+            if _inflight.get(key) is pending:
+                # Still stuck after the timeout - stop waiting and fetch ourselves
+                pending = _inflight[key] = threading.Event()
+                break
+
+    try:
+        print(f"   🔎 Exa query: {query}")
+        results = get_exa_client().search_and_contents(
+            query=query,
+            num_results=num_results,
+            text=True,
+            start_published_date=start_published_date,
+            use_autoprompt=True
+        )
+        mentions = _normalize_results(results)
+        search_cache.set(key, mentions)
+        return mentions
+    finally:
+        with _inflight_lock:
+            if _inflight.get(key) is pending:
+                del _inflight[key]
+        pending.set()
+
+
+# ============================================================================
+# PLUGGABLE SEARCH BACKENDS (live / record / replay)
+# ============================================================================
+
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "exa")  # exa | record | replay
+SEARCH_FIXTURE_DIR = os.getenv("SEARCH_FIXTURE_DIR", os.path.join(CACHE_DIR, "search_fixtures"))
+SEARCH_REPLAY_LATENCY = os.getenv("SEARCH_REPLAY_LATENCY", "none")
+SEARCH_REPLAY_SCALE = int(os.getenv("SEARCH_REPLAY_SCALE", "0"))
+
+
+class SearchBackend(ABC):
+    """Interface for search providers used by search_agent."""
+
+    name = "base"
+
+    def is_available(self) -> bool:
+        return True
+
+    @abstractmethod
+    def search(self, query: str, start_published_date: str, num_results: int = SEARCH_RESULTS_PER_QUERY,
+               plan_position: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Return normalized mention dicts (title, url, text, published_date, published_timestamp).
+        `plan_position` is the query's index in the research plan (live backends ignore it).
+        """
+
+
+class ExaSearchBackend(SearchBackend):
+    """Live Exa search through the pooled client and TTL cache."""
+
+    name = "exa"
+
+    def is_available(self) -> bool:
+        return EXA_AVAILABLE and bool(os.getenv("EXA_API_KEY"))
+
+    def search(self, query: str, start_published_date: str, num_results: int = SEARCH_RESULTS_PER_QUERY,
+               plan_position: Optional[int] = None) -> List[Dict[str, Any]]:
+        return search_exa(query, start_published_date, num_results)
+
+
+def _fixture_path(fixture_dir: str, query: str) -> str:
+    return os.path.join(fixture_dir, hashlib.sha256(query.encode("utf-8")).hexdigest()[:20] + ".json")
+
+
+class RecordingSearchBackend(SearchBackend):
+    """Passes queries to another backend and saves each response as a fixture."""
+
+    name = "record"
+
+    def __init__(self, inner: SearchBackend, fixture_dir: str = SEARCH_FIXTURE_DIR):
+        self.inner = inner
+        self.fixture_dir = fixture_dir
+
+    def is_available(self) -> bool:
+        return self.inner.is_available()
+
+    def search(self, query: str, start_published_date: str, num_results: int = SEARCH_RESULTS_PER_QUERY,
+               plan_position: Optional[int] = None) -> List[Dict[str, Any]]:
+        mentions = self.inner.search(query, start_published_date, num_results=num_results,
+                                     plan_position=plan_position)
+        os.makedirs(self.fixture_dir, exist_ok=True)
+        path = _fixture_path(self.fixture_dir, query)
+        with open(path + ".tmp", "w") as f:
+            json.dump({"query": query, "recorded_at": time.time(), "results": mentions}, f)
+        os.replace(path + ".tmp", path)
+        return mentions
+
+
+# Vocabulary for the variant-specific text of synthetic replay mentions
+_REPLAY_WORDS = ("love great fast reliable excellent happy recommend fixed smooth helpful "
+                 "broken slow refund crash terrible disappointed issue outage expensive bug "
+                 "battery support update price delivery screen app service store warranty").split()
+
+
+class ReplaySearchBackend(SearchBackend):
+    """
+    Serves recorded fixtures with no network access.
+
+    - Mentions are re-dated so they keep the age they had when recorded.
+    - `latency` simulates API delay: "none", "fixed:S", "uniform:LO,HI",
+      "normal:MU,SIGMA" or "lognormal:MU,SIGMA" (seconds).
+    - `scale_to` > 0 grows the corpus synthetically to that many distinct
+      mentions (each variant gets its own text, so dedupe keeps them).
+      Each query returns the slice for its position in the research plan
+      (about scale_to / queries_per_plan mentions), so a full plan yields
+      exactly `scale_to` mentions. Queries searched without a position get
+      the next free slot in first-seen order.
+    """
+
+    name = "replay"
+
+    def __init__(self, fixture_dir: str = SEARCH_FIXTURE_DIR, latency: str = SEARCH_REPLAY_LATENCY,
+                 scale_to: int = SEARCH_REPLAY_SCALE, queries_per_plan: int = 3, seed: int = 42):
+        self.fixture_dir = fixture_dir
+        self.latency = latency
+        self.scale_to = scale_to
+        self.queries_per_plan = queries_per_plan
+        self.seed = seed
+        self._fixtures: Dict[str, Dict[str, Any]] = {}
+        self._corpus: Optional[List[Dict[str, Any]]] = None
+        self._query_slots: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.isdir(self.fixture_dir):
+            return
+        for name in sorted(os.listdir(self.fixture_dir)):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.fixture_dir, name)) as f:
+                    fixture = json.load(f)
+                self._fixtures[fixture["query"]] = fixture
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ Skipping unreadable search fixture {name}: {e}")
+        print(f"📼 Replay search backend: {len(self._fixtures)} recorded queries loaded")
+
+    def _sleep(self, rng) -> None:
+        kind, _, params = self.latency.partition(":")
+        values = [float(v) for v in params.split(",") if v]
+        if kind == "fixed":
+            delay = values[0]
+        elif kind == "uniform":
+            delay = rng.uniform(values[0], values[1])
+        elif kind == "normal":
+            delay = rng.gauss(values[0], values[1])
+        elif kind == "lognormal":
+            delay = rng.lognormvariate(values[0], values[1])
+        else:
+            return
+        time.sleep(max(0.0, delay))
+
+    @staticmethod
+    def _redate(mention: Dict[str, Any], age_seconds: float, now: float) -> Dict[str, Any]:
+        published = datetime.fromtimestamp(now - max(0.0, age_seconds), tz=pytz.UTC)
+        return {**mention, "published_date": published.isoformat(), "published_timestamp": published.timestamp()}
+
+    def _recorded_mentions(self, query: str, now: float) -> List[Dict[str, Any]]:
+        fixture = self._fixtures.get(query)
+        if fixture is None and self._fixtures:
+            # Unrecorded query (e.g. the planner worded it differently): pick a fixture deterministically
+            queries = sorted(self._fixtures)
+            fixture = self._fixtures[queries[int(hashlib.sha256(query.encode()).hexdigest(), 16) % len(queries)]]
+        if fixture is None:
+            return []
+        return [self._redate(m, fixture["recorded_at"] - m.get("published_timestamp", fixture["recorded_at"]), now)
+                for m in fixture["results"]]
+
+    def _synthetic_corpus(self) -> List[Dict[str, Any]]:
+        """Variants of every recorded mention (distinct URL, age, text) up to scale_to."""
+        with self._lock:
+            if self._corpus is not None:
+                return self._corpus
+            rng = random.Random(self.seed)
+            base = [m for fixture in self._fixtures.values() for m in fixture["results"]] or [{
+                "title": "Synthetic mention",
+                "url": "https://example.com/mention",
+                "text": "Customers are discussing the product. Some are happy with it, others report problems.",
+            }]
+            window_seconds = TIME_WINDOW_DAYS * 86400
+            corpus = []
+            for i in range(self.scale_to):
+                mention = base[i % len(base)]
+                sentences = [sentence.rstrip(".") for sentence in mention.get("text", "").split(". ")]
+                rng.shuffle(sentences)
+                # A variant-specific passage at least as long as the shared text, so the
+                # dedupe stage sees distinct mentions rather than near-duplicates of the base
+                length = max(20, len(mention.get("text", "").split()))
+                sentences.append(f"Replay post {i}: " + " ".join(rng.choice(_REPLAY_WORDS) for _ in range(length)))
+                corpus.append({
+                    "title": mention.get("title", ""),
+                    "url": f"{mention.get('url', '')}#replay-{i}",
+                    "text": ". ".join(sentences) + ".",
+                    "age_seconds": rng.uniform(0, window_seconds),
+                })
+            self._corpus = corpus
+            return corpus
+
+    def _slot(self, query: str, plan_position: Optional[int]) -> int:
+        if plan_position is not None:
+            return plan_position % self.queries_per_plan
+        with self._lock:
+            return self._query_slots.setdefault(query, len(self._query_slots) % self.queries_per_plan)
+
+    def search(self, query: str, start_published_date: str, num_results: int = SEARCH_RESULTS_PER_QUERY,
+               plan_position: Optional[int] = None) -> List[Dict[str, Any]]:
+        rng = random.Random(f"{self.seed}:{query}")
+        self._sleep(rng)
+        now = time.time()
+        # Like Exa, only return mentions published on or after the start date
+        since = datetime.fromisoformat(start_published_date.replace("Z", "+00:00")).timestamp()
+        if self.scale_to <= 0:
+            mentions = self._recorded_mentions(query, now)[:num_results]
+            return [m for m in mentions if m.get("published_timestamp", now) >= since]
+
+        corpus = self._synthetic_corpus()
+        per_query = -(-len(corpus) // self.queries_per_plan)
+        start = self._slot(query, plan_position) * per_query
+        return [
+            self._redate({k: v for k, v in m.items() if k != "age_seconds"}, m["age_seconds"], now)
+            for m in corpus[start:start + per_query]
+            if now - m["age_seconds"] >= since
+        ]
+
+
+_search_backend: Optional[SearchBackend] = None
+_search_backend_lock = threading.Lock()
+
+
+def get_search_backend() -> SearchBackend:
+    """Get the process-wide search backend selected by SEARCH_BACKEND."""
+    global _search_backend
+    with _search_backend_lock:
+        if _search_backend is None:
+            if SEARCH_BACKEND == "replay":
+                _search_backend = ReplaySearchBackend()
+            elif SEARCH_BACKEND == "record":
+                _search_backend = RecordingSearchBackend(ExaSearchBackend())
+            else:
+                _search_backend = ExaSearchBackend()
+        return _search_backend
+
+
+def set_search_backend(backend: SearchBackend) -> None:
+    """Override the search backend (benchmarks, tests)."""
+    global _search_backend
+    with _search_backend_lock:
+        _search_backend = backend
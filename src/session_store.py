@@ -0,0 +1,224 @@
+"""
+Persistent analysis session store for BrandShield.
+Keeps each analysis session (brand, phase and full AgentState) in SQLite
+as a zlib-compressed JSON blob, with a small LRU/TTL hot tier in memory,
+so sessions survive restarts and are shared by every server process.
+"""
+import os
+import json
+import zlib
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from src.cache import CACHE_DIR
+from src.state import Mention, to_mentions
+
+
+SESSION_TTL = float(os.getenv("SESSION_TTL", str(7 * 24 * 3600)))  # seconds since last update
+SESSION_CACHE_MAX_ENTRIES = int(os.getenv("SESSION_CACHE_MAX_ENTRIES", "64"))  # hot tier
+SESSION_CACHE_TTL = float(os.getenv("SESSION_CACHE_TTL", "600"))  # seconds in the hot tier
+SESSION_COMPRESSION_LEVEL = int(os.getenv("SESSION_COMPRESSION_LEVEL", "6"))
+
+
+class StateEncoder(json.JSONEncoder):
+    """JSON encoder for AgentState values (Mentions, NumPy arrays/scalars, sets)."""
+
+    def default(self, o):
+        if isinstance(o, Mention):
+            return o.to_dict()
+        if isinstance(o, np.ndarray):
+            return o.tolist()
+        if isinstance(o, np.generic):
+            return o.item()
+        if isinstance(o, (set, frozenset)):
+            return list(o)
+        return super().default(o)
+
+
+def encode_state(state: Dict[str, Any], level: int = SESSION_COMPRESSION_LEVEL) -> bytes:
+    return zlib.compress(json.dumps(state, cls=StateEncoder).encode("utf-8"), level)
+
+
+# State keys holding lists of Mention records
+MENTION_KEYS = ("raw_content", "filtered_content")
+
+
+def decode_state(blob: bytes) -> Dict[str, Any]:
+    state = json.loads(zlib.decompress(blob).decode("utf-8"))
+    for key in MENTION_KEYS:
+        if isinstance(state.get(key), list):
+            state[key] = to_mentions(state[key])
+    return state
+
+
+class SessionStore:
+    """
+    SQLite-backed session store, safe for threaded and multi-process use.
+
+    SQLite runs in WAL mode, so readers never block the single writer, and
+    every process sees the same sessions. The hot tier holds decoded
+    sessions for SESSION_CACHE_TTL seconds; each hit is checked against the
+    row's version, so an update from another process is never served stale.
+
+    Sessions returned by `get` are copies at the top level. Persist changes
+    with `update` rather than mutating nested values in place.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, ttl: float = SESSION_TTL,
+                 max_entries: int = SESSION_CACHE_MAX_ENTRIES, cache_ttl: float = SESSION_CACHE_TTL):
+        self.db_path = db_path or os.path.join(CACHE_DIR, "sessions.sqlite3")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.cache_ttl = cache_ttl
+        self._hot: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.hot_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, brand TEXT NOT NULL, data_source TEXT, "
+                "phase TEXT NOT NULL, created_at REAL NOT NULL, updated_at REAL NOT NULL, "
+                "version INTEGER NOT NULL, state BLOB NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions (updated_at)")
+            self._conn.commit()
+        return self._conn
+
+    def _remember(self, session_id: str, version: int, session: Dict[str, Any]) -> None:
+        self._hot[session_id] = (time.time() + self.cache_ttl, version, session)
+        self._hot.move_to_end(session_id)
+        while len(self._hot) > self.max_entries:
+            self._hot.popitem(last=False)
+
+    @staticmethod
+    def _copy(session: Dict[str, Any]) -> Dict[str, Any]:
+        return {**session, "state": dict(session["state"])}
+
+    @staticmethod
+    def _to_session(row) -> Dict[str, Any]:
+        session_id, brand, data_source, phase, created_at, updated_at, _, blob = row
+        return {
+            "session_id": session_id,
+            "brand": brand,
+            "data_source": data_source,
+            "phase": phase,
+            "created_at": created_at,
+            "updated_at": updated_at,
+            "state": decode_state(blob),
+        }
+
+    # ------------------------------------------------------------------ public API
+
+    def create(self, brand: str, data_source: str, state: Dict[str, Any], phase: str) -> str:
+        """Store a new session and return its (collision-free) id."""
+        session_id = uuid.uuid4().hex
+        now = time.time()
+        blob = encode_state(state)
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT INTO sessions (session_id, brand, data_source, phase, created_at, updated_at, version, state) "
+                "VALUES (?, ?, ?, ?, ?, ?, 1, ?)",
+                (session_id, brand, data_source, phase, now, now, blob)
+            )
+            db.execute("DELETE FROM sessions WHERE updated_at < ?", (now - self.ttl,))
+            db.commit()
+            # Cache the decoded blob, not the caller's live state, so hot-tier and
+            # SQLite reads return identical values (lists, Mentions, no NumPy arrays)
+            self._remember(session_id, 1, {
+                "session_id": session_id, "brand": brand, "data_source": data_source, "phase": phase,
+                "created_at": now, "updated_at": now, "state": decode_state(blob),
+            })
+        return session_id
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Load a session (None if unknown or expired)."""
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            entry = self._hot.get(session_id)
+            if entry is not None and entry[0] > now:
+                # Cheap version check so another process's update wins
+                row = db.execute("SELECT version FROM sessions WHERE session_id = ? AND updated_at >= ?",
+                                 (session_id, now - self.ttl)).fetchone()
+                if row is not None and row[0] == entry[1]:
+                    self._hot.move_to_end(session_id)
+                    self.hot_hits += 1
+                    return self._copy(entry[2])
+            self._hot.pop(session_id, None)
+
+            row = db.execute(
+                "SELECT session_id, brand, data_source, phase, created_at, updated_at, version, state "
+                "FROM sessions WHERE session_id = ? AND updated_at >= ?",
+                (session_id, now - self.ttl)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            session = self._to_session(row)
+            self._remember(session_id, row[6], session)
+            self.db_hits += 1
+            return self._copy(session)
+
+    def update(self, session_id: str, state: Optional[Dict[str, Any]] = None,
+               phase: Optional[str] = None) -> bool:
+        """Replace a session's state and/or phase. Returns False if the session is gone."""
+        now = time.time()
+        blob = encode_state(state) if state is not None else None
+        with self._lock:
+            db = self._db()
+            cursor = db.execute(
+                "UPDATE sessions SET state = COALESCE(?, state), phase = COALESCE(?, phase), "
+                "updated_at = ?, version = version + 1 WHERE session_id = ?",
+                (blob, phase, now, session_id)
+            )
+            db.commit()
+            # Re-read on next get() to pick up the new version
+            self._hot.pop(session_id, None)
+            return cursor.rowcount > 0
+
+    def list_sessions(self, since: Optional[float] = None, include_state: bool = False,
+                      limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Sessions updated since `since` (newest first); state is decoded only if asked for."""
+        cutoff = max(since or 0, time.time() - self.ttl)
+        columns = "session_id, brand, data_source, phase, created_at, updated_at, version"
+        with self._lock:
+            rows = self._db().execute(
+                f"SELECT {columns}{', state' if include_state else ''} FROM sessions "
+                "WHERE updated_at >= ? ORDER BY updated_at DESC LIMIT ?",
+                (cutoff, -1 if limit is None else limit)
+            ).fetchall()
+        if include_state:
+            return [self._to_session(row) for row in rows]
+        return [dict(zip(("session_id", "brand", "data_source", "phase", "created_at", "updated_at"), row[:6]))
+                for row in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total, stored_bytes = self._db().execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(state)), 0) FROM sessions"
+            ).fetchone()
+            lookups = self.hot_hits + self.db_hits + self.misses
+            return {
+                "sessions": total,
+                "stored_bytes": stored_bytes,
+                "hot_entries": len(self._hot),
+                "hot_hits": self.hot_hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "hot_hit_rate": round(self.hot_hits / lookups, 3) if lookups else 0.0,
+            }
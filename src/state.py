@@ -1,7 +1,122 @@
 """
 State definition for the BrandShield_Lite agent system.
 """
-from typing import TypedDict, List, Dict, Any
+import sys
+from datetime import datetime, timezone
+from typing import TypedDict, List, Dict, Any, Optional
+from urllib.parse import urlsplit
+
+
+class Mention:
+    """
+    One web mention, stored in __slots__ instead of a per-item dict.
+
+    Supports the read/write mapping access agents already use
+    (mention["url"], mention.get("hours_ago")), limited to FIELDS.
+    `source` (search backend) and `domain` are interned, so mentions from
+    the same site share one string. published_date is derived from
+    published_timestamp rather than stored. `duplicate_count` is how many
+    near-duplicate copies (itself included) src.dedupe collapsed into this
+    mention. Use `from_dict` / `to_dict` at JSON boundaries (search cache,
+    session store, API).
+    """
+
+    __slots__ = ("url", "title", "text", "published_timestamp", "domain", "source",
+                 "hours_ago", "is_recent", "duplicate_count")
+
+    FIELDS = frozenset(__slots__) | {"published_date"}
+
+    def __init__(self, url: str, title: str = "", text: str = "",
+                 published_timestamp: Optional[float] = None, source: str = "",
+                 hours_ago: Optional[float] = None, is_recent: Optional[bool] = None,
+                 duplicate_count: int = 1):
+        self.url = url
+        self.title = title
+        self.text = text
+        self.published_timestamp = published_timestamp
+        self.domain = sys.intern(urlsplit(url).netloc.lower())
+        self.source = sys.intern(source)
+        self.hours_ago = hours_ago
+        self.is_recent = is_recent
+        self.duplicate_count = duplicate_count
+
+    @property
+    def published_date(self) -> Optional[str]:
+        if self.published_timestamp is None:
+            return None
+        return datetime.fromtimestamp(self.published_timestamp, tz=timezone.utc).isoformat()
+
+    # ------------------------------------------------------------------ JSON adapter
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], source: Optional[str] = None) -> "Mention":
+        """Build from a search result / stored dict (published_date parsed if there's no timestamp)."""
+        timestamp = data.get("published_timestamp")
+        if timestamp is None and data.get("published_date"):
+            try:
+                published = datetime.fromisoformat(str(data["published_date"]).replace("Z", "+00:00"))
+                if published.tzinfo is None:
+                    published = published.replace(tzinfo=timezone.utc)
+                timestamp = published.timestamp()
+            except ValueError:
+                timestamp = None
+        return cls(
+            url=data.get("url", ""),
+            title=data.get("title") or "",
+            text=data.get("text") or "",
+            published_timestamp=timestamp,
+            source=source if source is not None else data.get("source") or "",
+            hours_ago=data.get("hours_ago"),
+            is_recent=data.get("is_recent"),
+            duplicate_count=data.get("duplicate_count") or 1,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "url": self.url,
+            "title": self.title,
+            "text": self.text,
+            "published_date": self.published_date,
+            "published_timestamp": self.published_timestamp,
+            "domain": self.domain,
+            "source": self.source,
+        }
+        if self.hours_ago is not None:
+            data["hours_ago"] = self.hours_ago
+        if self.is_recent is not None:
+            data["is_recent"] = self.is_recent
+        if self.duplicate_count > 1:
+            data["duplicate_count"] = self.duplicate_count
+        return data
+
+    # ------------------------------------------------------------------ mapping access
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in Mention.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in Mention.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in Mention.FIELDS and getattr(self, key) is not None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key not in Mention.FIELDS:
+            return default
+        value = getattr(self, key)
+        return default if value is None else value
+
+    def __repr__(self) -> str:
+        return f"Mention(url={self.url!r}, published_timestamp={self.published_timestamp!r})"
+
+
+def to_mentions(items: List[Any]) -> List[Mention]:
+    """Coerce a list of mention dicts (e.g. from a stored session) to Mentions."""
+    return [item if isinstance(item, Mention) else Mention.from_dict(item) for item in items]
 
 
 class AgentState(TypedDict):
@@ -10,8 +125,10 @@ class AgentState(TypedDict):
     
     Attributes:
         topic: The brand name or topic to analyze
-        raw_content: List of raw search results/web mentions
-        filtered_content: List of time-filtered content (past 2 days only)
+        raw_content: List of raw search results/web mentions (Mention records)
+        filtered_content: List of time-filtered mentions (past 2 days only)
+        sentiment_table: VADER neg/neu/pos/compound + timestamps as NumPy columns,
+            one row per filtered_content item (scored once, reused by all stages)
         sentiment_statsysis results
         emotion_analysis: Advanced emotion tracking (a: Dictionary containing sentiment analnger, sadness, joy, etc.)
         rag_findings: Findings from RAG semantic search analysis
@@ -24,8 +141,9 @@ class AgentState(TypedDict):
         revision_count: Number of times report was revised
     """
     topic: str
-    raw_content: List[Dict[str, Any]]
-    filtered_content: List[Dict[str, Any]]
+    raw_content: List[Mention]
+    filtered_content: List[Mention]
+    sentiment_table: Dict[str, Any]
     sentiment_stats: Dict[str, Any]
     risk_metrics: Dict[str, Any]
     emotion_analysis: Dict[str, Any]
@@ -0,0 +1,205 @@
+"""
+User account store for BrandShield.
+Keeps accounts in SQLite with a unique email index and caches looked-up
+users in memory until the database files change on disk. last_login
+updates are batched, so a login burst doesn't turn into a burst of writes.
+"""
+import os
+import json
+import atexit
+import sqlite3
+import threading
+from typing import Dict, Any, Optional, Tuple
+
+from src.cache import CACHE_DIR
+
+
+USERS_DB_PATH = os.getenv("USERS_DB_PATH", os.path.join(CACHE_DIR, "users.sqlite3"))
+USER_LOGIN_FLUSH_INTERVAL = float(os.getenv("USER_LOGIN_FLUSH_INTERVAL", "5"))  # seconds
+USER_LOGIN_FLUSH_BATCH = int(os.getenv("USER_LOGIN_FLUSH_BATCH", "100"))  # pending updates that force a flush
+
+USER_FIELDS = ("id", "email", "password", "name", "company", "created_at", "last_login")
+
+
+class UserStore:
+    """
+    SQLite-backed user store.
+
+    Each write is its own transaction, so concurrent registrations and
+    logins (threads or processes) can't corrupt the store the way
+    rewriting users.json could. Cached users are dropped whenever the
+    database or its WAL file changes mtime, which picks up writes from
+    other processes. Pending last_login values are applied to reads
+    before they are flushed.
+    """
+
+    def __init__(self, db_path: str = USERS_DB_PATH, legacy_json_path: Optional[str] = None,
+                 flush_interval: float = USER_LOGIN_FLUSH_INTERVAL, flush_batch: int = USER_LOGIN_FLUSH_BATCH):
+        self.db_path = db_path
+        self.legacy_json_path = legacy_json_path
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        self._cache_stamp: Optional[Tuple[int, int]] = None
+        self._pending_logins: Dict[str, str] = {}
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._flusher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.flushes = 0
+
+    # ------------------------------------------------------------------ storage
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS users ("
+                "id TEXT PRIMARY KEY, email TEXT NOT NULL, password TEXT NOT NULL, name TEXT, "
+                "company TEXT, created_at TEXT, last_login TEXT)"
+            )
+            self._conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_users_email ON users (email)")
+            self._conn.commit()
+            self._migrate_legacy_json()
+        return self._conn
+
+    def _migrate_legacy_json(self) -> None:
+        """Import users.json once, into an empty store."""
+        if not self.legacy_json_path or not os.path.exists(self.legacy_json_path):
+            return
+        if self._conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]:
+            return
+        try:
+            with open(self.legacy_json_path) as f:
+                legacy_users = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not read {self.legacy_json_path} for migration: {e}")
+            return
+        rows = [tuple(user.get(field) for field in USER_FIELDS) for user in legacy_users.values()]
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT OR IGNORE INTO users ({', '.join(USER_FIELDS)}) VALUES ({', '.join('?' for _ in USER_FIELDS)})",
+                rows
+            )
+        print(f"👥 Migrated {len(rows)} users from {self.legacy_json_path} to {self.db_path}")
+
+    def _file_stamp(self) -> Tuple[int, int]:
+        stamps = []
+        for path in (self.db_path, self.db_path + "-wal"):
+            try:
+                stamps.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                stamps.append(0)
+        return tuple(stamps)
+
+    def _validate_cache(self) -> None:
+        stamp = self._file_stamp()
+        if stamp != self._cache_stamp:
+            self._cache.clear()
+            self._cache_stamp = stamp
+
+    def _own_write_done(self) -> None:
+        # Our own writes are already reflected in the cache; don't drop it for them
+        self._cache_stamp = self._file_stamp()
+
+    # ------------------------------------------------------------------ public API
+
+    def get_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        """Look up a user (including the password hash); returns a copy."""
+        with self._lock:
+            db = self._db()
+            self._validate_cache()
+            user = self._cache.get(email)
+            if user is not None:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+                row = db.execute(f"SELECT {', '.join(USER_FIELDS)} FROM users WHERE email = ?", (email,)).fetchone()
+                if row is None:
+                    return None
+                user = dict(zip(USER_FIELDS, row))
+                self._cache[email] = user
+            if email in self._pending_logins:
+                user["last_login"] = self._pending_logins[email]
+            return dict(user)
+
+    def create(self, user: Dict[str, Any]) -> bool:
+        """Insert a new user. Returns False if the email is already registered."""
+        with self._lock:
+            db = self._db()
+            self._validate_cache()
+            try:
+                with db:
+                    db.execute(
+                        f"INSERT INTO users ({', '.join(USER_FIELDS)}) VALUES ({', '.join('?' for _ in USER_FIELDS)})",
+                        tuple(user.get(field) for field in USER_FIELDS)
+                    )
+            except sqlite3.IntegrityError:
+                return False
+            self._own_write_done()
+            self._cache[user["email"]] = dict(user)
+            return True
+
+    def record_login(self, email: str, when: str) -> None:
+        """Queue a last_login update; written in the next batch."""
+        with self._lock:
+            self._pending_logins[email] = when
+            if email in self._cache:
+                self._cache[email]["last_login"] = when
+            if len(self._pending_logins) >= self.flush_batch:
+                self.flush()
+                return
+        self._ensure_flusher()
+
+    def flush(self) -> int:
+        """Write pending last_login updates in one transaction. Returns rows written."""
+        with self._lock:
+            if not self._pending_logins:
+                return 0
+            pending = list(self._pending_logins.items())
+            db = self._db()
+            self._validate_cache()
+            with db:
+                db.executemany("UPDATE users SET last_login = ? WHERE email = ?",
+                               [(when, email) for email, when in pending])
+            self._own_write_done()
+            self._pending_logins.clear()
+            self.flushes += 1
+            return len(pending)
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is not None:
+            return
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._flush_loop, name="user-login-flush", daemon=True)
+            self._flusher.start()
+            atexit.register(self.close)
+
+    def _flush_loop(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"⚠️ Failed to flush last_login updates: {e}")
+
+    def close(self) -> None:
+        self._stop.set()
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self._db().execute("SELECT COUNT(*) FROM users").fetchone()[0]
+            lookups = self.cache_hits + self.cache_misses
+            return {
+                "users": total,
+                "cached": len(self._cache),
+                "cache_hit_rate": round(self.cache_hits / lookups, 3) if lookups else 0.0,
+                "pending_logins": len(self._pending_logins),
+                "login_flushes": self.flushes,
+            }
@@ -0,0 +1,254 @@
+"""
+Persistent per-brand vector index for BrandShield.
+Keeps one FAISS index per monitored brand on disk, so each analysis only
+embeds chunks from URLs it hasn't seen before and evicts chunks that have
+aged out of the evaluator's time window.
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, Any, List, Optional, Set
+
+import numpy as np
+import faiss
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from src.cache import CACHE_DIR
+
+
+# Metadata fields stored alongside each vector
+METADATA_FIELDS = ("source", "title", "doc_id", "is_recent", "published_timestamp")
+
+
+def _slugify(brand: str) -> str:
+    slug = re.sub(r"[^a-z0-9]+", "-", brand.lower()).strip("-")
+    return slug or "brand"
+
+
+def _index_dirname(brand: str) -> str:
+    """Directory name for a brand's index: readable slug plus a hash of the exact brand string."""
+    return f"{_slugify(brand)[:48]}-{hashlib.sha256(brand.encode('utf-8')).hexdigest()[:16]}"
+
+
+class BrandVectorIndex:
+    """
+    Incrementally maintained FAISS index for a single brand.
+
+    Vectors are normalized, so an inner-product index ranks like cosine
+    similarity. Each vector has an int64 id mapping to its chunk text and
+    metadata (doc_id, is_recent, published_timestamp, ...), which can be queried
+    without touching the vectors.
+    """
+
+    def __init__(self, brand: str, embeddings: Embeddings, index_dir: Optional[str] = None):
+        self.brand = brand
+        self.embeddings = embeddings
+        self.directory = os.path.join(index_dir or os.path.join(CACHE_DIR, "indexes"), _index_dirname(brand))
+        self.index_path = os.path.join(self.directory, "index.faiss")
+        self.meta_path = os.path.join(self.directory, "metadata.json")
+
+        self._index: Optional[faiss.Index] = None
+        self._mmapped = False
+        self._entries: Dict[int, Dict[str, Any]] = {}
+        self._url_ids: Dict[str, List[int]] = {}
+        self._next_id = 0
+        self._next_doc_id = 0
+        self._lock = threading.RLock()
+        self._load()
+
+    # ------------------------------------------------------------------ storage
+
+    def _load(self) -> None:
+        if not (os.path.exists(self.index_path) and os.path.exists(self.meta_path)):
+            return
+        try:
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+            try:
+                # Map the file instead of reading it; copied into RAM on first write
+                self._index = faiss.read_index(self.index_path, faiss.IO_FLAG_MMAP)
+                self._mmapped = True
+            except RuntimeError:
+                self._index = faiss.read_index(self.index_path)
+            self._entries = {int(vid): entry for vid, entry in meta["entries"].items()}
+            self._next_id = meta["next_id"]
+            self._next_doc_id = meta["next_doc_id"]
+            self._rebuild_url_ids()
+        except Exception as e:
+            print(f"⚠️ Vector index for '{self.brand}' unreadable ({e}). Rebuilding from scratch.")
+            self._index, self._mmapped = None, False
+            self._entries, self._url_ids = {}, {}
+            self._next_id = self._next_doc_id = 0
+
+    def _rebuild_url_ids(self) -> None:
+        self._url_ids = {}
+        for vid, entry in self._entries.items():
+            self._url_ids.setdefault(entry["source"], []).append(vid)
+
+    def _ensure_writable(self) -> None:
+        if self._mmapped:
+            self._index = faiss.read_index(self.index_path)
+            self._mmapped = False
+
+    def save(self) -> None:
+        with self._lock:
+            if self._index is None:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            self._ensure_writable()
+            faiss.write_index(self._index, self.index_path + ".tmp")
+            os.replace(self.index_path + ".tmp", self.index_path)
+            with open(self.meta_path + ".tmp", "w") as f:
+                json.dump({
+                    "brand": self.brand,
+                    "next_id": self._next_id,
+                    "next_doc_id": self._next_doc_id,
+                    "entries": self._entries,
+                }, f)
+            os.replace(self.meta_path + ".tmp", self.meta_path)
+
+    # ------------------------------------------------------------------ updates
+
+    @property
+    def ntotal(self) -> int:
+        return self._index.ntotal if self._index is not None else 0
+
+    def indexed_urls(self) -> Set[str]:
+        with self._lock:
+            return set(self._url_ids)
+
+    def add_documents(self, documents: List[Document]) -> int:
+        """Embed and append chunks. Chunks of a URL share a stable doc_id."""
+        if not documents:
+            return 0
+        vectors = np.asarray(
+            self.embeddings.embed_documents([doc.page_content for doc in documents]),
+            dtype=np.float32
+        )
+        with self._lock:
+            # Another analysis of the same brand may have indexed these URLs meanwhile
+            already_indexed = set(self._url_ids)
+            keep = [i for i, doc in enumerate(documents) if doc.metadata.get("source", "") not in already_indexed]
+            if not keep:
+                return 0
+            documents = [documents[i] for i in keep]
+            vectors = vectors[keep]
+
+            if self._index is None:
+                self._index = faiss.IndexIDMap2(faiss.IndexFlatIP(vectors.shape[1]))
+            self._ensure_writable()
+
+            indexed_at = time.time()
+            ids = np.arange(self._next_id, self._next_id + len(documents), dtype=np.int64)
+            self._next_id += len(documents)
+            for vid, doc in zip(ids, documents):
+                url = doc.metadata.get("source", "")
+                if url in self._url_ids:
+                    doc_id = self._entries[self._url_ids[url][0]]["doc_id"]
+                else:
+                    doc_id = self._next_doc_id
+                    self._next_doc_id += 1
+                entry = {field: doc.metadata.get(field) for field in METADATA_FIELDS}
+                entry["doc_id"] = doc_id
+                entry["page_content"] = doc.page_content
+                entry["indexed_at"] = indexed_at
+                self._entries[int(vid)] = entry
+                self._url_ids.setdefault(url, []).append(int(vid))
+            self._index.add_with_ids(vectors, ids)
+        return len(documents)
+
+    def update_metadata(self, url: str, **fields: Any) -> None:
+        """Refresh metadata (e.g. is_recent) for every chunk of a URL."""
+        with self._lock:
+            for vid in self._url_ids.get(url, []):
+                self._entries[vid].update(fields)
+
+    def evict_older_than(self, cutoff_timestamp: float) -> int:
+        """
+        Remove chunks published before the cutoff. Returns chunks removed.
+
+        Undated chunks are aged by when they were indexed instead (and kept
+        if that isn't known), so they aren't evicted and re-added every run.
+        """
+        with self._lock:
+            stale = [vid for vid, entry in self._entries.items()
+                     if (entry.get("published_timestamp") or entry.get("indexed_at") or cutoff_timestamp)
+                     < cutoff_timestamp]
+            if not stale:
+                return 0
+            self._ensure_writable()
+            self._index.remove_ids(np.asarray(stale, dtype=np.int64))
+            for vid in stale:
+                del self._entries[vid]
+            self._rebuild_url_ids()
+            return len(stale)
+
+    # ------------------------------------------------------------------ queries
+
+    def similarity_search(self, query: str, k: int = 3) -> List[Document]:
+        """Return the k chunks closest to the query as LangChain Documents."""
+        query_vector = np.asarray([self.embeddings.embed_query(query)], dtype=np.float32)
+        with self._lock:
+            if not self.ntotal:
+                return []
+            _, ids = self._index.search(query_vector, min(k, self.ntotal))
+            results = []
+            for vid in ids[0]:
+                entry = self._entries.get(int(vid))
+                if entry is None:
+                    continue
+                metadata = {field: entry.get(field) for field in METADATA_FIELDS}
+                results.append(Document(page_content=entry["page_content"], metadata=metadata))
+            return results
+
+    def query_metadata(self, **filters: Any) -> List[Dict[str, Any]]:
+        """Metadata of chunks matching all filters, e.g. query_metadata(is_recent=True)."""
+        with self._lock:
+            return [
+                {"id": vid, **{field: entry.get(field) for field in METADATA_FIELDS}}
+                for vid, entry in self._entries.items()
+                if all(entry.get(key) == value for key, value in filters.items())
+            ]
+
+
+# ============================================================================
+# PER-BRAND INDEX REGISTRY
+# ============================================================================
+
+_brand_indexes: Dict[str, BrandVectorIndex] = {}
+_registry_lock = threading.Lock()
+
+
+def get_brand_index(brand: str, embeddings: Embeddings) -> BrandVectorIndex:
+    """Get the shared on-disk index for a brand, opening it on first use."""
+    key = _index_dirname(brand)
+    with _registry_lock:
+        if key not in _brand_indexes:
+            _brand_indexes[key] = BrandVectorIndex(brand, embeddings)
+        return _brand_indexes[key]
+
+
+def preload_brand_indexes(embeddings: Embeddings) -> int:
+    """Open (memory-map) every persisted brand index. Returns the number loaded."""
+    root = os.path.join(CACHE_DIR, "indexes")
+    if not os.path.isdir(root):
+        return 0
+    loaded = 0
+    for name in os.listdir(root):
+        meta_path = os.path.join(root, name, "metadata.json")
+        if not os.path.exists(meta_path):
+            continue
+        try:
+            with open(meta_path) as f:
+                brand = json.load(f).get("brand")
+            if brand is None or name != _index_dirname(brand):
+                continue  # pre-hash layout, rebuilt on the brand's next analysis
+            get_brand_index(brand, embeddings)
+            loaded += 1
+        except Exception as e:
+            print(f"⚠️ Failed to preload vector index {name}: {e}")
+    return loaded